@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Speed and memory of the metrics of an Etherscan page reduced from columnar pages, against the
+accumulators updated with each transaction dict.
+
+The page is generated in the txlist format of Etherscan, every field a string.
+
+    python -m benchmarks.columnar_pages --transactions 10000
+"""
+import argparse
+import gc
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from dapp_store_backend.worker.services.columnar import TransactionPage
+from dapp_store_backend.worker.services.reducers import MetricsReducer, is_successful
+
+CONTRACT = '0x8d12a197cb00d4747a1fe03395095ce2a5cc6819'
+
+
+def generate_page(count, users=2000, seed=0):
+    random = np.random.RandomState(seed)
+
+    def transaction(i):
+        user = '0x{:040x}'.format(random.randint(users))
+        failed = random.rand() < 0.05
+        return {'blockNumber': str(6000000 + i // 20), 'timeStamp': str(1530000000 + i * 15),
+                'hash': '0x{:064x}'.format(i), 'nonce': str(random.randint(1000)), 'blockHash': '0x{:064x}'.format(i // 20),
+                'transactionIndex': str(i % 20), 'from': user if i % 3 else CONTRACT, 'to': CONTRACT if i % 3 else user,
+                'value': str(random.randint(10 ** 6) * 10 ** 13), 'gas': '250000',
+                'gasPrice': str(random.randint(1, 100) * 10 ** 9), 'isError': '1' if failed else '0',
+                'txreceipt_status': '0' if failed else '1', 'input': '0x',
+                'contractAddress': '', 'cumulativeGasUsed': str(random.randint(8 * 10 ** 6)),
+                'gasUsed': str(random.randint(21000, 250000)), 'confirmations': str(100000 - i // 20)}
+
+    return [transaction(i) for i in range(count)]
+
+
+def row_metrics(transactions):
+    """
+    Accumulators updated with each transaction, like MetricsReducer before columnar pages.
+    """
+    reducer = MetricsReducer([CONTRACT])
+
+    for tx in transactions:
+        from_address = (tx.get('from') or '').lower()
+        user = (tx.get('to') or '').lower() if from_address in reducer.addresses else from_address
+        successful = is_successful(tx)
+
+        for accumulator in reducer.accumulators:
+            accumulator.update(tx, user, successful)
+
+    return reducer.result()
+
+
+def page_metrics(page):
+    return MetricsReducer([CONTRACT]).update(page).result()
+
+
+def timed(f, *args, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = f(*args)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return result, best
+
+
+def allocated(f, *args):
+    """
+    Size in bytes of the objects allocated by f and kept by its result.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = f(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, default=10000)
+    args = parser.parse_args()
+
+    generate_page(10)
+    transactions, dicts_size = allocated(generate_page, args.transactions)
+    page, page_size = allocated(TransactionPage.from_transactions, transactions)
+
+    row_result, row_time = timed(row_metrics, transactions)
+    _, decode_time = timed(TransactionPage.from_transactions, transactions)
+    page_result, reduce_time = timed(page_metrics, page)
+
+    print('transactions: {}'.format(args.transactions))
+    print('dict rows:      {:8.1f} ms {:8.2f} MB'.format(row_time * 1000, dicts_size / 2 ** 20))
+    print('columnar page:  {:8.1f} ms {:8.2f} MB ({:.0f}x smaller)'.format(
+        (decode_time + reduce_time) * 1000, page_size / 2 ** 20, dicts_size / page_size))
+    print('  decode:       {:8.1f} ms'.format(decode_time * 1000))
+    print('  reduce:       {:8.1f} ms ({:.0f}x)'.format(reduce_time * 1000, row_time / reduce_time))
+    print('same metrics:   {}'.format(row_result == page_result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput of AsyncEtherscan.iter_transactions on a high-volume contract, with and without
+requesting the next planned block ranges ahead, against paging through the result window.
+
+The contract is a recording of its txlist (a JSON file of an Etherscan response or list of
+transactions, sorted by block) or generated with bursts of activity. Queries are answered from
+it with a simulated latency and the 10,000 results window of Etherscan.
+
+    python -m benchmarks.etherscan_ranges --transactions 200000 --latency 0.3
+    python -m benchmarks.etherscan_ranges --recording contract.json
+"""
+import argparse
+import asyncio
+import json
+from bisect import bisect_left, bisect_right
+from time import perf_counter
+
+import numpy as np
+
+from dapp_store_backend.worker.services.async_services import AsyncEtherscan, run
+from dapp_store_backend.worker.services.etherscan import STREAM_PREFETCH
+from dapp_store_backend.worker.services.range_planner import MAX_RESULTS
+
+
+def generate_transactions(count, blocks=6000, seed=0):
+    """
+    Transactions of a contract over blocks, most of them in a few busy periods.
+    """
+    random = np.random.RandomState(seed)
+    busy = random.randint(0, blocks, size=5)
+    numbers = np.concatenate([random.randint(0, blocks, size=count // 2)] +
+                             [np.clip(random.normal(x, blocks / 100, size=count // 10), 0, blocks - 1).astype(int)
+                              for x in busy])
+    numbers.sort()
+
+    return [{'blockNumber': str(x), 'hash': '0x{:064x}'.format(i), 'from': '0x{:040x}'.format(random.randint(5000)),
+             'to': '0x0', 'value': str(random.randint(10 ** 6) * 10 ** 12), 'isError': '0', 'txreceipt_status': '1'}
+            for i, x in enumerate(numbers)]
+
+
+class RecordedEtherscan(AsyncEtherscan):
+    """
+    AsyncEtherscan answering txlist queries from recorded transactions after latency seconds.
+    """
+
+    def __init__(self, transactions, latency):
+        super(RecordedEtherscan, self).__init__('')
+        self.transactions = transactions
+        self.blocks = [int(x['blockNumber']) for x in transactions]
+        self.latency = latency
+        self.calls = 0
+
+    async def _open_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        if page * offset > MAX_RESULTS:
+            return {'status': '0', 'message': 'NOTOK', 'result': 'Result window is too large'}
+
+        first = bisect_left(self.blocks, block_start)
+        last = bisect_right(self.blocks, block_stop)
+        return {'status': '1', 'message': 'OK',
+                'result': self.transactions[first:last][(page - 1) * offset:page * offset]}
+
+    async def _read_transactions(self, response):
+        for tx in self._parse_transactions(response):
+            yield tx
+
+
+async def paged(etherscan, block_start, block_stop):
+    """
+    Previous implementation: pages of the whole range until one is not full.
+    """
+    count = 0
+    page = 1
+
+    while True:
+        try:
+            transactions = await etherscan.get_transactions('0x0', block_start, block_stop, paginate=True,
+                                                            page=page, offset=MAX_RESULTS)
+        except Exception:
+            # Beyond the result window, the remaining transactions are lost
+            break
+
+        count += len(transactions)
+        if len(transactions) < MAX_RESULTS:
+            break
+        page += 1
+
+    return count
+
+
+async def planned(etherscan, block_start, block_stop, prefetch):
+    count = 0
+
+    async for transactions in etherscan.get_transaction_batches('0x0', block_start, block_stop, prefetch=prefetch):
+        count += len(transactions)
+
+    return count
+
+
+async def planned_sequential(etherscan, block_start, block_stop):
+    """
+    Range planner with one query at a time.
+    """
+    return await planned(etherscan, block_start, block_stop, 0)
+
+
+async def planned_prefetch(etherscan, block_start, block_stop):
+    return await planned(etherscan, block_start, block_stop, STREAM_PREFETCH)
+
+
+def load_recording(path):
+    with open(path) as f:
+        data = json.load(f)
+
+    transactions = data.get('result') if isinstance(data, dict) else data
+    return sorted(transactions, key=lambda x: int(x['blockNumber']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recording', help='JSON txlist of a contract')
+    parser.add_argument('--transactions', type=int, default=200000, help='generated transactions')
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds per query')
+    args = parser.parse_args()
+
+    transactions = load_recording(args.recording) if args.recording else generate_transactions(args.transactions)
+    block_start, block_stop = int(transactions[0]['blockNumber']), int(transactions[-1]['blockNumber'])
+
+    print('transactions: {} in blocks {}-{}, latency {} s'.format(len(transactions), block_start, block_stop,
+                                                                 args.latency))
+
+    for name, f in (('paged', paged), ('planned, sequential', planned_sequential),
+                    ('planned, prefetch', planned_prefetch)):
+        etherscan = RecordedEtherscan(transactions, args.latency)
+
+        start = perf_counter()
+        count = run(f(etherscan, block_start, block_stop))
+        elapsed = perf_counter() - start
+
+        print('{:<20} {:>8} transactions ({:5.1f}%) {:>4} queries {:7.2f} s {:9.0f} tx/s'.format(
+            name + ':', count, count * 100 / len(transactions), etherscan.calls, elapsed, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
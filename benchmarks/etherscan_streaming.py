@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Peak memory of caching the transactions of an address with TransactionStore._download, which
+inserts batches decoded while the responses are read, against inserting the whole responses of
+the planned block ranges as before, for growing numbers of transactions.
+
+Responses are generated in the txlist format and served in chunks by a fake session, and the
+inserts are discarded by a fake database session, so only the memory of the worker is measured
+(with tracemalloc).
+
+    python -m benchmarks.etherscan_streaming --transactions 10000 50000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from time import perf_counter
+from urllib.parse import parse_qs, urlparse
+
+from dapp_store_backend.worker.services.etherscan import Etherscan
+from dapp_store_backend.worker.services.range_planner import MAX_RESULTS, block_number, remaining_ranges
+from dapp_store_backend.worker.services.transaction_store import TransactionStore
+
+CONTRACT = '0x8d12a197cb00d4747a1fe03395095ce2a5cc6819'
+TRANSACTIONS_PER_BLOCK = 20
+
+
+def transaction(i):
+    return {'blockNumber': str(i // TRANSACTIONS_PER_BLOCK), 'timeStamp': str(1530000000 + i * 15),
+            'hash': '0x{:064x}'.format(i), 'nonce': str(i % 1000), 'blockHash': '0x{:064x}'.format(i // 20),
+            'transactionIndex': str(i % TRANSACTIONS_PER_BLOCK), 'from': '0x{:040x}'.format(i % 2000),
+            'to': CONTRACT, 'value': str(i * 10 ** 13), 'gas': '250000', 'gasPrice': str(10 ** 9 + i),
+            'isError': '0', 'txreceipt_status': '1', 'input': '0x', 'contractAddress': '',
+            'cumulativeGasUsed': str(i * 1000), 'gasUsed': str(21000 + i % 1000), 'confirmations': '1000'}
+
+
+class FakeResponse(object):
+    """
+    txlist response of the transactions first..last generated as it is read.
+    """
+    status_code = 200
+
+    def __init__(self, first, last):
+        self.first = first
+        self.last = last
+
+    def _body(self):
+        yield '{"status":"1","message":"OK","result":['
+        for i in range(self.first, self.last):
+            yield (',' if i > self.first else '') + json.dumps(transaction(i))
+        yield ']}'
+
+    def iter_content(self, chunk_size):
+        buffer = ''
+        for text in self._body():
+            buffer += text
+            if len(buffer) >= chunk_size:
+                yield buffer.encode('utf-8')
+                buffer = ''
+        yield buffer.encode('utf-8')
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+
+    def __init__(self, count):
+        self.count = count
+
+    def get(self, url, stream=False):
+        query = {k: int(v[0]) for k, v in parse_qs(urlparse(url).query).items() if v[0].isdigit()}
+        first = min(query['startblock'] * TRANSACTIONS_PER_BLOCK, self.count)
+        last = min((query['endblock'] + 1) * TRANSACTIONS_PER_BLOCK, self.count, first + query['offset'])
+        return FakeResponse(first, last)
+
+
+class FakeDatabaseSession(object):
+    """
+    Session counting the inserted rows.
+    """
+
+    def __init__(self):
+        self.rows = 0
+
+    def execute(self, statement, rows):
+        self.rows += len(rows)
+
+
+def paged_download(store, count):
+    """
+    Previous download: the responses of up to MAX_RESULTS transactions are inserted whole.
+    """
+    pending = [(0, count)]
+
+    while pending:
+        start, stop = pending.pop()
+        transactions = store.etherscan.get_transactions(CONTRACT, start, stop, paginate=True, offset=MAX_RESULTS)
+
+        if len(transactions) == MAX_RESULTS:
+            last = block_number(transactions[-1])
+            pending.extend(reversed(remaining_ranges(last, start, stop)))
+            transactions = [x for x in transactions if block_number(x) < last]
+
+        store._insert(CONTRACT, transactions)
+
+    return store.session.rows
+
+
+def streamed_download(store, count):
+    store._download(CONTRACT, 0, count)
+    return store.session.rows
+
+
+def measured(f, *args):
+    """
+    :return: (result, seconds, peak bytes allocated)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    result = f(*args)
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transactions', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print('{:>13} {:>18} {:>18} {:>6}'.format('transactions', 'pages', 'streamed', 'same'))
+
+    for count in args.transactions:
+        etherscan = Etherscan('')
+        etherscan.session = FakeSession(count)
+
+        paged_rows, paged_time, paged_peak = measured(paged_download,
+                                                      TransactionStore(etherscan, FakeDatabaseSession()), count)
+        streamed_rows, streamed_time, streamed_peak = measured(streamed_download,
+                                                               TransactionStore(etherscan, FakeDatabaseSession()),
+                                                               count)
+
+        print('{:13d} {:8.1f} MB {:5.2f} s {:8.1f} MB {:5.2f} s {:>6}'.format(
+            count, paged_peak / 2 ** 20, paged_time, streamed_peak / 2 ** 20, streamed_time,
+            str(paged_rows == streamed_rows == count)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the ranking engine against the previous per-dapp loops of calculate_dapp_ranking.
+
+    python -m benchmarks.ranking --dapps 100000
+"""
+import argparse
+from collections import namedtuple
+from decimal import Decimal
+from time import perf_counter
+
+import numpy as np
+
+from dapp_store_backend.enums.categories import DappCategory
+from dapp_store_backend.services import ranking
+
+Dapp = namedtuple('Dapp', ['id', 'category', 'blockchain', 'rating', 'rating_count', 'metrics'])
+
+WEIGHTS = dict(rating=0.4, users=0.2, volume=0.2, transactions=0.2, max_review_count=100, prior_count=10)
+MAX_RANKING = 20
+
+
+def generate_dapps(count, seed=0):
+    random = np.random.RandomState(seed)
+    categories = [x.name.capitalize() for x in DappCategory if x != DappCategory.ALL]
+
+    return [Dapp(id=i + 1,
+                 category=categories[random.randint(len(categories))],
+                 blockchain='ETH',
+                 rating=float(random.uniform(1, 5)),
+                 rating_count=int(random.randint(0, 200)),
+                 metrics={'users': int(random.randint(0, 10 ** 5)),
+                          'volume': int(random.randint(0, 10 ** 6)) * 10 ** 15,
+                          'transactions': int(random.randint(0, 10 ** 6))})
+            for i in range(count)]
+
+
+def legacy_ranking(dapps):
+    """
+    Previous implementation: per dapp Decimal logs, weights in a Python loop and one row per rank.
+    """
+    mat = np.array([[x.rating, min(x.rating_count, WEIGHTS['max_review_count']),
+                     np.log(x.metrics['users'] + 1),
+                     float((Decimal(x.metrics['volume']) / Decimal(10 ** 18) + 1).ln()),
+                     np.log(x.metrics['transactions'] + 1)] for x in dapps])
+
+    max_users = max(mat[:, 2]) or 1
+    max_volume = max(mat[:, 3]) or 1
+    max_transactions = max(mat[:, 4]) or 1
+
+    weights = [((x[0] / 5) * (x[1] / WEIGHTS['max_review_count']) * WEIGHTS['rating']) +
+               ((x[2] / max_users) * WEIGHTS['users'] +
+                (x[3] / max_volume) * WEIGHTS['volume'] +
+                (x[4] / max_transactions) * WEIGHTS['transactions']) for x in mat]
+
+    rows = []
+    counts = {}
+    for idx in reversed(np.argsort(weights)):
+        dapp = dapps[idx]
+        category = dapp.category.upper()
+
+        if counts.get('ALL', 0) < MAX_RANKING:
+            counts['ALL'] = counts.get('ALL', 0) + 1
+            rows.append((dapp.id, DappCategory.ALL.value, counts['ALL']))
+
+        if counts.get(category, 0) < MAX_RANKING:
+            counts[category] = counts.get(category, 0) + 1
+            rows.append((dapp.id, DappCategory[category].value, counts[category]))
+
+    return rows
+
+
+def engine_ranking(dapps):
+    ids, categories, matrix = ranking.feature_matrix(dapps)
+    scores = ranking.score(matrix, WEIGHTS)
+    return ranking.ranking_rows(ids, ranking.rank_dapps(ids, categories, scores, MAX_RANKING), 1)
+
+
+def timed(f, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = f(*args)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dapps', type=int, default=100000)
+    args = parser.parse_args()
+
+    dapps = generate_dapps(args.dapps)
+
+    legacy_rows, legacy_time = timed(legacy_ranking, dapps)
+    engine_rows, engine_time = timed(engine_ranking, dapps)
+
+    ids, categories, matrix = ranking.feature_matrix(dapps)
+    _, features_time = timed(ranking.feature_matrix, dapps)
+    scores, score_time = timed(lambda m: ranking.score(m, WEIGHTS), matrix)
+    _, rank_time = timed(ranking.rank_dapps, ids, categories, scores, MAX_RANKING)
+
+    same = sorted(legacy_rows) == sorted((x['dapp_id'], x['ranking_name_id'], x['rank']) for x in engine_rows)
+
+    print('dapps: {}'.format(args.dapps))
+    print('legacy loops:   {:8.1f} ms'.format(legacy_time * 1000))
+    print('engine total:   {:8.1f} ms ({:.0f}x)'.format(engine_time * 1000, legacy_time / engine_time))
+    print('  features:     {:8.1f} ms'.format(features_time * 1000))
+    print('  score:        {:8.1f} ms'.format(score_time * 1000))
+    print('  top N:        {:8.1f} ms'.format(rank_time * 1000))
+    print('same rankings:  {}'.format(same))
+
+    for name in sorted(ranking.STRATEGIES):
+        _, strategy_time = timed(lambda m: ranking.score(m, WEIGHTS, name), matrix)
+        print('strategy {:<10}{:8.1f} ms'.format(name + ':', strategy_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ from flask_restplus import fields
 from flask_restplus import Namespace, Resource
 from sqlalchemy import exc
 
+from dapp_store_backend.caching import FEATURED, invalidate
 from dapp_store_backend.database import db
 from dapp_store_backend.enums.status import HTTPCodes
 from dapp_store_backend.models.dapp import Dapp
@@ -63,4 +64,6 @@ class AddFeaturedDapp(Resource):
             db.session().rollback()
             return {'Error': 'Featured dapp already exists'}, 404
 
+        invalidate(FEATURED)
+
         return request_json, HTTPCodes.Success.value
\ No newline at end of file
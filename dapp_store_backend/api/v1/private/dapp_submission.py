@@ -4,12 +4,14 @@ from flask import current_app, request
 from flask_restplus import fields, Namespace, Resource
 from boto3 import client
 
+from dapp_store_backend.caching import invalidate_dapp
 from dapp_store_backend.database import db
 from dapp_store_backend.extensions import celery
 from dapp_store_backend.models.dapp import Dapp
 from dapp_store_backend.enums.status import DappSubmissionStatus
 from dapp_store_backend.models.dapp_submission import DappSubmission
 from dapp_store_backend.schemas.dapp_submission_schema import DappSubmissionSchema
+from dapp_store_backend.services.listing import refresh_dapp_listing
 from dapp_store_backend.utilities import move_recursive_s3, move_s3
 
 
@@ -92,6 +94,8 @@ class ApproveDappSubmission(Resource):
                             s3_id=submission.s3_id,
                             launch_date=submission.launch_date)
                 dapp.save()
+                refresh_dapp_listing([dapp.id])
+                invalidate_dapp(dapp.id)
             else:
                 submission.status = DappSubmissionStatus.DENIED.value
                 db.session.commit()
@@ -4,8 +4,13 @@ from flask import request
 from flask_restplus import fields, Namespace, Resource
 from sqlalchemy import exc
 
+from dapp_store_backend.caching import DAPPS, invalidate
 from dapp_store_backend.database import db
+from dapp_store_backend.enums.status import HTTPCodes
+from dapp_store_backend.models.block_interval import BlockInterval
 from dapp_store_backend.models.metric import Metric
+from dapp_store_backend.services.activity import update_dapp_activity
+from dapp_store_backend.services.hyperloglog import HyperLogLog
 
 
 api = Namespace('metric', description='Private metric endpoints.',
@@ -15,7 +20,15 @@ metric_fields = api.model('Metric', {
     'dapp_id': fields.Integer(required=True, description='ID for dapp.', example=1),
     'users': fields.Integer(required=True, description='Unique users for a dapp.', example=99),
     'volume': fields.Integer(required=True, description='Total volume for a dapp.', example=100000),
-    'transactions': fields.Integer(required=True, description='Total number of transactions for a dapp.', example=384)
+    'transactions': fields.Integer(required=True, description='Total number of transactions for a dapp.', example=384),
+    'users_sketch': fields.String(description='Base64 HyperLogLog sketch of the unique users for a dapp.')
+})
+
+unique_users_fields = api.model('UniqueUsers', {
+    'dapp_id': fields.Integer(required=True, description='ID for dapp.', example=1),
+    'users': fields.Integer(required=True, description='Estimated unique users for a dapp over the window.', example=99),
+    'intervals': fields.Integer(required=True, description='Number of block intervals with metrics in the window.', example=7),
+    'missing_sketches': fields.Integer(required=True, description='Block intervals in the window without a users sketch.', example=0)
 })
 
 metric_list_fields = api.model('MetricList', {
@@ -33,16 +46,17 @@ class AddMetric(Resource):
         metrics = request.get_json().get('metrics')
 
         if metrics:
-            for dapp_metrics in metrics:
-                metric = Metric(dapp_id=dapp_metrics.get('dapp_id'),
-                                block_interval_id=dapp_metrics.get(
-                                    'block_interval_id'),
-                                data=dapp_metrics.get('metrics'))
-
-                db.session.add(metric)
+            rows = [{'dapp_id': x.get('dapp_id'),
+                     'block_interval_id': x.get('block_interval_id'),
+                     'data': x.get('metrics'),
+                     'users_sketch': x.get('users_sketch')} for x in metrics]
 
             try:
+                db.session.add_all([Metric(**x) for x in rows])
+                # Ranked on the activity of dapps, updated in the same transaction like add_dapp_metrics
+                update_dapp_activity(rows)
                 db.session.commit()
+                invalidate(DAPPS)
             except exc.IntegrityError as e:
                 db.session().rollback()
                 print(
@@ -50,3 +64,34 @@ class AddMetric(Resource):
                 return {'status': 'FAILED'}, 404
 
         return {'status': 'SUCCESS'}, 200
+
+
+@api.route('/users/<int:dapp_id>')
+class GetUniqueUsers(Resource):
+    """
+    Estimate the unique users of a dapp over a time window by merging the users sketches of its
+    metrics. Without time_start and time_stop the window is all time.
+    """
+    @api.doc(params={'time_start': 'Start time (inclusive) of the window in UTC (seconds).',
+                     'time_stop': 'Stop time (exclusive) of the window in UTC (seconds).'})
+    @api.marshal_with(unique_users_fields)
+    def get(self, dapp_id):
+        time_start = request.args.get('time_start', type=int)
+        time_stop = request.args.get('time_stop', type=int)
+
+        query = (db.session.query(Metric.users_sketch)
+                 .join(BlockInterval, Metric.block_interval)
+                 .filter(Metric.dapp_id == dapp_id))
+
+        if time_start is not None:
+            query = query.filter(BlockInterval.time_start >= time_start)
+        if time_stop is not None:
+            query = query.filter(BlockInterval.time_stop <= time_stop)
+
+        sketches = [x for x, in query.all()]
+        users_sketch = HyperLogLog.merge_all(x for x in sketches if x)
+
+        return {'dapp_id': dapp_id,
+                'users': users_sketch.count(),
+                'intervals': len(sketches),
+                'missing_sketches': sum(1 for x in sketches if not x)}, HTTPCodes.Success.value
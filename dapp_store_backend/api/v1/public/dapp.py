@@ -5,11 +5,13 @@ from flask import request, current_app
 from flask_restplus import Namespace, Resource
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from uuid import uuid4
+from sqlalchemy import cast
 from sqlalchemy.sql import func
-from sqlalchemy.orm import subqueryload
-from sqlalchemy.util import KeyedTuple
+from sqlalchemy.orm import joinedload, noload
 from boto3 import client
 
+from dapp_store_backend.caching import (DAPPS, DAPP_OF_THE_DAY, FEATURED, REVIEWS, cached, dapp_list_tag, dapp_tag,
+                                        normalize_category, normalize_order, normalize_search, normalize_sort)
 from dapp_store_backend.extensions import celery
 from dapp_store_backend.enums.status import HTTPCodes
 from dapp_store_backend.database import db
@@ -20,6 +22,8 @@ from dapp_store_backend.utilities import round_down_datetime
 from dapp_store_backend.models.blockchain import Blockchain
 from dapp_store_backend.models.featured import Featured
 from dapp_store_backend.models.daily_item import DailyItem
+from dapp_store_backend.models.dapp_listing import DappListing
+from dapp_store_backend.models.dapp_rating_aggregate import DappRatingAggregate
 from dapp_store_backend.models.ranking_name import RankingName
 from dapp_store_backend.models.ranking import Ranking
 from dapp_store_backend.models.user import User
@@ -27,16 +31,27 @@ from dapp_store_backend.schemas.dapp_schema import DappSchema
 from dapp_store_backend.schemas.dapp_list_schema import DappListSchema
 from dapp_store_backend.schemas.dapp_submission_schema import DappSubmissionSchema
 from dapp_store_backend.schemas.featured_schema import FeaturedSchema
+from dapp_store_backend.services.listing import category_name
+from dapp_store_backend.services.reviews import review_page
+from dapp_store_backend.services.search import search_dapps
 from dapp_store_backend.utilities import (valdate_image_type, upload_image_to_s3, validate_request, verify_eth_address)
 from . import Dapp
 from . import BlockInterval
 from . import Category
 from . import Metric
-from . import Review
 from . import DappSubmission
 
 api = Namespace('dapp', description='Public Dapp endpoints.', path='/public/dapp')
 
+LIST_SORT_COLUMNS = {
+    'users': DappListing.users,
+    'volume': DappListing.normalized_volume,
+    'transactions': DappListing.transactions,
+    'rating': DappListing.rating,
+    'name': DappListing.name,
+    'uploaded_at': DappListing.uploaded_at,
+}
+
 
 @api.route('/<int:dapp_id>')
 class GetDapp(Resource):
@@ -45,11 +60,15 @@ class GetDapp(Resource):
     """
 
     @staticmethod
+    @cached(lambda dapp_id: [DAPPS, dapp_tag(dapp_id)],
+            query_args={'sort': normalize_sort, 'order': normalize_order})
     def get(dapp_id):
-        sort_by = request.args.get('sort')
+        sort_by = normalize_sort(request.args.get('sort'))
         reverse = False if request.args.get('order') == 'asc' else True
 
-        dapp_schema = DappSchema(many=False, exclude=['logo_path', 'screenshot'])
+        # Ratings are read from the rating aggregate and only the first page of reviews is returned,
+        # see GetDappReviews
+        dapp_schema = DappSchema(many=False, exclude=['logo_path', 'screenshot', 'reviews'])
 
         time_start = (int(round_down_datetime(
             datetime.utcnow(), unit=current_app.config['BLOCK_INTERVAL_UNIT']).timestamp())
@@ -76,10 +95,9 @@ class GetDapp(Resource):
                                       Ranking.block_interval_id == ranking_latest_block_interval_id.c.block_interval_latest_id)
                               .all())
 
-            # TODO: improve query
             result = (Dapp.query.add_columns(metric_latest.c.data.label('metrics'))
                       .outerjoin(metric_latest, metric_latest.c.dapp_id == Dapp.id)
-                      .options(subqueryload(Dapp.reviews).subqueryload(Review.user).joinedload(User.reviews))
+                      .options(noload(Dapp.reviews), joinedload(Dapp.rating_aggregate))
                       .filter(Dapp.id == dapp_id)
                       .first())
 
@@ -88,10 +106,8 @@ class GetDapp(Resource):
             if result[1]:
                 result[0].metrics = result[1]
 
-            if sort_by in ['rating', 'uploaded_at', 'helpful_count']:
-                result[0].reviews.sort(key=lambda x: getattr(x, sort_by), reverse=reverse)
-
             dapp = dapp_schema.dump(result[0]).data
+            dapp['reviews'], dapp['next_cursor'] = review_page(dapp_id, sort_by, reverse)
 
             return dapp, 200
 
@@ -100,6 +116,28 @@ class GetDapp(Resource):
             return {'Error': 'Failed to retrieve dapp.'}, 404
 
 
+@api.route('/<int:dapp_id>/reviews')
+class GetDappReviews(Resource):
+    """
+    Get a page of the reviews of a dapp.
+    """
+
+    @staticmethod
+    @cached(lambda dapp_id: [dapp_tag(dapp_id)],
+            query_args={'sort': normalize_sort, 'order': normalize_order, 'cursor': str, 'limit': str})
+    def get(dapp_id):
+        sort_by = normalize_sort(request.args.get('sort'))
+        reverse = False if request.args.get('order') == 'asc' else True
+
+        try:
+            limit = int(request.args.get('limit', Config.REVIEW_PAGE_SIZE))
+            reviews, next_cursor = review_page(dapp_id, sort_by, reverse, request.args.get('cursor'), limit)
+        except ValueError as e:
+            return {'Error': str(e)}, 400
+
+        return {'reviews': reviews, 'next_cursor': next_cursor}, 200
+
+
 @api.route('/list')
 class ListDapps(Resource):
     """
@@ -107,9 +145,12 @@ class ListDapps(Resource):
     """
 
     @staticmethod
+    @cached(lambda selected_category=None: [
+        DAPPS, dapp_list_tag(normalize_category(selected_category or request.args.get('category')))],
+            query_args={'category': normalize_category, 'sort': normalize_sort, 'order': normalize_order})
     def get(selected_category=None):
         category = selected_category.upper() if selected_category is not None else request.args.get('category').upper()
-        sort_by = request.args.get('sort')
+        sort_by = normalize_sort(request.args.get('sort'))
         reverse = False if request.args.get('order') == 'asc' else True
 
         if category not in DappCategory.__members__:
@@ -124,103 +165,25 @@ class ListDapps(Resource):
 
     @staticmethod
     def get_dapps(category, sort_by=None, reverse=True):
-        time_start = (int(round_down_datetime(
-            datetime.utcnow(), unit=current_app.config['BLOCK_INTERVAL_UNIT']).timestamp()) -
-                      Config.BLOCK_INTERVAL_SECONDS * 5)
-
+        """
+        Read the list of dapps from the dapp_listing snapshot, built by manage.py refresh_listing on
+        deploy and refreshed by the worker.
+        """
         dapp_list_schema = DappListSchema(many=True)
 
         try:
-            block_interval_first = db.session.query(func.min(BlockInterval.id)) \
-                .filter(BlockInterval.time_start >= time_start).subquery()
-
-            metric_latest_block_interval_id = (db.session.query(
-                Metric.dapp_id, func.max(Metric.block_interval_id).label('metric_latest_block_interval'))
-                                               .filter(Metric.block_interval_id >= block_interval_first)
-                                               .group_by(Metric.dapp_id)
-                                               .subquery())
-
-            ranking_latest_block_interval_id = (
-                db.session.query(Ranking.dapp_id, func.max(Ranking.block_interval_id).label('ranking_latest_block_interval'))
-                .filter(Ranking.block_interval_id >= block_interval_first)
-                .group_by(Ranking.dapp_id)
-                .subquery('ranking_latest_id'))
-
-            ranking_latest = (db.session.query(Ranking.rank, RankingName.name.label('name'),
-                                               Ranking.dapp_id, Ranking.block_interval_id)
-                              .join(RankingName)
-                              .filter(Ranking.block_interval_id == ranking_latest_block_interval_id.c.ranking_latest_block_interval)
-                              .distinct()
-                              .all())
+            results = DappListing.query
 
-            ranking_dict = {}
-            if ranking_latest:
-                for ranking in ranking_latest:
-                    ranking_dapp_id = ranking.dapp_id
-                    if ranking_dapp_id not in ranking_dict:
-                        ranking_dict[ranking_dapp_id] = [ranking]
-                    else:
-                        ranking_dict[ranking_dapp_id].append(ranking)
-
-                ranking_dict = {k: KeyedTuple([ranking_dict.get(k)], labels=['rankings']) for k in ranking_dict}
-
-            if category == DappCategory.ALL.name:
-                # Get average ratings per dapp via subquery
-                ratings = Review.query.with_entities(Review.dapp_id, func.avg(Review.rating).label('rating'),
-                                                     func.count('*').label('rating_count')) \
-                    .group_by(Review.dapp_id).subquery()
-
-                # Get list of all dapps
-                results = Dapp.query \
-                    .join(Blockchain, Dapp.blockchain_id == Blockchain.id) \
-                    .join(Category, Dapp.category_id == Category.id) \
-                    .outerjoin(ratings, Dapp.id == ratings.c.dapp_id) \
-                    .outerjoin(metric_latest_block_interval_id, Dapp.id == metric_latest_block_interval_id.c.dapp_id) \
-                    .outerjoin(Metric, (Dapp.id == Metric.dapp_id) & (
-                        Metric.block_interval_id == metric_latest_block_interval_id.c.metric_latest_block_interval)) \
-                    .with_entities(Dapp.id, Dapp.name, Dapp.url, Dapp.uploaded_at, Dapp.tagline, Dapp.description,
-                                   Dapp.logo_path, Category.name.label('category'), Blockchain.symbol.label('blockchain'),
-                                   ratings.c.rating, ratings.c.rating_count, Metric.data.label('metrics')) \
-                    .all()
+            if category != DappCategory.ALL.name:
+                results = results.filter(DappListing.category == category_name(category))
 
-            else:
-                category = ' '.join([x.capitalize() for x in category.split('_')])
-
-                # Get average ratings per dapp in the category via subquery
-                ratings = Review.query \
-                    .join(Dapp).join(Category) \
-                    .filter(Category.name == category) \
-                    .with_entities(Review.dapp_id, func.avg(Review.rating).label('rating'),
-                                   func.count('*').label('rating_count')) \
-                    .group_by(Review.dapp_id).subquery()
-
-                # Get list of dapps in specific category
-                results = Dapp.query \
-                    .join(Blockchain, Dapp.blockchain_id == Blockchain.id) \
-                    .join(Category, Dapp.category_id == Category.id) \
-                    .outerjoin(ratings, Dapp.id == ratings.c.dapp_id) \
-                    .outerjoin(metric_latest_block_interval_id, Dapp.id == metric_latest_block_interval_id.c.dapp_id) \
-                    .outerjoin(Metric, (Dapp.id == Metric.dapp_id) & (
-                        Metric.block_interval_id == metric_latest_block_interval_id.c.metric_latest_block_interval)) \
-                    .filter(Category.name == category) \
-                    .with_entities(Dapp.id, Dapp.name, Dapp.url, Dapp.uploaded_at, Dapp.tagline, Dapp.description,
-                                   Dapp.logo_path, Category.name.label('category'), Blockchain.symbol.label('blockchain'),
-                                   ratings.c.rating, ratings.c.rating_count, Metric.data.label('metrics')) \
-                    .all()
-
-            if ranking_dict:
-                for i, r in enumerate(results):
-                    ranking_tuple = ranking_dict.get(r.id)
-                    results[i] = KeyedTuple(r + ranking_tuple, r.keys() + ranking_tuple.keys())
-
-            dapps = dapp_list_schema.dump(results).data
+            if sort_by in LIST_SORT_COLUMNS:
+                sort_column = LIST_SORT_COLUMNS.get(sort_by)
+                results = results.order_by(sort_column.desc() if reverse else sort_column.asc())
 
-            if sort_by in ['users', 'volume', 'transactions']:
-                dapps.sort(key=lambda x: x['metrics'].get(sort_by), reverse=reverse)
-            elif sort_by in ['rating', 'name', 'uploaded_at']:
-                dapps.sort(key=lambda x: x.get(sort_by), reverse=reverse)
+            results = results.order_by(DappListing.id).all()
 
-            return dapps
+            return dapp_list_schema.dump(results).data
         except Exception as e:
             print('EXCEPTION!!!!: {}'.format(e))
             raise e
@@ -248,11 +211,12 @@ class ListDapps(Resource):
                                                .group_by(Metric.dapp_id)
                                                .subquery())
 
-            # Get average ratings per dapp via subquery
-            ratings = (Review.query.filter(Review.dapp_id.in_(dapp_id_list))
-                       .with_entities(Review.dapp_id, func.avg(Review.rating).label('rating'),
-                                      func.count('*').label('rating_count'))
-                       .group_by(Review.dapp_id).subquery())
+            # Get average ratings per dapp from the rating aggregates
+            ratings = (db.session.query(DappRatingAggregate.dapp_id,
+                                        (cast(DappRatingAggregate.rating_sum, db.Numeric) /
+                                         func.nullif(DappRatingAggregate.rating_count, 0)).label('rating'),
+                                        DappRatingAggregate.rating_count.label('rating_count'))
+                       .filter(DappRatingAggregate.dapp_id.in_(dapp_id_list)).subquery())
 
             # Get list of all dapps
             results = Dapp.query \
@@ -516,93 +480,28 @@ class SubmitDappPrelaunch(Resource):
             return {'Error': 'Failed to submit dapp: {}.'.format(e)}, 500
 
 
-# TODO: reformat endpoint
-# TODO: add sorting by similarity of match, limit number of search results
 @api.route('/search')
 class Search(Resource):
     """
-    Search by dapp name.
+    Search dapps by name, tagline and description, mode=prefix for typeahead.
     """
 
     @staticmethod
+    @cached([DAPPS, dapp_list_tag(DappCategory.ALL.name)],
+            query_args={'name': normalize_search, 'mode': normalize_sort, 'limit': str})
     def get():
         name = request.args.get('name')
 
         if not name:
             return [], 200
 
-        time_start = (int(round_down_datetime(
-            datetime.utcnow(), unit=current_app.config['BLOCK_INTERVAL_UNIT']).timestamp())
-                      - Config.BLOCK_INTERVAL_SECONDS * 5)
-
-        dapp_list_schema = DappListSchema(many=True)
-
         try:
-            block_interval_first = db.session.query(func.min(BlockInterval.id)) \
-                .filter(BlockInterval.time_start >= time_start).subquery()
-
-            metric_latest_block_interval_id = (db.session.query(
-                Metric.dapp_id, func.max(Metric.block_interval_id).label('metric_latest_block_interval'))
-                                               .filter(Metric.block_interval_id >= block_interval_first)
-                                               .group_by(Metric.dapp_id)
-                                               .subquery())
-
-            ranking_latest_block_interval_id = (
-                db.session.query(Ranking.dapp_id,
-                                 func.max(Ranking.block_interval_id).label('ranking_latest_block_interval'))
-                    .filter(Ranking.block_interval_id >= block_interval_first)
-                    .group_by(Ranking.dapp_id)
-                    .subquery('ranking_latest_id'))
-
-            ranking_latest = (db.session.query(Ranking.rank, RankingName.name.label('name'),
-                                               Ranking.dapp_id, Ranking.block_interval_id)
-                              .join(RankingName)
-                              .filter(
-                Ranking.block_interval_id == ranking_latest_block_interval_id.c.ranking_latest_block_interval)
-                              .distinct()
-                              .all())
-
-            ranking_dict = {}
-            if ranking_latest:
-                for ranking in ranking_latest:
-                    ranking_dapp_id = ranking.dapp_id
-                    if ranking_dapp_id not in ranking_dict:
-                        ranking_dict[ranking_dapp_id] = [ranking]
-                    else:
-                        ranking_dict[ranking_dapp_id].append(ranking)
-
-                ranking_dict = {k: KeyedTuple([ranking_dict.get(k)], labels=['rankings']) for k in ranking_dict}
-
-            # Get average ratings per dapp via subquery
-            ratings = Review.query.with_entities(Review.dapp_id, func.avg(Review.rating).label('rating'),
-                                                 func.count('*').label('rating_count')) \
-                .group_by(Review.dapp_id).subquery()
+            limit = int(request.args.get('limit', Config.SEARCH_LIMIT))
+            results = search_dapps(name, prefix=normalize_sort(request.args.get('mode')) == 'prefix', limit=limit)
+        except ValueError as e:
+            return {'Error': str(e)}, 400
 
-            # Get list of all dapps
-            results = Dapp.query \
-                .join(Blockchain, Dapp.blockchain_id == Blockchain.id) \
-                .join(Category, Dapp.category_id == Category.id) \
-                .outerjoin(ratings, Dapp.id == ratings.c.dapp_id) \
-                .outerjoin(metric_latest_block_interval_id, Dapp.id == metric_latest_block_interval_id.c.dapp_id) \
-                .outerjoin(Metric, (Dapp.id == Metric.dapp_id) & (
-                    Metric.block_interval_id == metric_latest_block_interval_id.c.metric_latest_block_interval)) \
-                .filter(Dapp.name.ilike('%{}%'.format(name))) \
-                .with_entities(Dapp.id, Dapp.name, Dapp.url, Dapp.uploaded_at, Dapp.tagline, Dapp.description,
-                               Dapp.logo_path, Category.name.label('category'), Blockchain.symbol.label('blockchain'),
-                               ratings.c.rating, ratings.c.rating_count, Metric.data.label('metrics')) \
-                .all()
-
-            if ranking_dict:
-                for i, r in enumerate(results):
-                    ranking_tuple = ranking_dict.get(r.id)
-                    results[i] = KeyedTuple(r + ranking_tuple, r.keys() + ranking_tuple.keys())
-
-            dapps = dapp_list_schema.dump(results).data
-
-            return dapps, 200
-        except Exception as e:
-            print('EXCEPTION!!!: {}'.format(e))
-            return [], 500
+        return DappListSchema(many=True).dump(results).data, 200
 
 
 @api.route('/dapp_of_the_day')
@@ -612,6 +511,7 @@ class DappOfTheDay(Resource):
     """
 
     @staticmethod
+    @cached([DAPPS, REVIEWS, DAPP_OF_THE_DAY])
     def get():
         try:
             dapp_of_the_day = DailyItem.get_by_id(2)
@@ -631,6 +531,7 @@ class FeaturedDapp(Resource):
     """
 
     @staticmethod
+    @cached([DAPPS, REVIEWS, FEATURED], query_args={'category': normalize_category})
     def get():
         try:
             category = request.args.get('category').upper()
@@ -5,6 +5,7 @@ from flask_restplus import fields, Namespace, Resource
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from sqlalchemy.orm import joinedload
 
+from dapp_store_backend.caching import REVIEWS, REVIEW_OF_THE_DAY, cached, invalidate_dapp
 from dapp_store_backend.database import db
 from dapp_store_backend.extensions import celery
 from dapp_store_backend.settings import Config
@@ -13,6 +14,8 @@ from dapp_store_backend.models.user import User
 from dapp_store_backend.schemas.review_schema import ReviewSchema
 from dapp_store_backend.schemas.review_of_the_day_schema import ReviewOfTheDaySchema
 from dapp_store_backend.schemas.review_like_schema import ReviewLikeSchema
+from dapp_store_backend.services.listing import refresh_dapp_listing
+from dapp_store_backend.services.ratings import update_rating_aggregate, valid_rating
 from . import Dapp
 from . import Review
 from . import ReviewLike
@@ -54,6 +57,9 @@ class PostReview(Resource):
         if not dapp_id or not rating or not title or not review:
             return {'Error': 'Required field is empty.'}, 400
 
+        if not valid_rating(rating):
+            return {'Error': 'Invalid rating.'}, 400
+
         if feature and not all([1 if x in Config.RATING_TYPES else 0 for x in feature.keys()]):
             return {'Error': 'Invalid featured rating fields.'}, 400
 
@@ -96,7 +102,13 @@ class VoteReview(Resource):
                                      user_id=user.id,
                                      review_id=review_id,
                                      helpful=1)
-            review_like.save()
+            review_like.save(commit=False)
+
+            # Counted in the same transaction as the vote, incremented in SQL so concurrent votes add up
+            Review.query.filter_by(id=review_id).update({Review.helpful_count: Review.helpful_count + 1},
+                                                        synchronize_session=False)
+            db.session.commit()
+            invalidate_dapp(review.dapp_id)
 
             review_like_schema = ReviewLikeSchema()
             serialized = review_like_schema.dump(review_like).data
@@ -104,6 +116,7 @@ class VoteReview(Resource):
             return serialized, 200
 
         except Exception as e:
+            db.session.rollback()
             print('ERROR!!!: {}'.format(e))
             return {'Error': 'Cannot like review twice.'}, 404
 
@@ -132,15 +145,24 @@ class DeleteVoteReview(Resource):
             return {'Error': 'Review not found.'}, 404
 
         try:
-            review_like = (ReviewLike.query.filter_by(dapp_id=review.dapp_id,
-                                                      user_id=user.id,
-                                                      review_id=review_id)
-                           .first())
-            review_like.delete()
+            deleted = (ReviewLike.query.filter_by(dapp_id=review.dapp_id,
+                                                  user_id=user.id,
+                                                  review_id=review_id,
+                                                  helpful=1)
+                       .delete(synchronize_session=False))
+
+            if not deleted:
+                return {'Error': 'Cannot delete review vote.'}, 400
+
+            Review.query.filter_by(id=review_id).update({Review.helpful_count: Review.helpful_count - 1},
+                                                        synchronize_session=False)
+            db.session.commit()
+            invalidate_dapp(review.dapp_id)
 
             return {'message': 'Review vote removed successfully.'}, 200
 
         except Exception as e:
+            db.session.rollback()
             print('ERROR!!!: {}'.format(e))
             return {'Error': 'Cannot delete review vote.'}, 400
 
@@ -167,11 +189,17 @@ class UpdateReview(Resource):
         feature = request_json.get('feature')
         title = request_json.get('title')
 
-        review = Review.get_by_id(review_id)
+        if rating is not None and not valid_rating(rating):
+            return {'Error': 'Invalid rating.'}, 400
+
+        # Locked so the ratings removed from the aggregate are the current ones
+        review = Review.query.filter_by(id=review_id).with_for_update().first()
 
         if not review:
             return {'Error': 'Review does not exist.'}, 404
 
+        previous = (review.rating, review.feature)
+
         if rating:
             review.rating = rating
 
@@ -184,8 +212,16 @@ class UpdateReview(Resource):
         if title:
             review.title = title
 
+        if rating or feature:
+            update_rating_aggregate(review.dapp_id, added=[(review.rating, review.feature)], removed=[previous])
+
         db.session.commit()
 
+        if rating:
+            refresh_dapp_listing([review.dapp_id])
+
+        invalidate_dapp(review.dapp_id)
+
         review_schema = ReviewSchema()
         serialized = review_schema.dump(review).data
 
@@ -208,7 +244,8 @@ class DeleteReview(Resource):
         if not user:
             return {'Error': 'Invalid token'}, 404
 
-        review = Review.get_by_id(review_id)
+        # Locked so the ratings removed from the aggregate are the current ones
+        review = Review.query.filter_by(id=review_id).with_for_update().first()
 
         if not review:
             return {'Error': 'Review does not exist.'}, 404
@@ -216,10 +253,16 @@ class DeleteReview(Resource):
         if user.id != review.user_id:
             return {'Error': 'You do not own this review.'}, 401
 
+        dapp_id = review.dapp_id
+
+        update_rating_aggregate(dapp_id, removed=[(review.rating, review.feature)])
         ReviewLike.query.filter_by(review_id=review_id).delete()
         Review.query.filter_by(id=review_id).delete()
         db.session.commit()
 
+        refresh_dapp_listing([dapp_id])
+        invalidate_dapp(dapp_id)
+
         return True, 200
 
 
@@ -228,6 +271,7 @@ class ReivewOfTheDay(Resource):
     """
     Get review of the day.
     """
+    @cached([REVIEWS, REVIEW_OF_THE_DAY])
     def get(self):
 
         try:
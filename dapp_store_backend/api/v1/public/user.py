@@ -7,6 +7,7 @@ from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_requir
 from boto3 import client
 from sqlalchemy.orm import joinedload
 
+from dapp_store_backend.caching import REVIEWS, dapp_tag, invalidate
 from dapp_store_backend.database import db
 from dapp_store_backend.models.dapp import Dapp
 from dapp_store_backend.models.review import Review
@@ -155,6 +156,10 @@ class UpdateUser(Resource):
 
         db.session.commit()
 
+        # Reviews of the user are shown with the username and picture
+        reviewed = db.session.query(Review.dapp_id).filter(Review.user_id == user.id).distinct().all()
+        invalidate(REVIEWS, *[dapp_tag(x.dapp_id) for x in reviewed])
+
         user_schema = UserSchema(exclude=['profile_picture'])
         user = user_schema.dump(user).data
 
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Response cache of the public endpoints with tag based invalidation.
+
+Every tag has a version token stored in the cache. Cached responses are keyed on the view, its
+arguments, the normalized query args and the current tokens of its tags, so invalidating a tag
+(replacing its token) makes all responses cached with that tag unreachable. Invalidations made
+by celery workers only reach the API when the cache backend is shared, e.g. redis.
+
+The same key is the strong ETag of the response, and the time of the latest invalidation of its
+tags is its Last-Modified date, so conditional requests are answered with 304 Not Modified
+before the view runs. Dates only have a resolution of seconds: If-Modified-Since is only answered
+with 304 when no other version of the tags was created in the second of Last-Modified.
+"""
+from datetime import datetime
+from functools import wraps
+from hashlib import md5
+from time import time
+from uuid import uuid4
+
+from flask import g, request
+from flask_restplus import Resource
+from werkzeug.http import http_date
+
+from dapp_store_backend.database import db
+from dapp_store_backend.extensions import cache
+from dapp_store_backend.models import Category, Dapp
+
+# Tags of data shared by all dapps: latest metrics and rankings
+DAPPS = 'dapps'
+# Tag of the reviews of all dapps, for responses that mix reviews of several dapps
+REVIEWS = 'reviews'
+FEATURED = 'featured'
+DAPP_OF_THE_DAY = 'dapp_of_the_day'
+REVIEW_OF_THE_DAY = 'review_of_the_day'
+
+
+def dapp_tag(dapp_id):
+    return 'dapp:{}'.format(dapp_id)
+
+
+def dapp_list_tag(category):
+    """
+    :param category: DappCategory name
+    """
+    return 'dapp_list:{}'.format(category)
+
+
+def category_key(name):
+    """
+    DappCategory name of a category name, e.g. Exchange -> EXCHANGE.
+    """
+    return name.replace(' ', '_').upper()
+
+
+def normalize_category(value):
+    return (value or '').upper()
+
+
+def normalize_sort(value):
+    return (value or '').lower()
+
+
+def normalize_search(value):
+    return (value or '').strip().lower()
+
+
+def normalize_order(value):
+    # Everything but asc is sorted in descending order
+    return 'asc' if value == 'asc' else 'desc'
+
+
+def _tag_key(tag):
+    return 'tag:{}'.format(tag)
+
+
+def _new_version(previous=None):
+    """
+    Version token of a tag: creation time, time of the version it replaces and a random part.
+    """
+    return '{:.6f}:{:.6f}:{}'.format(time(), version_times(previous)[0] if previous else 0, uuid4().hex)
+
+
+def version_times(version):
+    """
+    :return: (creation time of a version token, time of the version it replaced), 0 if unknown
+    """
+    parts = version.split(':')
+    if len(parts) == 3:
+        return float(parts[0]), float(parts[1])
+
+    # Tokens of seconds and a random part, or without a time from before conditional responses
+    return (int(version.split('.')[0]) if '.' in version else 0), 0
+
+
+def tag_versions(tags):
+    """
+    Current version tokens of tags, created on first use.
+    """
+    keys = [_tag_key(x) for x in tags]
+    versions = cache.get_many(*keys) if keys else []
+
+    missing = {k: _new_version() for k, v in zip(keys, versions) if v is None}
+    if missing:
+        cache.set_many(missing, timeout=0)
+
+    return [v or missing.get(k) for k, v in zip(keys, versions)]
+
+
+def invalidate(*tags):
+    """
+    Invalidate the responses cached with any of the tags.
+    """
+    if tags:
+        keys = [_tag_key(x) for x in tags]
+        cache.set_many({k: _new_version(v) for k, v in zip(keys, cache.get_many(*keys))}, timeout=0)
+
+
+def invalidate_dapp(dapp_id, category=None):
+    """
+    Invalidate the responses of a dapp and of the dapp lists it appears in, after its reviews,
+    ratings or votes change.
+
+    :param category: category name of the dapp, looked up if not given
+    """
+    if category is None:
+        category = (db.session.query(Category.name).join(Dapp, Dapp.category_id == Category.id)
+                    .filter(Dapp.id == dapp_id).scalar())
+
+    tags = [dapp_tag(dapp_id), dapp_list_tag('ALL'), REVIEWS]
+    if category:
+        tags.append(dapp_list_tag(category_key(category)))
+
+    invalidate(*tags)
+
+
+def modified_time(versions):
+    """
+    Last-Modified date of the version tokens of a response, and whether it identifies them: no
+    other version of their tags was created in the same second, which a client may have seen with
+    the same date.
+    """
+    times = [version_times(x) for x in versions]
+    modified = int(max([x[0] for x in times] or [0]))
+
+    unique = sum(1 for x in times for y in x if int(y) == modified) == 1
+    return datetime.utcfromtimestamp(modified), unique
+
+
+def not_modified(etag, last_modified, unique=True):
+    """
+    Whether the conditional headers of the request match the response, If-None-Match takes
+    precedence over If-Modified-Since.
+
+    :param unique: last_modified identifies the response, see modified_time
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+
+    if request.if_modified_since:
+        return unique and last_modified == request.if_modified_since.replace(tzinfo=None)
+
+    return False
+
+
+def cached(tags, query_args=None, timeout=None):
+    """
+    Cache the successful responses of a view, and answer conditional requests for them.
+
+    :param tags: list of tags, or a function of the view arguments returning the tags
+    :param query_args: dict of the query args that change the response to a normalizing function
+    :param timeout: seconds, CACHE_DEFAULT_TIMEOUT if None
+    """
+    query_args = query_args or {}
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            view_tags = tags(*args, **kwargs) if callable(tags) else tags
+            normalized = sorted((k, v(request.args.get(k))) for k, v in query_args.items())
+            # Resource instances of methods are not part of the key
+            view_args = [x for x in args if not isinstance(x, Resource)]
+
+            versions = tag_versions(view_tags)
+            etag = md5(repr((f.__module__, f.__qualname__, view_args, sorted(kwargs.items()), normalized,
+                             versions)).encode('utf-8')).hexdigest()
+            last_modified, unique = modified_time(versions)
+
+            headers = {'ETag': '"{}"'.format(etag),
+                       'Last-Modified': http_date(last_modified)}
+
+            # Views called by other views, e.g. GetDapp by DappOfTheDay, are not conditional
+            nested = g.get('cached_view', False)
+            if not nested and not_modified(etag, last_modified, unique):
+                return None, 304, headers
+
+            key = 'view:' + etag
+            response = cache.get(key)
+            if response is None:
+                g.cached_view = True
+                try:
+                    response = f(*args, **kwargs)
+                finally:
+                    g.cached_view = nested
+
+                status = response[1] if isinstance(response, tuple) else 200
+                if not 200 <= status < 300:
+                    return response
+
+                cache.set(key, response, timeout=timeout)
+
+            data, status = response if isinstance(response, tuple) else (response, 200)
+
+            return data, status, headers
+
+        return decorated
+
+    return decorator
@@ -11,4 +11,9 @@ from .review import Review
 from .review_like import ReviewLike
 from .ranking_name import RankingName
 from .ranking import Ranking
-
+from .rate_limit_bucket import RateLimitBucket
+from .transaction import Transaction
+from .address_sync import AddressSync
+from .dapp_listing import DappListing
+from .dapp_rating_aggregate import DappRatingAggregate
+from .dapp_activity import DappActivity
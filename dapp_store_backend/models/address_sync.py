@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from dapp_store_backend.extensions import db
+from dapp_store_backend.database import (
+    Column,
+    Model,
+)
+
+
+class AddressSync(Model):
+    """
+    Model for the contiguous block range of an address cached in eth_transaction.
+    """
+    __tablename__ = 'address_sync'
+
+    address = Column(db.String(42), primary_key=True)
+    block_start = Column(db.Integer, nullable=False)
+    block_stop = Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return '<AddressSync({address})>'.format(address=self.address)
@@ -13,8 +13,8 @@ class BlockInterval(SurrogatePK, Model):
     Model for all blockchain block intervals.
     """
     __tablename__ = 'block_interval'
+    __table_args__ = (db.UniqueConstraint('blockchain_id', 'time_start'), )
 
-    # TODO: add unique blockchain_id + timestamp restraint
     id = Column(db.Integer, unique=True, nullable=False,
                 primary_key=True, autoincrement=True)
     blockchain_id = Column(db.Integer, db.ForeignKey(
@@ -49,6 +49,7 @@ class Dapp(SurrogatePK, Model):
     blockchain = relationship('Blockchain', back_populates='dapps', lazy='select')
     category = relationship('Category', back_populates='dapps', lazy='select')
     reviews = relationship('Review', back_populates='dapp', lazy='subquery')
+    rating_aggregate = relationship('DappRatingAggregate', uselist=False, lazy='select')
     user = relationship('User', back_populates='dapps', lazy='select')
 
     @hybrid_property
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from dapp_store_backend.extensions import db
+from dapp_store_backend.database import (
+    Column,
+    Model,
+)
+
+# Half-life in seconds of each activity window
+WINDOWS = {'7d': 7 * 24 * 60 * 60, '30d': 30 * 24 * 60 * 60}
+ACTIVITY = ['users', 'volume', 'transactions']
+
+
+class DappActivity(Model):
+    """
+    Model for the activity of a dapp over time: users, volume and transactions of every block
+    interval summed with exponentially decaying weights per window, decayed to time_start.
+    Maintained by services.activity on metric inserts.
+    """
+    __tablename__ = 'dapp_activity'
+
+    dapp_id = Column(db.Integer, db.ForeignKey('dapp.id', ondelete='CASCADE'), primary_key=True)
+    # Start of the latest block interval added
+    time_start = Column(db.Integer, nullable=False)
+    users_7d = Column(db.Float, nullable=False, default=0)
+    volume_7d = Column(db.Float, nullable=False, default=0)
+    transactions_7d = Column(db.Float, nullable=False, default=0)
+    users_30d = Column(db.Float, nullable=False, default=0)
+    volume_30d = Column(db.Float, nullable=False, default=0)
+    transactions_30d = Column(db.Float, nullable=False, default=0)
+
+    @classmethod
+    def empty(cls, dapp_id, time_start):
+        """
+        Activity of a dapp without metrics, not added to the session.
+        """
+        return cls(dapp_id=dapp_id, time_start=time_start,
+                   **{'{}_{}'.format(x, y): 0.0 for x in ACTIVITY for y in WINDOWS})
+
+    def add(self, time_start, metrics):
+        """
+        Add the metrics of the block interval starting at time_start. Intervals can be added in
+        any order, older ones are decayed to time_start of the activity and newer ones move it.
+        """
+        for window, half_life in WINDOWS.items():
+            factor = 0.5 ** (abs(time_start - self.time_start) / half_life)
+
+            for name in ACTIVITY:
+                column = '{}_{}'.format(name, window)
+                value = float(metrics.get(name) or 0)
+
+                if time_start > self.time_start:
+                    setattr(self, column, getattr(self, column) * factor + value)
+                else:
+                    setattr(self, column, getattr(self, column) + value * factor)
+
+        self.time_start = max(self.time_start, time_start)
+
+    def decayed(self, time, window, interval):
+        """
+        Activity per block interval of window at time, the decayed sum scaled by the share of the
+        weights of one interval so it is in the unit of the metrics.
+
+        :param interval: length of a block interval in seconds
+        """
+        half_life = WINDOWS[window]
+        factor = 0.5 ** (max(time - self.time_start, 0) / half_life) * (1 - 0.5 ** (interval / half_life))
+
+        return {x: getattr(self, '{}_{}'.format(x, window)) * factor for x in ACTIVITY}
+
+    def __repr__(self):
+        return '<DappActivity({dapp_id})>'.format(dapp_id=self.dapp_id)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import datetime as dt
+
+from dapp_store_backend.extensions import db
+from dapp_store_backend.database import (
+    Column,
+    JSONB,
+    Model,
+)
+
+SORT_COLUMNS = ['users', 'normalized_volume', 'transactions', 'rating', 'name', 'uploaded_at']
+
+
+class DappListing(Model):
+    """
+    Model for the denormalized dapp list, one row per dapp with its latest metrics, rankings and
+    ratings. Refreshed by services.listing after each ranking run and on review writes.
+    """
+    __tablename__ = 'dapp_listing'
+    # Sorts of the list endpoint, of all dapps and within a category
+    __table_args__ = tuple(y for x in SORT_COLUMNS
+                           for y in (db.Index('ix_dapp_listing_{}'.format(x), x),
+                                     db.Index('ix_dapp_listing_category_{}'.format(x), 'category', x)))
+
+    id = Column(db.Integer, db.ForeignKey('dapp.id', ondelete='CASCADE'), primary_key=True)
+    name = Column(db.String(80), nullable=False)
+    url = Column(db.String(80), nullable=False)
+    tagline = Column(db.String(80), nullable=False)
+    description = Column(db.String(500), nullable=False)
+    logo_path = Column(db.String(100), nullable=False)
+    uploaded_at = Column(db.DateTime, nullable=False)
+    category = Column(db.String(32), nullable=False, index=True)
+    blockchain = Column(db.String(16), nullable=False)
+    rating = Column(db.Numeric, nullable=False, default=0)
+    rating_count = Column(db.Integer, nullable=False, default=0)
+    metrics = Column(JSONB, nullable=True)
+    rankings = Column(JSONB, nullable=False, default=[])
+    # Sort keys of the list endpoint
+    users = Column(db.BigInteger, nullable=False, default=0)
+    volume = Column(db.Numeric, nullable=False, default=0)
+    # Volume in whole coins (ether for ETH dapps), comparable across blockchains
+    normalized_volume = Column(db.Numeric, nullable=False, default=0, server_default='0')
+    transactions = Column(db.BigInteger, nullable=False, default=0)
+    refreshed_at = Column(db.DateTime, nullable=False, default=dt.datetime.utcnow)
+
+    def __repr__(self):
+        return '<DappListing({id})>'.format(id=self.id)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from dapp_store_backend.extensions import db
+from dapp_store_backend.database import (
+    Column,
+    JSONB,
+    Model,
+)
+
+RATINGS = [1, 2, 3, 4, 5]
+
+
+class DappRatingAggregate(Model):
+    """
+    Model for the ratings of the reviews of a dapp: count per star, sum and count of ratings, and
+    sum and count per feature rating. Maintained by services.ratings on review writes.
+    """
+    __tablename__ = 'dapp_rating_aggregate'
+
+    dapp_id = Column(db.Integer, db.ForeignKey('dapp.id', ondelete='CASCADE'), primary_key=True)
+    rating_1 = Column(db.Integer, nullable=False, default=0)
+    rating_2 = Column(db.Integer, nullable=False, default=0)
+    rating_3 = Column(db.Integer, nullable=False, default=0)
+    rating_4 = Column(db.Integer, nullable=False, default=0)
+    rating_5 = Column(db.Integer, nullable=False, default=0)
+    rating_sum = Column(db.Integer, nullable=False, default=0)
+    rating_count = Column(db.Integer, nullable=False, default=0)
+    feature_sums = Column(JSONB, nullable=False, default={})
+    feature_counts = Column(JSONB, nullable=False, default={})
+
+    @classmethod
+    def empty(cls, dapp_id):
+        """
+        Aggregate of a dapp without reviews, not added to the session.
+        """
+        return cls(dapp_id=dapp_id, rating_1=0, rating_2=0, rating_3=0, rating_4=0, rating_5=0,
+                   rating_sum=0, rating_count=0, feature_sums={}, feature_counts={})
+
+    def add(self, rating, features, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) the ratings of a review.
+
+        :param features: counted feature ratings of the review, see services.ratings.feature_ratings
+        """
+        column = 'rating_{}'.format(rating)
+        setattr(self, column, getattr(self, column) + sign)
+        self.rating_sum += sign * rating
+        self.rating_count += sign
+
+        # JSONB columns are only flushed when reassigned
+        feature_sums = dict(self.feature_sums)
+        feature_counts = dict(self.feature_counts)
+
+        for feature, value in features.items():
+            feature_sums[feature] = feature_sums.get(feature, 0) + sign * value
+            feature_counts[feature] = feature_counts.get(feature, 0) + sign
+
+        self.feature_sums = feature_sums
+        self.feature_counts = feature_counts
+
+    def histogram(self):
+        return {x: getattr(self, 'rating_{}'.format(x)) for x in RATINGS}
+
+    def average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+
+    def feature_averages(self, features):
+        return {x: self.feature_sums.get(x, 0) / self.feature_counts[x] if self.feature_counts.get(x) else 0
+                for x in features}
+
+    def __repr__(self):
+        return '<DappRatingAggregate({dapp_id})>'.format(dapp_id=self.dapp_id)
@@ -14,6 +14,7 @@ class Metric(SurrogatePK, Model):
     Model for all dapp metrics.
     """
     __tablename__ = 'metric'
+    __table_args__ = (db.UniqueConstraint('dapp_id', 'block_interval_id'), )
 
     id = Column(db.Integer, unique=True, nullable=False,
                 primary_key=True, autoincrement=True)
@@ -22,6 +23,8 @@ class Metric(SurrogatePK, Model):
     block_interval_id = Column(db.Integer, db.ForeignKey(
         'block_interval.id'), unique=False, nullable=False)
     data = Column(JSONB, unique=False, nullable=False)
+    # Base64 HyperLogLog sketch of the unique users, merged for unique users over windows
+    users_sketch = Column(db.Text, unique=False, nullable=True)
 
     block_interval = relationship('BlockInterval', back_populates='metrics', lazy='select')
 
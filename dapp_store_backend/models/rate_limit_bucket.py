@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from dapp_store_backend.extensions import db
+from dapp_store_backend.database import (
+    Column,
+    Model,
+)
+
+
+class RateLimitBucket(Model):
+    """
+    Model for token buckets shared by the worker rate limiters.
+    """
+    __tablename__ = 'rate_limit_bucket'
+
+    name = Column(db.String(32), primary_key=True)
+    tokens = Column(db.Float, nullable=False)
+    updated = Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return '<RateLimitBucket({name})>'.format(name=self.name)
@@ -15,6 +15,7 @@ class Review(SurrogatePK, Model):
     Model for all dapp reviews.
     """
     __tablename__ = 'review'
+    __table_args__ = (db.Index('ix_review_dapp_id_helpful_count', 'dapp_id', 'helpful_count'), )
 
     # Columns
     id = Column(db.Integer, unique=True, nullable=False,
@@ -30,6 +31,8 @@ class Review(SurrogatePK, Model):
                          default=dt.datetime.utcnow)
     data = Column(JSONB, unique=False, nullable=False, default={})
     verified = Column(db.Boolean, unique=False, nullable=False, default=False)
+    # Number of helpful votes, maintained by the vote endpoints
+    helpful_count = Column(db.Integer, unique=False, nullable=False, default=0, server_default='0')
 
     dapp = relationship('Dapp', back_populates='reviews', lazy='select')
     user = relationship('User', back_populates='reviews', lazy='joined')
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from dapp_store_backend.extensions import db
+from dapp_store_backend.database import (
+    Column,
+    Model,
+)
+
+
+class Transaction(Model):
+    """
+    Model for cached ethereum transactions of an address, as returned by Etherscan.
+    """
+    __tablename__ = 'eth_transaction'
+    __table_args__ = (db.Index('ix_eth_transaction_address_block_number', 'address', 'block_number'), )
+
+    # Columns
+    address = Column(db.String(42), primary_key=True)
+    hash = Column(db.String(66), primary_key=True)
+    block_number = Column(db.Integer, nullable=False)
+    transaction_index = Column(db.Integer, nullable=False)
+    timestamp = Column(db.Integer, nullable=False)
+    from_address = Column(db.String(42), nullable=False)
+    to_address = Column(db.String(42), nullable=False)
+    value = Column(db.Numeric(78, 0), nullable=False)
+    gas_used = Column(db.BigInteger, nullable=False, default=0)
+    gas_price = Column(db.Numeric(78, 0), nullable=False, default=0)
+    receipt_status = Column(db.Boolean, nullable=False)
+    is_error = Column(db.Boolean, nullable=False)
+
+    def __repr__(self):
+        return '<Transaction({hash})>'.format(hash=self.hash)
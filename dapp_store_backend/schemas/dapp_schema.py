@@ -6,6 +6,7 @@ from dapp_store_backend.extensions import ma
 from dapp_store_backend.settings import Config
 from dapp_store_backend.utilities import round_float
 from dapp_store_backend.models.dapp import Dapp
+from dapp_store_backend.models.dapp_rating_aggregate import DappRatingAggregate
 from dapp_store_backend.enums.blockchains import BlockchainEnum
 from .review_schema import ReviewSchema
 from .category_schema import CategorySchema
@@ -32,50 +33,34 @@ class DappSchema(ma.ModelSchema):
     ratings = fields.Method(serialize='bin_ratings')
     avg_rating = fields.Method(serialize='average_rating')
     featured_ratings = fields.Method(serialize='get_featured_ratings')
+    review_count = fields.Method(serialize='count_reviews')
     rankings = fields.Nested(RankingSchema, many=True, only=['name', 'rank'])
 
     class Meta:
         model = Dapp
         exclude = ('email',)
 
+    # Ratings are read from the aggregate of the dapp, maintained on review writes
     @staticmethod
-    def bin_ratings(obj):
-        binned = {1: 0,
-                  2: 0,
-                  3: 0,
-                  4: 0,
-                  5: 0}
-
-        for review in obj.reviews:
-            binned[review.rating] += 1
+    def get_rating_aggregate(obj):
+        return obj.rating_aggregate or DappRatingAggregate.empty(obj.id)
 
-        return binned
+    @staticmethod
+    def bin_ratings(obj):
+        return DappSchema.get_rating_aggregate(obj).histogram()
 
-    # TODO: don't iterate twice during serialization
     @staticmethod
     def average_rating(obj):
-        num_reviews = len(obj.reviews)
-        return 0 if not num_reviews else round_float(sum(x.rating for x in obj.reviews) / num_reviews)
+        return round_float(DappSchema.get_rating_aggregate(obj).average())
 
     @staticmethod
     def get_featured_ratings(obj):
+        ratings = DappSchema.get_rating_aggregate(obj).feature_averages(Config.RATING_TYPES)
+        return {k: round_float(v) for k, v in ratings.items()}
 
-        ratings = {x: [] for x in Config.RATING_TYPES}
-
-        for review in obj.reviews:
-            features = review.feature
-
-            for col in Config.RATING_TYPES:
-                val = features.get(col)
-
-                if val:
-                    ratings[col].append(int(val))
-
-        for col in Config.RATING_TYPES:
-            ratings[col] = sum(ratings[col]) / len(ratings[col]) if ratings[col] else 0
-            ratings[col] = round_float(ratings[col])
-
-        return ratings
+    @staticmethod
+    def count_reviews(obj):
+        return DappSchema.get_rating_aggregate(obj).rating_count
 
     @post_dump
     def format_volume_metrics(self, obj):
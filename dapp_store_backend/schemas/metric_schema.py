@@ -8,3 +8,4 @@ class MetricSchema(ma.ModelSchema):
     """
     class Meta:
         model = Metric
+        exclude = ("users_sketch",)
@@ -14,7 +14,6 @@ class ReviewDappSchema(ma.ModelSchema):
     user = fields.Nested(UserSchema, only='username')
     dapp = fields.Nested(DappSchema, only=['name', 'logo_url'])
     helpful_votes = fields.Nested(ReviewLikeSchema, only='user_id', many=True)
-    helpful_count = fields.Method('count_helpful_votes')
     dapp_name = fields.Method('get_dapp_name')
     logo_url = fields.Method('get_logo_url')
 
@@ -22,10 +21,6 @@ class ReviewDappSchema(ma.ModelSchema):
         model = Review
         exclude = ('data',)
 
-    @staticmethod
-    def count_helpful_votes(obj):
-        return len(obj.helpful_votes)
-
     @staticmethod
     def get_dapp_name(obj):
         return obj.dapp.name
@@ -13,7 +13,6 @@ class ReviewOfTheDaySchema(ma.ModelSchema):
     """
     user = fields.Nested(UserSchema, only='username')
     helpful_votes = fields.Nested(ReviewLikeSchema, only='user_id', many=True)
-    helpful_count = fields.Method('count_helpful_votes')
     dapp_name = fields.Method('flatten_dapp_name')
     dapp_logo = fields.Method('flatten_dapp_logo')
 
@@ -21,10 +20,6 @@ class ReviewOfTheDaySchema(ma.ModelSchema):
         model = Review
         exclude = ('data',)
 
-    @staticmethod
-    def count_helpful_votes(obj):
-        return len(obj.helpful_votes)
-
     @staticmethod
     def flatten_dapp_name(obj):
         return obj.dapp.name
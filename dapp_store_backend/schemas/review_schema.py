@@ -11,16 +11,11 @@ class ReviewSchema(ma.ModelSchema):
     """
     user = fields.Nested('UserSchema', only=['username', 'review_count'])
     helpful_votes = fields.Nested(ReviewLikeSchema, only='user_id', many=True)
-    helpful_count = fields.Method('count_helpful_votes')
 
     class Meta:
         model = Review
         exclude = ('data',)
 
-    @staticmethod
-    def count_helpful_votes(obj):
-        return len(obj.helpful_votes)
-
     @post_dump
     def sort_helpful_votes(self, obj):
         obj['helpful_votes'] = sorted(obj['helpful_votes'])
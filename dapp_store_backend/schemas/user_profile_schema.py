@@ -3,10 +3,12 @@ from flask import current_app
 from marshmallow import fields, post_dump
 
 from dapp_store_backend.extensions import ma
+from dapp_store_backend.models.review import Review
 from dapp_store_backend.models.user import User
 from dapp_store_backend.schemas.blockchain_schema import BlockchainSchema
 from dapp_store_backend.schemas.dapp_list_user_schema import DappListUserSchema
 from dapp_store_backend.schemas.review_dapp_schema import ReviewDappSchema
+from dapp_store_backend.services.ratings import rating_histogram
 
 
 class UserProfileSchema(ma.ModelSchema):
@@ -30,16 +32,7 @@ class UserProfileSchema(ma.ModelSchema):
 
     @staticmethod
     def bin_ratings(obj):
-        binned = {1: 0,
-                  2: 0,
-                  3: 0,
-                  4: 0,
-                  5: 0}
-
-        for review in obj.reviews:
-            binned[review.rating] += 1
-
-        return binned
+        return rating_histogram(Review.user_id == obj.id)
 
     @staticmethod
     def generate_profile_picture_url(obj):
@@ -48,5 +41,5 @@ class UserProfileSchema(ma.ModelSchema):
     @post_dump
     def count_review_likes(self, obj):
         reviews = obj.get('reviews')
-        obj['review_like_count'] = sum([x.get('helpful_count') for x in obj.get('reviews')]) if not reviews else 0
+        obj['review_like_count'] = sum([x.get('helpful_count') for x in reviews]) if reviews else 0
         return obj
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Time-decayed activity of dapps.
+
+The activity row of a dapp holds its users, volume and transactions summed over every block
+interval with weights halving every 7 or 30 days. It is updated in the transaction inserting the
+metrics of an interval, locked with SELECT ... FOR UPDATE like the rating aggregates, so ranking
+reads one row per dapp instead of the metric history.
+"""
+from sqlalchemy.exc import IntegrityError
+
+from dapp_store_backend.database import db
+from dapp_store_backend.models import BlockInterval, DappActivity
+from dapp_store_backend.settings import Config
+
+
+def lock_dapp_activity(dapp_ids, time_start):
+    """
+    Activity of dapps locked until the end of the transaction, missing rows created at time_start.
+
+    :return: dict of dapp id to DappActivity
+    """
+    # Locked in dapp id order so concurrent batches do not deadlock
+    query = (DappActivity.query
+             .filter(DappActivity.dapp_id.in_(dapp_ids))
+             .order_by(DappActivity.dapp_id)
+             .with_for_update())
+    activity = {x.dapp_id: x for x in query.all()}
+    missing = sorted(set(dapp_ids) - set(activity))
+
+    if missing:
+        try:
+            with db.session.begin_nested():
+                db.session.add_all([DappActivity.empty(x, time_start) for x in missing])
+        except IntegrityError:
+            # Created by a concurrent batch of metrics
+            pass
+
+        activity = {x.dapp_id: x for x in query.all()}
+
+    return activity
+
+
+def update_dapp_activity(metrics):
+    """
+    Add metrics being inserted to the activity of their dapps, without committing.
+
+    :param metrics: list of metric rows, dicts with dapp_id, block_interval_id and data
+    """
+    if not metrics:
+        return
+
+    time_starts = dict(db.session.query(BlockInterval.id, BlockInterval.time_start)
+                       .filter(BlockInterval.id.in_({x['block_interval_id'] for x in metrics})).all())
+
+    activity = lock_dapp_activity({x['dapp_id'] for x in metrics}, min(time_starts.values()))
+
+    for metric in metrics:
+        activity[metric['dapp_id']].add(time_starts[metric['block_interval_id']], metric['data'] or {})
+
+
+def dapp_activity(time, interval, window=None):
+    """
+    Activity per block interval of every dapp at time.
+
+    :param interval: length of a block interval in seconds
+    :param window: activity window, RANKING_ACTIVITY_WINDOW by default
+    :return: dict of dapp id to dict of users, volume and transactions
+    """
+    window = window or Config.RANKING_ACTIVITY_WINDOW
+
+    return {x.dapp_id: x.decayed(time, window, interval) for x in DappActivity.query.all()}
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Dapp listing snapshot.
+
+The dapp list is computed from the latest metrics, rankings and ratings of every dapp and
+stored in dapp_listing, so the list endpoint is a single read of that table. The snapshot is
+refreshed after each ranking run and whenever the reviews of a dapp change.
+"""
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import cast
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from sqlalchemy.util import KeyedTuple
+from web3 import Web3
+
+from dapp_store_backend.database import db
+from dapp_store_backend.enums.blockchains import BlockchainEnum
+from dapp_store_backend.enums.categories import DappCategory
+from dapp_store_backend.models import (BlockInterval, Blockchain, Category, Dapp, DappListing, DappRatingAggregate,
+                                       Metric, Ranking, RankingName)
+from dapp_store_backend.settings import Config
+from dapp_store_backend.utilities import round_down_datetime
+
+
+def category_name(category):
+    """
+    Category name of a DappCategory name, e.g. EXCHANGE -> Exchange.
+    """
+    return ' '.join([x.capitalize() for x in category.split('_')])
+
+
+def query_dapp_list(category=DappCategory.ALL.name, dapp_ids=None):
+    """
+    Dapps with their latest metrics, rankings and ratings, computed from the live tables.
+
+    :param category: DappCategory name
+    :param dapp_ids: only these dapps if given
+    :return: list of KeyedTuple
+    """
+    time_start = (int(round_down_datetime(
+        datetime.utcnow(), unit=current_app.config['BLOCK_INTERVAL_UNIT']).timestamp()) -
+                  Config.BLOCK_INTERVAL_SECONDS * 5)
+
+    block_interval_first = db.session.query(func.min(BlockInterval.id)) \
+        .filter(BlockInterval.time_start >= time_start).subquery()
+
+    metric_latest_block_interval_id = (db.session.query(
+        Metric.dapp_id, func.max(Metric.block_interval_id).label('metric_latest_block_interval'))
+                                       .filter(Metric.block_interval_id >= block_interval_first)
+                                       .group_by(Metric.dapp_id)
+                                       .subquery())
+
+    ranking_latest_block_interval_id = (
+        db.session.query(Ranking.dapp_id, func.max(Ranking.block_interval_id).label('ranking_latest_block_interval'))
+        .filter(Ranking.block_interval_id >= block_interval_first)
+        .group_by(Ranking.dapp_id)
+        .subquery('ranking_latest_id'))
+
+    ranking_latest = (db.session.query(Ranking.rank, RankingName.name.label('name'),
+                                       Ranking.dapp_id, Ranking.block_interval_id)
+                      .join(RankingName)
+                      .filter(Ranking.block_interval_id == ranking_latest_block_interval_id.c.ranking_latest_block_interval)
+                      .distinct()
+                      .all())
+
+    ranking_dict = {}
+    for ranking in ranking_latest:
+        ranking_dict.setdefault(ranking.dapp_id, []).append(ranking)
+
+    # Average ratings per dapp from the rating aggregates
+    ratings = db.session.query(DappRatingAggregate.dapp_id,
+                               (cast(DappRatingAggregate.rating_sum, db.Numeric) /
+                                func.nullif(DappRatingAggregate.rating_count, 0)).label('rating'),
+                               DappRatingAggregate.rating_count.label('rating_count'))
+
+    results = Dapp.query \
+        .join(Blockchain, Dapp.blockchain_id == Blockchain.id) \
+        .join(Category, Dapp.category_id == Category.id)
+
+    if category != DappCategory.ALL.name:
+        results = results.filter(Category.name == category_name(category))
+
+    if dapp_ids is not None:
+        ratings = ratings.filter(DappRatingAggregate.dapp_id.in_(dapp_ids))
+        results = results.filter(Dapp.id.in_(dapp_ids))
+
+    ratings = ratings.subquery()
+
+    results = results \
+        .outerjoin(ratings, Dapp.id == ratings.c.dapp_id) \
+        .outerjoin(metric_latest_block_interval_id, Dapp.id == metric_latest_block_interval_id.c.dapp_id) \
+        .outerjoin(Metric, (Dapp.id == Metric.dapp_id) & (
+            Metric.block_interval_id == metric_latest_block_interval_id.c.metric_latest_block_interval)) \
+        .with_entities(Dapp.id, Dapp.name, Dapp.url, Dapp.uploaded_at, Dapp.tagline, Dapp.description,
+                       Dapp.logo_path, Category.name.label('category'), Blockchain.symbol.label('blockchain'),
+                       ratings.c.rating, ratings.c.rating_count, Metric.data.label('metrics')) \
+        .all()
+
+    return [KeyedTuple(r + (ranking_dict.get(r.id, []), ), r.keys() + ['rankings']) for r in results]
+
+
+def normalized_volume(blockchain, volume):
+    """
+    Volume in whole coins, ETH volumes are in wei.
+    """
+    return Web3.fromWei(volume, 'ether') if blockchain == BlockchainEnum.ETH.name else volume
+
+
+def listing_row(result):
+    """
+    dapp_listing row of a query_dapp_list result.
+    """
+    metrics = result.metrics or {}
+
+    return {'id': result.id,
+            'name': result.name,
+            'url': result.url,
+            'tagline': result.tagline,
+            'description': result.description,
+            'logo_path': result.logo_path,
+            'uploaded_at': result.uploaded_at,
+            'category': result.category,
+            'blockchain': result.blockchain,
+            'rating': result.rating or 0,
+            'rating_count': result.rating_count or 0,
+            'metrics': result.metrics,
+            'rankings': [{'name': x.name, 'rank': x.rank} for x in result.rankings],
+            'users': metrics.get('users') or 0,
+            'volume': metrics.get('volume') or 0,
+            'normalized_volume': normalized_volume(result.blockchain, metrics.get('volume') or 0),
+            'transactions': metrics.get('transactions') or 0,
+            'refreshed_at': datetime.utcnow()}
+
+
+def refresh_dapp_listing(dapp_ids=None, retries=3):
+    """
+    Recompute the dapp_listing rows of dapp_ids, or of all dapps. Rows are replaced in one
+    transaction, so readers see either the old or the new snapshot.
+    """
+    for attempt in range(retries):
+        rows = [listing_row(x) for x in query_dapp_list(dapp_ids=dapp_ids)]
+
+        listings = DappListing.query
+        if dapp_ids is not None:
+            listings = listings.filter(DappListing.id.in_(dapp_ids))
+
+        try:
+            listings.delete(synchronize_session=False)
+            if rows:
+                db.session.execute(DappListing.__table__.insert(), rows)
+            db.session.commit()
+            return len(rows)
+        except IntegrityError:
+            # A concurrent refresh inserted the same dapps, recompute on top of it
+            db.session.rollback()
+
+    print('Failed to refresh dapp listing for {}.'.format(dapp_ids or 'all dapps'))
+    return 0
@@ -1,56 +1,308 @@
-import numpy as np 
-
-class RankingDapp(object):
-	"""
-	A simple ranking system for the dapps on dappest. Based on multiple rules, which
-	can be continuously added as functions.
-
-	TODO:
-	- transform entire ranking into a specific algorithm once we know the complete 
-	data contents of each dapp
-
-	By: Adam Li
-
-	General inputs:
-	- list of dapps in json/dict format that contain information about the dapp 
-		- title
-		- downloads
-		- ratings
-	General outputs:
-	- a list of ranks for those dapps
-	"""
-
-	def __init__(self, dapps, keywords=None):
-		self.dapps = dapps
-		self.keywords = keywords
-
-		# initialize the return output; a list of ranks
-		self.ranks = np.zeros((len(self.dapps),1))
-
-	def rankthem(self):
-		# apply all ranking rules
-		self.apply_title_rank()
-		self.apply_download_rank()
-		self.apply_ratings_rank()
-
-	def apply_title_rank(self):
-		for idx, dapp in enumerate(self.dapps):
-			if any(word in dapp['title'] for word in self.keywords):
-				self.ranks[idx] += 1
-
-	def apply_download_rank(self):
-		total_downloads = []
-		for idx, dapp in enumerate(self.dapps):
-			total_downloads.append(dapp['downloads'])
-		total_downloads = np.divide(np.array(total_downloads), np.max(total_downloads))
-		self.ranks += total_downloads
-
-	def apply_ratings_rank(self):
-		for idx, dapp in enumerate(self.dapps):
-			if dapp['rating'] < 3:
-				self.ranks[idx] -= 1
-			elif dapp['rating'] > 3:
-				self.ranks[idx] += 1
+# -*- coding: utf-8 -*-
+"""
+Dapp ranking engine.
 
+Dapps are turned into a feature matrix once, scored with vectorized numpy operations and ranked
+per category by selecting the top N scores with argpartition, so ranking costs a few passes
+over arrays instead of Python loops over dapps.
 
+Scoring functions are registered as strategies by name, all taking the same feature matrix and
+weights, so they can be compared side by side with evaluate_strategies. RANKING_STRATEGY
+selects the one used for the published rankings.
+"""
+from time import perf_counter
 
+import numpy as np
+
+from dapp_store_backend.enums.blockchains import BlockchainEnum
+from dapp_store_backend.enums.categories import DappCategory
+
+# Columns of the feature matrix, activity columns are also kept as time-decayed averages
+FEATURES = ['rating', 'rating_count', 'users', 'volume', 'transactions',
+            'decayed_users', 'decayed_volume', 'decayed_transactions']
+(RATING, RATING_COUNT, USERS, VOLUME, TRANSACTIONS,
+ DECAYED_USERS, DECAYED_VOLUME, DECAYED_TRANSACTIONS) = range(len(FEATURES))
+
+ACTIVITY = [USERS, VOLUME, TRANSACTIONS]
+DECAYED_ACTIVITY = [DECAYED_USERS, DECAYED_VOLUME, DECAYED_TRANSACTIONS]
+
+WEI_PER_ETHER = 1e18
+
+# Scoring functions by name, see strategy
+STRATEGIES = {}
+
+
+def strategy(name):
+    """
+    Register a scoring function f(matrix, weights) -> array of scores under name.
+    """
+    def decorator(f):
+        STRATEGIES[name] = f
+        return f
+
+    return decorator
+
+
+def ranking_weights(config):
+    """
+    Weights of the scoring strategies from the ranking settings.
+    """
+    return {'rating': config.RATING_WEIGHT,
+            'users': config.USER_WEIGHT,
+            'volume': config.VOLUME_WEIGHT,
+            'transactions': config.TRANSACTION_WEIGHT,
+            'max_review_count': config.MAX_REVIEW_COUNT,
+            'prior_count': config.RANKING_PRIOR_COUNT}
+
+
+def category_value(name):
+    """
+    DappCategory value of a category name, e.g. Exchange -> 1, 0 if it has no ranking.
+    """
+    category = DappCategory.__members__.get(name.replace(' ', '_').upper())
+    return category.value if category else 0
+
+
+def feature_matrix(dapps, activity=None):
+    """
+    Features of dapps, volumes in ether for ETH dapps.
+
+    :param dapps: results of services.listing.query_dapp_list
+    :param activity: decayed activity by dapp id, see services.activity.dapp_activity, the latest
+        metrics of dapps without one
+    :return: (array of dapp ids, array of DappCategory values, float matrix of FEATURES per dapp)
+    """
+    count = len(dapps)
+    ids = np.fromiter((x.id for x in dapps), dtype=np.int64, count=count)
+
+    names, inverse = np.unique([x.category for x in dapps], return_inverse=True)
+    categories = np.array([category_value(x) for x in names], dtype=np.int64)[inverse] if count else \
+        np.zeros(0, dtype=np.int64)
+
+    metrics = [x.metrics or {} for x in dapps]
+    activity = [(activity or {}).get(x.id) for x in dapps]
+    matrix = np.empty((count, len(FEATURES)), dtype=np.float64)
+    matrix[:, RATING] = np.fromiter((x.rating or 0 for x in dapps), dtype=np.float64, count=count)
+    matrix[:, RATING_COUNT] = np.fromiter((x.rating_count or 0 for x in dapps), dtype=np.float64, count=count)
+
+    for column, decayed in zip(ACTIVITY, DECAYED_ACTIVITY):
+        # Volumes in wei do not fit in int64, convert through float
+        matrix[:, column] = np.fromiter((float(x.get(FEATURES[column]) or 0) for x in metrics),
+                                        dtype=np.float64, count=count)
+        matrix[:, decayed] = np.fromiter((float(y.get(FEATURES[column]) or 0) if y is not None else x
+                                          for x, y in zip(matrix[:, column], activity)),
+                                         dtype=np.float64, count=count)
+
+    eth = np.fromiter((x.blockchain == BlockchainEnum.ETH.name for x in dapps), dtype=bool, count=count)
+    matrix[eth, VOLUME] /= WEI_PER_ETHER
+    matrix[eth, DECAYED_VOLUME] /= WEI_PER_ETHER
+
+    return ids, categories, matrix
+
+
+def decay(decayed, current, elapsed, half_life):
+    """
+    Exponentially decayed average of activity, the weight of older activity halving every
+    half_life seconds.
+
+    :param decayed: decayed average up to the previous interval
+    :param current: activity of the interval, elapsed seconds after the previous one
+    """
+    factor = 0.5 ** (elapsed / half_life)
+    return decayed * factor + current * (1 - factor)
+
+
+def normalize(values):
+    """
+    Values divided by their max, unchanged if the max is not positive.
+    """
+    top = values.max() if values.size else 0
+    return values / top if top > 0 else values
+
+
+def standardize(values):
+    """
+    z-scores of values, zeros if they are all equal.
+    """
+    deviation = values.std() if values.size else 0
+    return (values - values.mean()) / deviation if deviation > 0 else np.zeros_like(values)
+
+
+def bayesian_rating(matrix, prior_count):
+    """
+    Average rating pulled towards the average of all reviews, as if every dapp had prior_count
+    more reviews with that rating, so a few reviews do not make a top rated dapp.
+    """
+    counts = matrix[:, RATING_COUNT]
+    total = counts.sum()
+    prior = (matrix[:, RATING] * counts).sum() / total if total else 0
+
+    return (prior * prior_count + matrix[:, RATING] * counts) / np.maximum(prior_count + counts, 1)
+
+
+def review_rating(matrix, max_review_count):
+    """
+    Rating out of 1 scaled by the number of reviews, capped at max_review_count.
+    """
+    return (matrix[:, RATING] / 5) * (np.minimum(matrix[:, RATING_COUNT], max_review_count) / max_review_count)
+
+
+def activity_score(matrix, weights, columns=ACTIVITY):
+    """
+    Log of users, volume and transactions relative to the best dapp, weighted.
+    """
+    return sum(normalize(np.log1p(matrix[:, x])) * weights[FEATURES[y]] for x, y in zip(columns, ACTIVITY))
+
+
+@strategy('default')
+def default_score(matrix, weights):
+    """
+    The rating scaled by the number of reviews (capped at max_review_count), plus the activity.
+    """
+    return review_rating(matrix, weights['max_review_count']) * weights['rating'] + activity_score(matrix, weights)
+
+
+@strategy('bayesian')
+def bayesian_score(matrix, weights):
+    """
+    The Bayesian average rating, plus the activity.
+    """
+    return (bayesian_rating(matrix, weights['prior_count']) / 5) * weights['rating'] + activity_score(matrix, weights)
+
+
+@strategy('decayed')
+def decayed_score(matrix, weights):
+    """
+    The default score with time-decayed activity, so a single busy interval moves a dapp less.
+    """
+    return (review_rating(matrix, weights['max_review_count']) * weights['rating'] +
+            activity_score(matrix, weights, DECAYED_ACTIVITY))
+
+
+@strategy('zscore')
+def zscore_score(matrix, weights):
+    """
+    Weighted z-scores of the Bayesian average rating and of the log of the activity, so a metric
+    counts by how far a dapp is from the others rather than from the best one.
+    """
+    rating = standardize(bayesian_rating(matrix, weights['prior_count'])) * weights['rating']
+
+    return rating + sum(standardize(np.log1p(matrix[:, x])) * weights[FEATURES[x]] for x in ACTIVITY)
+
+
+def score(matrix, weights, name='default'):
+    """
+    Scores of every dapp with a registered strategy.
+
+    :param weights: see ranking_weights
+    :raises KeyError: if the strategy does not exist
+    """
+    return STRATEGIES[name](matrix, weights)
+
+
+def top_k(scores, ids, k):
+    """
+    Indexes of the k highest scores, best first and ties broken by lowest dapp id.
+    """
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if k < len(scores):
+        # Keep every score tied with the k-th so ties are broken the same way as a full sort
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+
+    order = np.lexsort((ids[candidates], -scores[candidates]))
+    return candidates[order][:k]
+
+
+def rank_dapps(ids, categories, scores, max_ranking):
+    """
+    Top max_ranking dapps overall and per category.
+
+    :return: dict of ranking name (DappCategory value) to the indexes of the ranked dapps, best first
+    """
+    rankings = {DappCategory.ALL.value: top_k(scores, ids, max_ranking)}
+
+    for category in np.unique(categories[categories > 0]):
+        members = np.flatnonzero(categories == category)
+        rankings[int(category)] = members[top_k(scores[members], ids[members], max_ranking)]
+
+    return rankings
+
+
+def ranking_rows(ids, rankings, block_interval_id):
+    """
+    ranking rows for a bulk insert.
+    """
+    return [{'dapp_id': int(dapp_id),
+             'block_interval_id': block_interval_id,
+             'ranking_name_id': ranking_name_id,
+             'rank': rank}
+            for ranking_name_id, indexes in sorted(rankings.items())
+            for rank, dapp_id in enumerate(ids[indexes], 1)]
+
+
+def rank_stability(previous, current, k):
+    """
+    Stability of a top k ranking between two intervals.
+
+    :param previous: dapp ids of the previous ranking, best first
+    :param current: dapp ids of the current ranking, best first
+    :return: (share of the top k kept, mean absolute rank change of the dapps kept relative to k)
+    """
+    if not k or not len(previous):
+        return 1.0, 0.0
+
+    previous_ranks = {x: i for i, x in enumerate(previous[:k])}
+    kept = [(previous_ranks[x], i) for i, x in enumerate(current[:k]) if x in previous_ranks]
+
+    overlap = len(kept) / min(k, max(len(previous), len(current)))
+    displacement = sum(abs(x - y) for x, y in kept) / len(kept) / k if kept else 1.0
+
+    return overlap, displacement
+
+
+def evaluate_strategies(snapshots, weights, max_ranking, names=None):
+    """
+    Rank each snapshot with every strategy and compare the overall rankings of consecutive
+    snapshots, and with the default strategy. Snapshots are read one at a time.
+
+    :param snapshots: iterable of (ids, categories, matrix) in time order, see feature_matrix
+    :param names: strategies to evaluate, all by default
+    :return: dict of strategy to dict of overlap and displacement (mean rank_stability between
+        consecutive snapshots), agreement (mean share of the top max_ranking in common with the
+        default strategy), seconds (time spent scoring and ranking) and snapshots
+    """
+    names = names or sorted(STRATEGIES)
+    evaluated = ['default'] + [x for x in names if x != 'default']
+    seconds = dict.fromkeys(evaluated, 0)
+    stability = {x: [] for x in evaluated}
+    agreement = {x: [] for x in evaluated}
+    previous = {}
+    count = 0
+
+    for ids, categories, matrix in snapshots:
+        tops = {}
+
+        for name in evaluated:
+            start = perf_counter()
+            rankings = rank_dapps(ids, categories, score(matrix, weights, name), max_ranking)
+            seconds[name] += perf_counter() - start
+
+            tops[name] = ids[rankings[DappCategory.ALL.value]].tolist()
+            if name in previous:
+                stability[name].append(rank_stability(previous[name], tops[name], max_ranking))
+            agreement[name].append(len(set(tops[name]) & set(tops['default'])) / max(len(tops['default']), 1))
+
+        previous = tops
+        count += 1
+
+    return {x: {'overlap': float(np.mean([y[0] for y in stability[x]])) if stability[x] else 1.0,
+                'displacement': float(np.mean([y[1] for y in stability[x]])) if stability[x] else 0.0,
+                'agreement': float(np.mean(agreement[x])) if agreement[x] else 1.0,
+                'seconds': seconds[x],
+                'snapshots': count}
+            for x in names}
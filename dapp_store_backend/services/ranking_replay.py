@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Replay of the stored metrics through the ranking engine, to evaluate ranking strategies offline.
+
+Every block interval start in a time range becomes one feature matrix, with the metrics of that
+interval and the activity decayed over the previous ones. Review history is not stored, so the
+ratings are the current ones in every snapshot.
+"""
+from itertools import groupby
+
+from sqlalchemy import cast
+from sqlalchemy.sql import func
+from sqlalchemy.util import KeyedTuple
+
+from dapp_store_backend.database import db
+from dapp_store_backend.enums.blockchains import BlockchainEnum
+from dapp_store_backend.models import BlockInterval, Blockchain, Category, Dapp, DappRatingAggregate, Metric
+from dapp_store_backend.models.dapp_activity import WINDOWS
+from dapp_store_backend.services import ranking
+from dapp_store_backend.settings import Config
+
+
+def replay_snapshots(time_start, time_stop, window=None):
+    """
+    Feature matrices of the block intervals starting between time_start (inclusive) and
+    time_stop (exclusive), metrics of all blockchains with the same start in one matrix.
+
+    :param window: activity window of the decayed activity, RANKING_ACTIVITY_WINDOW by default
+    :return: generator of (time_start, ids, categories, matrix) in time order
+    """
+    half_life = WINDOWS[window or Config.RANKING_ACTIVITY_WINDOW]
+
+    dapps = (Dapp.query
+             .join(Blockchain, Dapp.blockchain_id == Blockchain.id)
+             .join(Category, Dapp.category_id == Category.id)
+             .outerjoin(DappRatingAggregate, Dapp.id == DappRatingAggregate.dapp_id)
+             .with_entities(Dapp.id, Category.name.label('category'), Blockchain.symbol.label('blockchain'),
+                            (cast(DappRatingAggregate.rating_sum, db.Numeric) /
+                             func.nullif(DappRatingAggregate.rating_count, 0)).label('rating'),
+                            DappRatingAggregate.rating_count.label('rating_count'))
+             .order_by(Dapp.id)
+             .all())
+
+    ids, categories, base = ranking.feature_matrix([KeyedTuple(x + (None, ), x.keys() + ['metrics']) for x in dapps])
+    index = {x.id: i for i, x in enumerate(dapps)}
+    eth = [x.blockchain == BlockchainEnum.ETH.name for x in dapps]
+
+    metrics = (db.session.query(BlockInterval.time_start, Metric.dapp_id, Metric.data)
+               .join(Metric, Metric.block_interval_id == BlockInterval.id)
+               .filter(BlockInterval.time_start >= time_start, BlockInterval.time_start < time_stop)
+               .order_by(BlockInterval.time_start)
+               .yield_per(10000))
+
+    decayed = None
+    previous_start = None
+
+    for interval_start, rows in groupby(metrics, key=lambda x: x.time_start):
+        matrix = base.copy()
+
+        for row in rows:
+            i = index.get(row.dapp_id)
+            if i is None:
+                continue
+
+            for column in ranking.ACTIVITY:
+                matrix[i, column] = float((row.data or {}).get(ranking.FEATURES[column]) or 0)
+            if eth[i]:
+                matrix[i, ranking.VOLUME] /= ranking.WEI_PER_ETHER
+
+        current = matrix[:, ranking.ACTIVITY]
+        decayed = current if decayed is None else \
+            ranking.decay(decayed, current, interval_start - previous_start, half_life)
+        matrix[:, ranking.DECAYED_ACTIVITY] = decayed
+        previous_start = interval_start
+
+        yield interval_start, ids, categories, matrix
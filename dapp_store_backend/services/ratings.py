@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Rating aggregates of dapps.
+
+The aggregate row of a dapp is updated in the transaction of every review insert, update and
+delete, locked with SELECT ... FOR UPDATE so concurrent review writes of a dapp are applied one
+after the other. rebuild_rating_aggregates recomputes them from the reviews.
+"""
+from sqlalchemy import cast
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+
+from dapp_store_backend.database import db
+from dapp_store_backend.models import DappRatingAggregate, Review
+from dapp_store_backend.models.dapp_rating_aggregate import RATINGS
+from dapp_store_backend.settings import Config
+
+
+def valid_rating(rating):
+    """
+    Check a review rating is an integer number of stars, RATINGS.
+    """
+    return isinstance(rating, int) and not isinstance(rating, bool) and rating in RATINGS
+
+
+def feature_ratings(feature):
+    """
+    Feature ratings of a review that are counted, empty and zero ratings are not.
+    """
+    feature = feature or {}
+    ratings = {x: int(feature.get(x)) for x in Config.RATING_TYPES if feature.get(x)}
+    return {k: v for k, v in ratings.items() if v}
+
+
+def feature_rating_column(feature):
+    """
+    SQL expression of a feature rating of a review, NULL when it is not counted.
+    """
+    return cast(func.nullif(func.nullif(Review.feature[feature].astext, ''), '0'), db.Integer)
+
+
+def rating_histogram(*criteria):
+    """
+    Number of reviews per rating of the reviews matching criteria, e.g. Review.user_id == 1.
+    """
+    histogram = {x: 0 for x in RATINGS}
+    histogram.update(db.session.query(Review.rating, func.count(Review.id))
+                     .filter(*criteria)
+                     .group_by(Review.rating).all())
+    return histogram
+
+
+def lock_rating_aggregate(dapp_id):
+    """
+    Aggregate of a dapp locked until the end of the transaction, created if missing.
+    """
+    aggregate = DappRatingAggregate.query.filter_by(dapp_id=dapp_id).with_for_update().first()
+
+    if aggregate is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(DappRatingAggregate.empty(dapp_id))
+        except IntegrityError:
+            # Created by a concurrent review of the dapp
+            pass
+
+        aggregate = DappRatingAggregate.query.filter_by(dapp_id=dapp_id).with_for_update().one()
+
+    return aggregate
+
+
+def update_rating_aggregate(dapp_id, added=(), removed=()):
+    """
+    Apply reviews added to and removed from a dapp to its aggregate, without committing. An
+    updated review is removed with its old ratings and added with the new ones. Reviews with a
+    rating out of RATINGS, stored before ratings were validated, are not counted.
+
+    :param added: list of (rating, feature) of the reviews added
+    :param removed: list of (rating, feature) of the reviews removed
+    """
+    aggregate = lock_rating_aggregate(dapp_id)
+
+    for sign, reviews in ((1, added), (-1, removed)):
+        for rating, feature in reviews:
+            if valid_rating(rating):
+                aggregate.add(rating, feature_ratings(feature), sign)
+
+    return aggregate
+
+
+def rebuild_rating_aggregates(dapp_ids=None):
+    """
+    Recompute the aggregates of dapp_ids, or of all dapps, from their reviews and commit.
+    """
+    histograms = (db.session.query(Review.dapp_id, Review.rating, func.count(Review.id))
+                  .filter(Review.rating.in_(RATINGS))
+                  .group_by(Review.dapp_id, Review.rating))
+    features = (db.session.query(Review.dapp_id, *[y for x in Config.RATING_TYPES
+                                                   for y in (func.sum(feature_rating_column(x)),
+                                                             func.count(feature_rating_column(x)))])
+                .filter(Review.rating.in_(RATINGS))
+                .group_by(Review.dapp_id))
+    aggregates = DappRatingAggregate.query
+
+    if dapp_ids is not None:
+        histograms = histograms.filter(Review.dapp_id.in_(dapp_ids))
+        features = features.filter(Review.dapp_id.in_(dapp_ids))
+        aggregates = aggregates.filter(DappRatingAggregate.dapp_id.in_(dapp_ids))
+
+    rows = {}
+    for dapp_id, rating, count in histograms.all():
+        row = rows.setdefault(dapp_id, dict({'rating_{}'.format(x): 0 for x in RATINGS},
+                                            dapp_id=dapp_id, rating_sum=0, rating_count=0))
+        row['rating_{}'.format(rating)] = count
+        row['rating_sum'] += rating * count
+        row['rating_count'] += count
+
+    for result in features.all():
+        sums = result[1::2]
+        counts = result[2::2]
+        rows[result[0]]['feature_sums'] = {x: int(y) for x, y, z in zip(Config.RATING_TYPES, sums, counts) if z}
+        rows[result[0]]['feature_counts'] = {x: z for x, z in zip(Config.RATING_TYPES, counts) if z}
+
+    aggregates.delete(synchronize_session='fetch')
+    if rows:
+        db.session.execute(DappRatingAggregate.__table__.insert(), list(rows.values()))
+    db.session.commit()
+
+    return len(rows)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Reviews of a dapp, read page by page.
+
+Pages are keyset paginated on (sort column, id): the cursor of a page holds the sort value and
+id of its last review, and the next page is the reviews strictly after it in the sort order, so
+a page costs the same whatever its position and is stable while reviews are added.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import subqueryload
+from sqlalchemy.sql import func
+
+from dapp_store_backend.database import db
+from dapp_store_backend.models import Review
+from dapp_store_backend.schemas.review_schema import ReviewSchema
+from dapp_store_backend.settings import Config
+
+REVIEW_FIELDS = ['review', 'rating', 'id', 'uploaded_at', 'user', 'helpful_votes', 'helpful_count', 'feature', 'title',
+                 'verified']
+
+
+def review_sort_column(sort_by):
+    """
+    Sort expression of a review sort, uploaded_at by default.
+    """
+    if sort_by == 'rating':
+        return Review.rating
+
+    if sort_by == 'helpful_count':
+        return Review.helpful_count
+
+    return Review.uploaded_at
+
+
+def encode_cursor(value, review_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+
+    return urlsafe_b64encode(json.dumps([value, review_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, sort_by):
+    """
+    :return: (sort value, review id)
+    :raises ValueError: if the cursor is not valid for the sort
+    """
+    try:
+        value, review_id = json.loads(urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid cursor.')
+
+    if not isinstance(review_id, int):
+        raise ValueError('Invalid cursor.')
+
+    if sort_by in ('rating', 'helpful_count'):
+        if not isinstance(value, int):
+            raise ValueError('Invalid cursor.')
+        return value, review_id
+
+    if not isinstance(value, str):
+        raise ValueError('Invalid cursor.')
+
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f' if '.' in value else '%Y-%m-%dT%H:%M:%S'), review_id
+    except ValueError:
+        raise ValueError('Invalid cursor.')
+
+
+def review_page(dapp_id, sort_by=None, reverse=True, cursor=None, limit=None):
+    """
+    One page of the reviews of a dapp.
+
+    :param sort_by: rating, helpful_count or uploaded_at (default)
+    :param reverse: descending order
+    :param cursor: next_cursor of the previous page, None for the first page
+    :param limit: page size, REVIEW_PAGE_SIZE by default and at most MAX_REVIEW_PAGE_SIZE
+    :return: (list of serialized reviews, cursor of the next page or None)
+    """
+    limit = min(limit or Config.REVIEW_PAGE_SIZE, Config.MAX_REVIEW_PAGE_SIZE)
+    if limit < 1:
+        raise ValueError('Invalid limit.')
+
+    sort_column = review_sort_column(sort_by)
+
+    query = (db.session.query(Review, sort_column.label('sort_value'))
+             .options(subqueryload(Review.helpful_votes))
+             .filter(Review.dapp_id == dapp_id))
+
+    if cursor:
+        value, review_id = decode_cursor(cursor, sort_by)
+        after = tuple_(sort_column, Review.id)
+        query = query.filter(after < tuple_(value, review_id) if reverse else after > tuple_(value, review_id))
+
+    if reverse:
+        query = query.order_by(sort_column.desc(), Review.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Review.id.asc())
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].sort_value, rows[limit - 1][0].id) if len(rows) > limit else None
+    reviews = [x[0] for x in rows[:limit]]
+
+    # Review counts of the reviewers, without loading their reviews
+    user_ids = {x.user_id for x in reviews}
+    review_counts = dict(db.session.query(Review.user_id, func.count(Review.id))
+                         .filter(Review.user_id.in_(user_ids))
+                         .group_by(Review.user_id).all()) if user_ids else {}
+
+    serialized = ReviewSchema(many=True, only=REVIEW_FIELDS).dump(reviews).data
+
+    for review, data in zip(reviews, serialized):
+        if data.get('user'):
+            data['user']['review_count'] = review_counts.get(review.user_id, 0)
+
+    return serialized, next_cursor
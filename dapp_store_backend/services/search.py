@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Dapp search on the dapp_listing snapshot.
+
+Names are matched as substrings (or prefixes in typeahead mode) of lower(name), backed by a
+pg_trgm GIN index, and words of the name, tagline and description with full-text search on the
+expression of a GIN tsvector index. Matches are ordered by trigram similarity of the name, then
+full-text rank and number of users.
+"""
+import re
+
+from sqlalchemy import literal_column
+from sqlalchemy.sql import func
+
+from dapp_store_backend.models import DappListing
+from dapp_store_backend.settings import Config
+
+# Text search configuration of the search index, names are not stemmed
+SEARCH_CONFIG = literal_column("'simple'")
+
+
+def search_document():
+    """
+    Searched text of a dapp, must be the expression of the ix_dapp_listing_search index.
+    """
+    space = literal_column("' '")
+    return func.to_tsvector(SEARCH_CONFIG, DappListing.name + space + DappListing.tagline + space +
+                            DappListing.description)
+
+
+def escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_words(text):
+    return re.findall(r'\w+', text.lower(), re.UNICODE)
+
+
+def search_dapps(text, prefix=False, limit=None):
+    """
+    Dapps matching a search.
+
+    :param text: searched text
+    :param prefix: typeahead mode, the text is the beginning of the name or of words
+    :param limit: max number of results, SEARCH_LIMIT by default and at most MAX_SEARCH_LIMIT
+    :return: list of DappListing
+    """
+    limit = min(limit or Config.SEARCH_LIMIT, Config.MAX_SEARCH_LIMIT)
+    if limit < 1:
+        raise ValueError('Invalid limit.')
+
+    text = text.strip().lower()
+    words = search_words(text)
+
+    if not words:
+        return []
+
+    name = func.lower(DappListing.name)
+    document = search_document()
+
+    if prefix:
+        # Last word is being typed, every word is a prefix
+        query = func.to_tsquery(SEARCH_CONFIG, ' & '.join('{}:*'.format(x) for x in words))
+        pattern = escape_like(text) + '%'
+    else:
+        query = func.plainto_tsquery(SEARCH_CONFIG, text)
+        pattern = '%' + escape_like(text) + '%'
+
+    return (DappListing.query
+            .filter(name.like(pattern) | document.op('@@')(query))
+            .order_by(func.similarity(name, text).desc(), func.ts_rank(document, query).desc(),
+                      DappListing.users.desc(), DappListing.id)
+            .limit(limit)
+            .all())
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import os
+from tempfile import gettempdir
 from celery.schedules import crontab
 
 
@@ -25,6 +26,18 @@ class Config(object):
     # Metrics interval
     BLOCK_INTERVAL_SECONDS = 60
 
+    # Max number of dapps fetched concurrently by get_dapp_metrics
+    METRICS_CONCURRENCY = 8
+
+    # Metrics of ethereum dapps from the transactions of each address on Etherscan ('etherscan'),
+    # or from one scan of the blocks of the interval on Infura for all dapps ('blocks')
+    METRICS_INGESTION_MODE = os.environ.get('METRICS_INGESTION_MODE', 'etherscan')
+    # Number of blocks fetched at once by the block scan
+    BLOCK_SCAN_WINDOW = 500
+
+    # Number of block intervals completed per backfill_dapp_metrics task
+    BACKFILL_BATCH_SIZE = 10
+
     # User authorization secret
     JWT_TOKEN_SECRET = os.environ.get("JWT_TOKEN_SECRET")
 
@@ -41,6 +54,12 @@ class Config(object):
     TRANSACTION_WEIGHT = 0.2
     MAX_REVIEW_COUNT = 100
     MAX_RANKING = 20
+    # Scoring strategy of the published rankings, see services.ranking.STRATEGIES
+    RANKING_STRATEGY = os.environ.get('RANKING_STRATEGY', 'decayed')
+    # Number of reviews of the prior of the bayesian strategy
+    RANKING_PRIOR_COUNT = 10
+    # Activity window of the decayed strategy, see models.dapp_activity.WINDOWS
+    RANKING_ACTIVITY_WINDOW = '7d'
 
     # CORS settings
     CORS_ORIGIN = get_env_variable_list("CORS_ORIGIN")
@@ -48,13 +67,39 @@ class Config(object):
     # Rating settings
     RATING_TYPES = ['usability', 'value', 'innovation']
 
+    # Review settings, number of reviews per page
+    REVIEW_PAGE_SIZE = 20
+    MAX_REVIEW_PAGE_SIZE = 100
+
+    # Search settings, number of results
+    SEARCH_LIMIT = 10
+    MAX_SEARCH_LIMIT = 50
+
     # API keys
     ETHERSCAN_API_KEY = ''
     INFURA_API_KEY = ''
+    NEOSCAN_API_KEY = ''
 
     # etherscan api constants
     MAXETHERSCAN_LIMIT = 10000  # max number of transcations return
-    ETHERSCAN_RATE_LIMIT = 5
+    ETHERSCAN_RATE_LIMIT = 5  # requests per second
+    ETHERSCAN_CONFIRMATIONS = 12  # blocks behind the latest block synced for reviews, the txlist index lags
+
+    # infura api constants
+    INFURA_RATE_LIMIT = 10  # requests per second
+    INFURA_BATCH_SIZE = 100  # JSON RPC calls per batched request
+
+    # neoscan api constants
+    NEOSCAN_NETWORK = 'main_net'  # or 'test_net'
+    NEOSCAN_CONCURRENCY = 4  # pages fetched concurrently
+
+    # async clients, connections kept per API host and total timeout of a request (seconds)
+    ASYNC_LIMIT_PER_HOST = 4
+    ASYNC_TIMEOUT = 60
+
+    # Rate limit buckets are shared through 'sqlite' (single host) or 'postgres' (all hosts)
+    RATE_LIMIT_BACKEND = 'sqlite'
+    RATE_LIMIT_SQLITE_PATH = os.path.join(gettempdir(), 'dapp_store_backend_rate_limit.sqlite')
 
     # Other settings
     PROPAGATE_EXCEPTIONS = True
@@ -63,7 +108,10 @@ class Config(object):
     ASSETS_DEBUG = False
     DEBUG_TB_ENABLED = False  # Disable Debug toolbar
     DEBUG_TB_INTERCEPT_REDIRECTS = False
-    CACHE_TYPE = 'simple'  # Can be "memcached", "redis", etc.
+    # Response cache, must be shared (e.g. redis) for worker invalidations to reach the API
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')  # Can be "memcached", "redis", etc.
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', '')
+    CACHE_DEFAULT_TIMEOUT = 3600
     MAIL_SERVER = ''
     MAIL_PORT = 587
     MAIL_USE_SSL = False
@@ -79,7 +127,10 @@ class CeleryConfig(Config):
     # Celery settings
     broker_url = ['amqp://{broker_hostname}:5672//vhost1'.format(broker_hostname=x)
                   for x in get_env_variable_list('CELERY_BROKER_HOSTNAME')]
-    result_backend = 'rpc://'
+    # Chords need a result backend shared by all workers, so use the app database
+    result_backend = 'db+postgresql://{user}:{password}@{host}:{port}/{db}'.format(
+        user=Config.POSTGRES_USER, password=Config.POSTGRES_PASSWORD, host=Config.POSTGRES_HOST,
+        port=Config.POSTGRES_PORT, db=Config.POSTGRES_DB)
     imports = ('dapp_store_backend.worker.tasks',)
     task_soft_time_limit = 60
     task_time_limit = 120
@@ -94,6 +145,9 @@ class ProdConfig(Config):
     VERIFIED_USER_MIN_TRANSACTIONS_THRESHOLD = 10
     VERIFIED_USER_MIN_OUT_VOLUME_THRESHOLD = 0.1
 
+    # Rate limit settings
+    RATE_LIMIT_BACKEND = 'postgres'
+
     # Metrics settings
     PERIODIC_TASK_TIME = crontab(hour=0, minute=0)
     BLOCK_INTERVAL_UNIT = 'day'
@@ -106,7 +160,6 @@ class DevConfig(Config):
     DEBUG = True
 
     ASSETS_DEBUG = True  # Don't bundle/minify static assets
-    CACHE_TYPE = 'simple'  # Can be "memcached", "redis", etc.
 
     # Review settings
     VERIFIED_USER_MIN_TRANSACTIONS_THRESHOLD = 0  # set to 10 for production
@@ -122,3 +175,4 @@ class TestConfig(Config):
     TESTING = True
     DEBUG = True
     PRESERVE_CONTEXT_ON_EXCEPTION = False
+    CACHE_TYPE = 'simple'
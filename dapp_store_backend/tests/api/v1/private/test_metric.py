@@ -4,8 +4,10 @@ import json
 import pytest
 
 from dapp_store_backend.enums.status import HTTPCodes
+from dapp_store_backend.models.dapp_activity import DappActivity
 from dapp_store_backend.models.metric import Metric
 from dapp_store_backend.schemas.metric_schema import MetricSchema
+from dapp_store_backend.services.hyperloglog import HyperLogLog
 
 TEST_USERS_COUNT = 100
 TEST_VOLUME_COUNT = 100
@@ -58,3 +60,42 @@ def test_add_metric(session):
     assert response.status_code == HTTPCodes.Success.value
     assert metric_schema.dump(retrieved).data == expected
 
+    # The activity ranked by the decayed strategy includes the metrics
+    assert DappActivity.query.get(1).users_7d == TEST_USERS_COUNT
+
+
+@pytest.mark.usefixtures('session')
+def test_get_unique_users(session):
+    """
+    Test estimating unique users of a dapp from the stored users sketches.
+    """
+    client = session.app.test_client()
+    users_sketch = HyperLogLog().update('0x{:040x}'.format(i) for i in range(TEST_USERS_COUNT))
+
+    payload = {
+        'metrics': [
+            {
+                'dapp_id': 1,
+                'block_interval_id': 1,
+                'metrics': {
+                    'users': TEST_USERS_COUNT,
+                    'volume': TEST_VOLUME_COUNT,
+                    'transactions': TEST_TRANSACT_COUNT,
+                },
+                'users_sketch': users_sketch.to_base64()
+            }
+        ]
+    }
+
+    client.post('/api/v1/private/metric/add',
+                data=json.dumps(payload),
+                follow_redirects=True,
+                content_type='application/json')
+
+    response = client.get('/api/v1/private/metric/users/1')
+    retrieved = json.loads(response.data)
+
+    assert response.status_code == HTTPCodes.Success.value
+    assert retrieved['intervals'] == 1
+    assert retrieved['missing_sketches'] == 0
+    assert retrieved['users'] == users_sketch.count()
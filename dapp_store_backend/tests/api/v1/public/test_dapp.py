@@ -1,10 +1,16 @@
 """Public review API unit tests."""
+from datetime import datetime
+
 import pytest
 
 from dapp_store_backend.enums.status import HTTPCodes
 from dapp_store_backend.models.daily_item import DailyItem
 from dapp_store_backend.models.dapp import Dapp
+from dapp_store_backend.models.dapp_listing import DappListing
+from dapp_store_backend.models.review import Review
 from dapp_store_backend.schemas.dapp_list_address_schema import DappListAddressSchema
+from dapp_store_backend.services.listing import normalized_volume, refresh_dapp_listing
+from dapp_store_backend.services.reviews import encode_cursor
 
 @pytest.mark.usefixtures('session')
 def test_list_dapps(session):
@@ -83,3 +89,123 @@ def test_change_dapp_of_theday(session):
 
     assert response.status_code == HTTPCodes.Success.value
     assert response.json.get('id') == dapp_id.item_id
+
+
+@pytest.mark.usefixtures('session')
+def test_list_dapps_snapshot(session):
+    """
+    Test the public dapp list is read from the listing snapshot, refreshed on review writes.
+    """
+    client = session.app.test_client()
+    refresh_dapp_listing()
+
+    response = client.get('/api/v1/public/dapp/list?category=ALL&sort=rating',
+                          follow_redirects=True)
+
+    assert response.status_code == HTTPCodes.Success.value
+    assert DappListing.query.count() == len(response.json)
+
+    dapp = next(x for x in response.json if x.get('id') == 1)
+    assert dapp.get('rating_count') == 2
+
+    Review.query.filter_by(dapp_id=1, title='Worst Dapp Ever').delete()
+    session.commit()
+    refresh_dapp_listing([1])
+
+    assert DappListing.query.get(1).rating_count == 1
+
+
+@pytest.mark.usefixtures('session')
+def test_get_dapp_reviews_sort_case(session):
+    """
+    Test sort values differing in case are sorted the same, they share a cached response.
+    """
+    client = session.app.test_client()
+
+    # Oldest review with the best rating
+    session.add(Review(dapp_id=1, user_id=1, rating=5, title='Good Dapp', review='Review here.',
+                       uploaded_at=datetime(2018, 1, 1)))
+    session.commit()
+
+    for sort in ('Rating', 'rating'):
+        response = client.get('/api/v1/public/dapp/1/reviews?sort={}&order=desc&limit=1'.format(sort),
+                              follow_redirects=True)
+
+        assert response.status_code == HTTPCodes.Success.value
+        assert response.json.get('reviews')[0].get('rating') == 5
+
+
+def test_normalized_volume():
+    """
+    Test ETH volumes in wei and NEO volumes sort in the same unit.
+    """
+    assert normalized_volume('ETH', 2 * 10 ** 18) == 2
+    assert normalized_volume('NEO', 5) == 5
+    assert normalized_volume('ETH', 10 ** 18) < normalized_volume('NEO', 5)
+
+
+@pytest.mark.usefixtures('session')
+def test_get_dapp_reviews(session):
+    """
+    Test the reviews of a dapp are paginated with a cursor, and the dapp only returns the first page.
+    """
+    client = session.app.test_client()
+
+    response = client.get('/api/v1/public/dapp/1', follow_redirects=True)
+
+    assert response.status_code == HTTPCodes.Success.value
+    assert response.json.get('ratings').get('1') == 2
+    assert response.json.get('avg_rating') == 1
+    assert len(response.json.get('reviews')) == 2
+    assert response.json.get('next_cursor') is None
+
+    response = client.get('/api/v1/public/dapp/1/reviews?sort=uploaded_at&order=asc&limit=1',
+                          follow_redirects=True)
+
+    assert response.status_code == HTTPCodes.Success.value
+    first = response.json.get('reviews')
+    assert len(first) == 1
+    assert first[0].get('user').get('review_count') == 2
+
+    response = client.get('/api/v1/public/dapp/1/reviews?sort=uploaded_at&order=asc&limit=1&cursor={}'.format(
+        response.json.get('next_cursor')), follow_redirects=True)
+
+    second = response.json.get('reviews')
+    assert len(second) == 1
+    assert second[0].get('id') != first[0].get('id')
+    assert response.json.get('next_cursor') is None
+
+    response = client.get('/api/v1/public/dapp/1/reviews?cursor=invalid', follow_redirects=True)
+    assert response.status_code == 400
+
+    # Well-formed cursors with a value that is not a date
+    for value in (5, 'yesterday'):
+        response = client.get('/api/v1/public/dapp/1/reviews?cursor={}'.format(encode_cursor(value, 1)),
+                              follow_redirects=True)
+        assert response.status_code == 400
+
+
+@pytest.mark.usefixtures('session')
+def test_search_dapps(session):
+    """
+    Test search matches names, words of the tagline and name prefixes, with a limit.
+    """
+    client = session.app.test_client()
+    refresh_dapp_listing()
+
+    response = client.get('/api/v1/public/dapp/search?name=kitt', follow_redirects=True)
+
+    assert response.status_code == HTTPCodes.Success.value
+    assert [x.get('id') for x in response.json] == [1]
+
+    response = client.get('/api/v1/public/dapp/search?name=tagline', follow_redirects=True)
+    assert [x.get('id') for x in response.json] == [1]
+
+    response = client.get('/api/v1/public/dapp/search?name=Crypto&mode=prefix', follow_redirects=True)
+    assert [x.get('id') for x in response.json] == [1]
+
+    response = client.get('/api/v1/public/dapp/search?name=kitties&mode=prefix', follow_redirects=True)
+    assert response.json == []
+
+    response = client.get('/api/v1/public/dapp/search?name=crypto&limit=-1', follow_redirects=True)
+    assert response.status_code == 400
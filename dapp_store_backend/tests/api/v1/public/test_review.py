@@ -1,10 +1,12 @@
 """Public review API unit tests."""
 import json
 import pytest
+from flask_jwt_extended import create_access_token
 
 from dapp_store_backend.enums.status import HTTPCodes
 from dapp_store_backend.models.daily_item import DailyItem
 from dapp_store_backend.models.review import Review
+from dapp_store_backend.models.user import User
 
 
 @pytest.mark.usefixtures('session')
@@ -47,3 +49,42 @@ def test_change_review_of_the_day(session):
     assert response.status_code == HTTPCodes.Success.value
     assert response.json.get('id') == review_id.item_id
 
+
+@pytest.mark.usefixtures('session')
+def test_vote_review_helpful_count(session):
+    """
+    Test helpful votes are counted on the review.
+    :param session:
+    :return:
+    """
+    client = session.app.test_client()
+
+    user = User.get_by_id(1)
+    token = create_access_token({'id': user.id, 'address': user.address})
+    headers = {'Authorization': 'Bearer {}'.format(token)}
+    payload = json.dumps({'review_id': 1})
+
+    response = client.put('/api/v1/public/review/vote', data=payload, headers=headers,
+                          content_type='application/json', follow_redirects=True)
+
+    assert response.status_code == HTTPCodes.Success.value
+    assert Review.get_by_id(1).helpful_count == 1
+
+    # Second vote of the same user is rejected and not counted
+    response = client.put('/api/v1/public/review/vote', data=payload, headers=headers,
+                          content_type='application/json', follow_redirects=True)
+
+    assert response.status_code == 404
+    assert Review.get_by_id(1).helpful_count == 1
+
+    response = client.put('/api/v1/public/review/vote/delete', data=payload, headers=headers,
+                          content_type='application/json', follow_redirects=True)
+
+    assert response.status_code == HTTPCodes.Success.value
+    assert Review.get_by_id(1).helpful_count == 0
+
+    response = client.put('/api/v1/public/review/vote/delete', data=payload, headers=headers,
+                          content_type='application/json', follow_redirects=True)
+
+    assert response.status_code == 400
+    assert Review.get_by_id(1).helpful_count == 0
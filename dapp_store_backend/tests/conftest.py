@@ -5,6 +5,7 @@ import pytest
 from dapp_store_backend.settings import TestConfig
 from dapp_store_backend.app import create_app
 from dapp_store_backend.database import db as _db
+from dapp_store_backend.extensions import cache
 
 from dapp_store_backend.models.user import User
 from dapp_store_backend.models.blockchain import Blockchain
@@ -13,6 +14,7 @@ from dapp_store_backend.models.category import Category
 from dapp_store_backend.models.dapp import Dapp
 from dapp_store_backend.models.daily_item import DailyItem
 from dapp_store_backend.models.review import Review
+from dapp_store_backend.services.ratings import rebuild_rating_aggregates
 
 
 @pytest.fixture(scope='session')
@@ -31,6 +33,8 @@ def db(app):
     _db.app = app
 
     with app.app_context():
+        # Used by the dapp search
+        _db.engine.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
         _db.create_all()
 
         initialize(_db)
@@ -54,6 +58,9 @@ def session(db):
     # TODO: remove - SUPER HACKY
     session.app = db.app
 
+    # Cached responses of other tests are not valid in this transaction
+    cache.clear()
+
     yield session
 
     transaction.rollback()
@@ -123,3 +130,5 @@ def initialize(db):
     db.session.add(review_of_the_day)
     db.session.add(dapp_of_the_day)
     db.session.commit()
+
+    rebuild_rating_aggregates()
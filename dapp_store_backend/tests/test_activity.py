@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Dapp activity unit tests."""
+import pytest
+
+from dapp_store_backend.models.block_interval import BlockInterval
+from dapp_store_backend.models.dapp_activity import DappActivity
+from dapp_store_backend.services.activity import dapp_activity, update_dapp_activity
+
+DAY = 24 * 60 * 60
+
+
+def test_add_any_order():
+    metrics = [(0, {'users': 8, 'volume': 10 ** 18, 'transactions': 16}),
+               (7 * DAY, {'users': 4, 'transactions': 2}),
+               (14 * DAY, {'users': 2})]
+
+    forward = DappActivity.empty(1, 0)
+    for time_start, data in metrics:
+        forward.add(time_start, data)
+
+    backward = DappActivity.empty(1, 14 * DAY)
+    for time_start, data in reversed(metrics):
+        backward.add(time_start, data)
+
+    assert forward.time_start == backward.time_start == 14 * DAY
+    assert forward.users_7d == pytest.approx(backward.users_7d) == pytest.approx(2 + 4 / 2 + 8 / 4)
+    assert forward.transactions_7d == pytest.approx(backward.transactions_7d) == pytest.approx(1 + 4)
+    assert forward.volume_30d == pytest.approx(backward.volume_30d) == pytest.approx(10 ** 18 * 0.5 ** (14 / 30))
+
+    decayed = forward.decayed(21 * DAY, '7d', DAY)
+    assert decayed['users'] == pytest.approx(3 * (1 - 0.5 ** (1 / 7)))
+
+
+@pytest.mark.usefixtures('session')
+def test_update_dapp_activity(session):
+    intervals = [BlockInterval(blockchain_id=1, time_start=x * DAY, time_stop=(x + 1) * DAY) for x in (1, 8)]
+    session.add_all(intervals)
+    session.commit()
+
+    update_dapp_activity([{'dapp_id': 1, 'block_interval_id': intervals[1].id, 'data': {'users': 4}},
+                          {'dapp_id': 2, 'block_interval_id': intervals[1].id, 'data': None}])
+    session.commit()
+    update_dapp_activity([{'dapp_id': 1, 'block_interval_id': intervals[0].id, 'data': {'users': 8}}])
+    session.commit()
+
+    activity = DappActivity.query.get(1)
+    assert activity.time_start == 8 * DAY
+    assert activity.users_7d == pytest.approx(8)
+
+    activity = dapp_activity(8 * DAY, DAY, '7d')
+    assert activity[1]['users'] == pytest.approx(8 * (1 - 0.5 ** (1 / 7)))
+    assert activity[2] == {'users': 0, 'volume': 0, 'transactions': 0}
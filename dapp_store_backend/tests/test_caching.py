@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Response cache unit tests."""
+from dapp_store_backend.caching import cached, dapp_tag, invalidate, normalize_sort
+from dapp_store_backend.extensions import cache
+
+
+def test_cached_view(app):
+    cache.clear()
+    calls = []
+
+    @cached(lambda dapp_id: ['test', dapp_tag(dapp_id)], query_args={'sort': normalize_sort})
+    def view(dapp_id):
+        calls.append(dapp_id)
+        return {'id': dapp_id}, 200
+
+    with app.test_request_context('/?sort=Rating'):
+        assert view(1)[:2] == ({'id': 1}, 200)
+        assert view(1)[:2] == ({'id': 1}, 200)
+        assert calls == [1]
+
+    # Query args are normalized, unrelated args are ignored
+    with app.test_request_context('/?sort=rating&foo=bar'):
+        view(1)
+        assert calls == [1]
+
+        view(2)
+        assert calls == [1, 2]
+
+        invalidate(dapp_tag(2))
+        view(1)
+        assert calls == [1, 2]
+
+        invalidate(dapp_tag(1))
+        view(1)
+        assert calls == [1, 2, 1]
+
+        invalidate('test')
+        view(1)
+        view(2)
+        assert calls == [1, 2, 1, 1, 2]
+
+
+def test_cached_view_errors(app):
+    cache.clear()
+    calls = []
+
+    @cached(['test'])
+    def view():
+        calls.append(1)
+        return {'Error': 'Failed.'}, 404
+
+    with app.test_request_context('/'):
+        view()
+        view()
+        assert len(calls) == 2
+
+
+def test_conditional_view(app):
+    cache.clear()
+    calls = []
+
+    @cached(['test'])
+    def view():
+        calls.append(1)
+        return {'id': 1}, 200
+
+    with app.test_request_context('/'):
+        data, status, headers = view()
+        assert (data, status) == ({'id': 1}, 200)
+
+    etag = headers['ETag']
+    last_modified = headers['Last-Modified']
+
+    with app.test_request_context('/', headers={'If-None-Match': etag}):
+        assert view() == (None, 304, headers)
+
+    with app.test_request_context('/', headers={'If-Modified-Since': last_modified}):
+        assert view()[1] == 304
+
+    with app.test_request_context('/', headers={'If-None-Match': '"other"', 'If-Modified-Since': last_modified}):
+        assert view()[1] == 200
+
+    invalidate('test')
+
+    with app.test_request_context('/', headers={'If-None-Match': etag}):
+        data, status, new_headers = view()
+        assert status == 200
+        assert new_headers['ETag'] != etag
+
+    # Invalidated again in the second of the date seen by the client
+    with app.test_request_context('/', headers={'If-Modified-Since': last_modified}):
+        assert view()[1] == 200
+
+    assert len(calls) == 2
@@ -0,0 +1,38 @@
+"""HyperLogLog unit tests."""
+import pytest
+
+from dapp_store_backend.services.hyperloglog import HyperLogLog
+
+
+def addresses(start, stop):
+    return ('0x{:040x}'.format(i) for i in range(start, stop))
+
+
+@pytest.mark.parametrize('cardinality', [10, 1000, 100000])
+def test_count(cardinality):
+    sketch = HyperLogLog().update(addresses(0, cardinality))
+    assert sketch.count() == pytest.approx(cardinality, rel=0.05)
+
+
+def test_merge_overlapping_sketches():
+    """
+    Users active in several intervals are only counted once in the merged sketch.
+    """
+    first = HyperLogLog().update(addresses(0, 30000))
+    second = HyperLogLog().update(addresses(20000, 50000))
+
+    merged = HyperLogLog.merge_all([first.to_base64(), second.to_base64()])
+
+    assert merged.count() == pytest.approx(50000, rel=0.05)
+    assert merged.count() == HyperLogLog().update(addresses(0, 50000)).count()
+
+
+def test_serialization_roundtrip():
+    sketch = HyperLogLog(p=10).update(addresses(0, 500))
+    restored = HyperLogLog.from_base64(sketch.to_base64())
+
+    assert restored.p == 10
+    assert restored.count() == sketch.count()
+
+    with pytest.raises(ValueError):
+        restored.merge(HyperLogLog(p=12))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Ranking engine unit tests."""
+from collections import namedtuple
+
+import numpy as np
+
+from dapp_store_backend.enums.categories import DappCategory
+from dapp_store_backend.services import ranking
+
+Dapp = namedtuple('Dapp', ['id', 'category', 'blockchain', 'rating', 'rating_count', 'metrics'])
+
+WEIGHTS = dict(rating=0.4, users=0.2, volume=0.2, transactions=0.2, max_review_count=100, prior_count=10)
+
+
+def test_feature_matrix():
+    dapps = [Dapp(1, 'Exchange', 'ETH', 4.5, 10, {'users': 3, 'volume': 2 * 10 ** 18, 'transactions': 5}),
+             Dapp(2, 'Games', 'NEO', None, None, None)]
+
+    ids, categories, matrix = ranking.feature_matrix(dapps)
+
+    assert ids.tolist() == [1, 2]
+    assert categories.tolist() == [DappCategory.EXCHANGE.value, DappCategory.GAMES.value]
+    assert matrix.tolist() == [[4.5, 10, 3, 2, 5, 3, 2, 5], [0, 0, 0, 0, 0, 0, 0, 0]]
+
+    _, _, matrix = ranking.feature_matrix(dapps, {1: {'users': 1.5, 'volume': 10 ** 18, 'transactions': 2}})
+
+    assert matrix[:, ranking.DECAYED_ACTIVITY].tolist() == [[1.5, 1, 2], [0, 0, 0]]
+
+
+def test_score():
+    matrix = np.array([[5, 200, 0, 0, 0, 0, 0, 0], [0, 0, np.e - 1, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 0, 0, 0]],
+                      dtype=np.float64)
+
+    scores = ranking.score(matrix, WEIGHTS)
+
+    assert np.allclose(scores, [0.4, 0.2, 0])
+
+
+def test_rank_dapps():
+    ids = np.array([10, 11, 12, 13, 14])
+    categories = np.array([1, 1, 3, 3, 0])
+    scores = np.array([0.1, 0.5, 0.5, 0.9, 0.3])
+
+    rankings = ranking.rank_dapps(ids, categories, scores, 3)
+
+    assert ids[rankings[DappCategory.ALL.value]].tolist() == [13, 11, 12]
+    assert ids[rankings[1]].tolist() == [11, 10]
+    assert ids[rankings[3]].tolist() == [13, 12]
+    assert 0 not in rankings
+
+    rows = ranking.ranking_rows(ids, rankings, 7)
+    assert rows[0] == {'dapp_id': 11, 'block_interval_id': 7, 'ranking_name_id': 1, 'rank': 1}
+    assert len(rows) == 7
+
+
+def test_top_k_ties():
+    ids = np.arange(6)
+    scores = np.array([1, 2, 2, 2, 2, 0], dtype=np.float64)
+
+    assert ranking.top_k(scores, ids, 2).tolist() == [1, 2]
+    assert ranking.top_k(scores, ids, 10).tolist() == [1, 2, 3, 4, 0, 5]
+    assert ranking.top_k(scores, ids, 0).tolist() == []
+
+
+def test_strategies():
+    # Dapp 1 has a perfect rating from 2 reviews, dapp 2 a good rating from 100 reviews, dapp 3
+    # was busy in the past but not in the latest interval and dapp 4 has a poor rating
+    matrix = np.array([[5, 2, 10, 0, 10, 10, 0, 10],
+                       [4, 100, 10, 0, 10, 10, 0, 10],
+                       [0, 0, 1, 0, 1, 1000, 0, 1000],
+                       [2, 100, 0, 0, 0, 0, 0, 0]], dtype=np.float64)
+
+    scores = {x: ranking.score(matrix, WEIGHTS, x) for x in ranking.STRATEGIES}
+
+    assert sorted(scores) == ['bayesian', 'decayed', 'default', 'zscore']
+    assert scores['bayesian'][1] > scores['bayesian'][0]
+    assert scores['decayed'][2] > scores['decayed'][0]
+    assert scores['default'][2] < scores['default'][0]
+    assert np.isclose(scores['zscore'].sum(), 0)
+
+    rating = ranking.bayesian_rating(matrix, 10)
+    prior = (5 * 2 + 4 * 100 + 2 * 100) / 202
+    assert np.isclose(rating[0], (prior * 10 + 5 * 2) / 12)
+    assert np.isclose(rating[2], prior)
+
+
+def test_decay():
+    assert ranking.decay(np.array([8.0]), np.array([0.0]), 7, 7).tolist() == [4]
+    assert ranking.decay(np.array([8.0]), np.array([8.0]), 1, 7).tolist() == [8]
+
+
+def test_evaluate_strategies():
+    ids = np.array([1, 2, 3, 4])
+    categories = np.array([1, 1, 2, 2])
+    snapshots = [(ids, categories, np.array([[0, 0, x, 0, 0, y, 0, 0] for x, y in users], dtype=np.float64))
+                 for users in ([(4, 4), (3, 3), (2, 2), (1, 1)],
+                               [(1, 3), (2, 3), (3, 2), (4, 1)])]
+
+    report = ranking.evaluate_strategies(snapshots, WEIGHTS, 2, ['decayed', 'default'])
+
+    assert sorted(report) == ['decayed', 'default']
+    assert report['default']['snapshots'] == 2
+    assert report['default']['overlap'] == 0
+    assert report['default']['agreement'] == 1
+    assert report['decayed']['overlap'] == 1
+    assert report['decayed']['agreement'] == 0.5
+
+
+def test_rank_stability():
+    assert ranking.rank_stability([1, 2, 3], [1, 2, 3], 3) == (1, 0)
+    assert ranking.rank_stability([1, 2, 3], [3, 2, 4], 3) == (2 / 3, 1 / 3)
+    assert ranking.rank_stability([], [1], 3) == (1, 0)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Rating aggregate unit tests."""
+import pytest
+
+from dapp_store_backend.models.dapp_rating_aggregate import DappRatingAggregate
+from dapp_store_backend.services.ratings import (feature_ratings, rating_histogram, rebuild_rating_aggregates,
+                                                 update_rating_aggregate, valid_rating)
+from dapp_store_backend.models.review import Review
+from dapp_store_backend.worker.tasks import add_review
+
+
+def test_feature_ratings():
+    assert feature_ratings(None) == {}
+    assert feature_ratings({'usability': '4', 'value': 0, 'innovation': '', 'other': 5}) == {'usability': 4}
+
+
+def test_valid_rating():
+    assert valid_rating(1) and valid_rating(5)
+    assert not any(valid_rating(x) for x in (0, 6, '4', 4.0, True, None))
+
+
+@pytest.mark.usefixtures('session')
+def test_update_rating_aggregate(session):
+    rebuild_rating_aggregates([1])
+
+    aggregate = DappRatingAggregate.query.get(1)
+    assert aggregate.histogram() == rating_histogram(Review.dapp_id == 1)
+    assert aggregate.rating_count == 2
+    assert aggregate.average() == 1
+
+    update_rating_aggregate(1, added=[(5, {'usability': 4}), (3, {'usability': '2', 'value': 5})])
+    session.commit()
+
+    aggregate = DappRatingAggregate.query.get(1)
+    assert aggregate.histogram() == {1: 2, 2: 0, 3: 1, 4: 0, 5: 1}
+    assert aggregate.average() == 2.5
+    assert aggregate.feature_averages(['usability', 'value', 'innovation']) == {'usability': 3, 'value': 5,
+                                                                               'innovation': 0}
+
+    update_rating_aggregate(1, added=[(4, {})], removed=[(5, {'usability': 4})])
+    session.commit()
+
+    aggregate = DappRatingAggregate.query.get(1)
+    assert aggregate.histogram() == {1: 2, 2: 0, 3: 1, 4: 1, 5: 0}
+    assert aggregate.feature_averages(['usability']) == {'usability': 2}
+
+
+@pytest.mark.usefixtures('session')
+def test_add_review_task(session):
+    rebuild_rating_aggregates([1])
+    metrics = {'result': {'in_volume': 0, 'out_volume': 0, 'transactions': 0}}
+    review = {'dapp_id': 1, 'rating': 5, 'title': 'Great Dapp', 'review': 'Works as advertised.',
+              'feature': {'usability': 4}}
+
+    result = add_review(metrics, 1, review)
+    assert result.get('rating') == 5
+    assert DappRatingAggregate.query.get(1).rating_count == 3
+
+    result = add_review(metrics, 1, dict(review, rating=7))
+    assert result == {'status': 'FAILED', 'message': 'Invalid rating.'}
+    assert DappRatingAggregate.query.get(1).rating_count == 3
+    assert Review.query.filter_by(dapp_id=1).count() == 3
@@ -15,3 +15,10 @@ class Metric(Enum):
     users = 1
     volume = 2
     transactions = 3
+    failed_transactions = 4
+    failed_ratio = 5
+    gas_used = 6
+    gas_fees = 7
+    hourly_transactions = 8
+    new_users = 9
+    returning_users = 10
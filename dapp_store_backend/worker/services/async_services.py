@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio counterparts of the Etherscan, Infura and Neoscan clients.
+
+A client keeps one aiohttp session with pooled keep-alive connections, limited to
+limit_per_host concurrent connections and timing out after timeout seconds. Clients are used
+as async context managers inside a coroutine run with run, e.g. from a celery task:
+
+    async def fetch(addresses):
+        async with AsyncEtherscan(api_key) as etherscan:
+            return await asyncio.gather(*[etherscan.get_balance(x) for x in addresses])
+
+    balances = run(fetch(addresses))
+"""
+import asyncio
+
+import aiohttp
+from werkzeug.exceptions import BadRequest
+
+from dapp_store_backend.enums.status import HTTPCodes
+from dapp_store_backend.worker.constants import Network
+from dapp_store_backend.worker.services.base import BaseService
+from dapp_store_backend.worker.services.etherscan import (STREAM_BATCH_SIZE, STREAM_CHUNK_SIZE, STREAM_PREFETCH,
+                                                          EtherscanAPI, close_response)
+from dapp_store_backend.worker.services.infura import InfuraAPI
+from dapp_store_backend.worker.services.neoscan import NeoscanAPI
+from dapp_store_backend.worker.services.json_stream import NEED_DATA, JSONArrayStream
+from dapp_store_backend.worker.services.range_planner import MAX_RESULTS, block_number, remaining_ranges
+
+
+def run(coroutine):
+    """
+    Run a coroutine to completion in a new event loop.
+    """
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AsyncService(BaseService):
+    """
+    Base class of the async clients.
+    """
+
+    def __init__(self, rate_limiter=None, limit_per_host=4, timeout=60):
+        """
+        :param rate_limiter: RateLimiter shared with the sync clients
+        :param limit_per_host: max concurrent connections to the API
+        :param timeout: total timeout of a request in seconds
+        """
+        self.rate_limiter = rate_limiter
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=self.limit_per_host),
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    async def _throttle(self):
+        """
+        Wait for a rate limit token without blocking the event loop. Taking a token is a query
+        of the bucket store, so it runs in the default executor.
+        """
+        if self.rate_limiter:
+            loop = asyncio.get_event_loop()
+            wait = await loop.run_in_executor(None, self.rate_limiter.try_acquire)
+
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = await loop.run_in_executor(None, self.rate_limiter.try_acquire)
+
+    async def _request(self, method, url, **kwargs):
+        await self._throttle()
+
+        async with self.session.request(method, url, **kwargs) as response:
+            if response.status != HTTPCodes.Success.value:
+                raise BadRequest('Problem with connection, status code: {}'.format(response.status))
+
+            return await response.json(content_type=None)
+
+
+class AsyncEtherscan(EtherscanAPI, AsyncService):
+
+    def __init__(self, api_key, **kwargs):
+        super(AsyncEtherscan, self).__init__(**kwargs)
+        self.api_key = api_key
+
+    async def _get(self, url):
+        data = await self._request('GET', url)
+
+        # Check for empty response
+        if not data:
+            raise BadRequest('Empty response for {}'.format(url))
+
+        return data
+
+    async def get_balance(self, address, INWEI=False):
+        response = await self._get(self._balance_url(address))
+        return self._parse_balance(response, INWEI)
+
+    async def get_latest_block(self):
+        response = await self._get(self._latest_block_url())
+        return self._parse_latest_block(response)
+
+    async def get_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        return [x async for x in self.stream_transactions(address, block_start, block_stop,
+                                                          paginate=paginate, page=page, offset=offset)]
+
+    async def stream_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        """
+        Async generator of the transactions of a txlist query, decoded while the response is read
+        like Etherscan.stream_transactions.
+
+        :raises BadRequest: once the response is read, if it is an error
+        """
+        response = await self._open_transactions(address, block_start, block_stop,
+                                                 paginate=paginate, page=page, offset=offset)
+
+        async for tx in self._read_transactions(response):
+            yield tx
+
+    async def _open_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        """
+        Response of a txlist query with its body not read yet.
+        """
+        await self._throttle()
+
+        response = await self.session.get(self._transactions_url(address, block_start, block_stop,
+                                                                 paginate=paginate, page=page, offset=offset))
+
+        if response.status != HTTPCodes.Success.value:
+            response.close()
+            raise BadRequest('Problem with connection, status code: {}'.format(response.status))
+
+        return response
+
+    async def _read_transactions(self, response):
+        """
+        Async generator of the transactions of a txlist response, decoded while it is read.
+        """
+        stream = JSONArrayStream(None, 'result')
+
+        try:
+            for tx in stream.parse():
+                if tx is NEED_DATA:
+                    stream.feed(await response.content.read(STREAM_CHUNK_SIZE) or None)
+                else:
+                    yield tx
+        except ValueError as e:
+            raise BadRequest('Problem with decoding transactions: {}'.format(e))
+        finally:
+            # Read responses are already released to the connection pool
+            response.close()
+
+        self._parse_transactions(stream.fields)
+
+    async def iter_transactions(self, address, block_start, block_stop, max_results=MAX_RESULTS,
+                                prefetch=STREAM_PREFETCH):
+        """
+        Async generator of the transactions of an address between block_start and block_stop, in
+        block order, yielded while the responses are read. Like Etherscan.iter_transactions, up to
+        prefetch of the next planned ranges are requested while a response is read.
+
+        :raises RangeTooLargeError: if a block has more than max_results transactions
+        """
+        responses = {}
+
+        def request(x):
+            return self._open_transactions(address, x[0], x[1], paginate=True, page=1, offset=max_results)
+
+        # Ranges left to fetch, the next one in block order last
+        pending = [(block_start, block_stop)]
+
+        try:
+            while pending:
+                current = pending.pop()
+
+                for x in reversed(pending):
+                    if x not in responses and len(responses) < prefetch:
+                        responses[x] = asyncio.ensure_future(request(x))
+
+                future = responses.pop(current, None)
+                response = await (future or request(current))
+
+                last = None
+                held = []
+                count = 0
+
+                async for tx in self._read_transactions(response):
+                    count += 1
+
+                    if block_number(tx) != last:
+                        for held_tx in held:
+                            yield held_tx
+                        last = block_number(tx)
+                        held = []
+
+                    held.append(tx)
+
+                if count < max_results:
+                    for held_tx in held:
+                        yield held_tx
+                else:
+                    pending.extend(reversed(remaining_ranges(last, current[0], current[1], max_results)))
+        finally:
+            for future in responses.values():
+                future.cancel()
+                future.add_done_callback(close_response)
+
+    async def get_transaction_batches(self, address, block_start, block_stop, max_results=MAX_RESULTS,
+                                      batch_size=STREAM_BATCH_SIZE, prefetch=STREAM_PREFETCH):
+        """
+        Async generator of the transactions of iter_transactions in lists of at most batch_size.
+        """
+        batch = []
+
+        async for tx in self.iter_transactions(address, block_start, block_stop, max_results, prefetch):
+            batch.append(tx)
+
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+class AsyncInfura(InfuraAPI, AsyncService):
+
+    def __init__(self, api_key, network=Network.mainnet, batch_size=100, max_retries=2, **kwargs):
+        super(AsyncInfura, self).__init__(**kwargs)
+        self.api_key = api_key
+        self.network = network
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+
+        self._init_url()
+
+    async def _get(self, url):
+        pass
+
+    async def _post(self, payload):
+        return await self._request('POST', self.url, json=payload)
+
+    async def _post_chunk(self, payloads, indexes):
+        try:
+            return await self._post(self._batch(payloads, indexes))
+        except (BadRequest, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return str(e)
+
+    async def _post_batch(self, payloads):
+        """
+        Like Infura._post_batch, with the batches posted concurrently.
+        """
+        results = [None] * len(payloads)
+        pending = list(range(len(payloads)))
+
+        for attempt in range(self.max_retries + 1):
+            chunks = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            responses = await asyncio.gather(*[self._post_chunk(payloads, x) for x in chunks])
+
+            failed = []
+            for indexes, response in zip(chunks, responses):
+                failed.extend(self._match_batch(indexes, response, results))
+
+            if not failed:
+                break
+
+            pending = failed
+            self._retry_message(pending, attempt)
+
+        return results
+
+    async def get_block_number(self):
+        response = await self._post(self._block_number_payload())
+        return self._parse_block_number(response)
+
+    async def get_block_by_number(self, value):
+        payload = self._block_by_number_payload(value)
+        payload['id'] = 1
+
+        response = await self._post(payload)
+        return response.get('result')
+
+    async def get_blocks_by_number(self, values, full=False):
+        return await self._post_batch([self._block_by_number_payload(x, full) for x in values])
+
+
+class AsyncNeoscan(NeoscanAPI, AsyncService):
+
+    def __init__(self, api_key, network='main_net', **kwargs):
+        super(AsyncNeoscan, self).__init__(**kwargs)
+        self.api_key = api_key
+
+        self._init_url(network)
+
+    async def _get(self, url):
+        return await self._request('GET', url)
+
+    async def get_balance(self, address):
+        data = await self._get(self._balance_url(address))
+
+        assert data.get('address') == address
+
+        return data.get('balance')
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Resolve block numbers from timestamps.
+"""
+from time import sleep
+
+
+class BlockTimeResolver(object):
+    """
+    Find the first block mined at or after a timestamp.
+
+    Searches over block number by interpolating on block time between the closest known blocks,
+    falling back to bisection whenever a step does not halve the range, so a lookup takes
+    O(log n) calls to the chain client in the worst case.
+
+    Anchors are (block_start, time_start) pairs of existing block intervals, i.e. block_start is
+    the first block with a timestamp >= time_start. They narrow the initial range without any call.
+    """
+
+    def __init__(self, client, anchors=None, max_retries=3, retry_delay=2):
+        """
+        :param client: chain client with get_block_by_number, e.g. Infura
+        :param anchors: list of (block_number, time) pairs
+        :param max_retries: retries for blocks the client does not return
+        :param retry_delay: seconds to wait between retries
+        """
+        self.client = client
+        self.anchors = list(anchors or [])
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timestamps = {}
+        self.calls = 0
+
+    def add_anchor(self, block_number, time):
+        self.anchors.append((block_number, time))
+
+    def _get_block(self, value):
+        for i in range(self.max_retries + 1):
+            self.calls += 1
+            block_info = self.client.get_block_by_number(value)
+
+            if block_info:
+                block_number = int(block_info.get('number'), 16)
+                block_time = int(block_info.get('timestamp'), 16)
+                self.timestamps[block_number] = block_time
+                return block_number, block_time
+
+            if i < self.max_retries:
+                sleep(self.retry_delay * (i + 1))
+
+        raise ValueError('No block info found for block {}.'.format(value))
+
+    def block_timestamp(self, block_number):
+        """
+        Timestamp of a block, fetched once and cached.
+        """
+        if block_number not in self.timestamps:
+            self._get_block(block_number)
+
+        return self.timestamps[block_number]
+
+    def _bracket(self, epoch_time):
+        """
+        Closest known blocks below (time < epoch_time) and at or above (time >= epoch_time)
+        the target, as (block_number, time) pairs. Anchor times are lower bounds, so the block
+        before an anchor is known to be below it.
+        """
+        lower, upper = None, None
+
+        for block_number, block_time in self.timestamps.items():
+            if block_time < epoch_time:
+                if lower is None or block_number > lower[0]:
+                    lower = (block_number, block_time)
+            elif upper is None or block_number < upper[0]:
+                upper = (block_number, block_time)
+
+        for block_number, time in self.anchors:
+            if time >= epoch_time and (upper is None or block_number < upper[0]):
+                upper = (block_number, time)
+            if time <= epoch_time and block_number > 0 and (lower is None or block_number - 1 > lower[0]):
+                lower = (block_number - 1, time)
+
+        return lower, upper
+
+    def resolve(self, epoch_time):
+        """
+        First block with a timestamp >= epoch_time. If the latest block is older than epoch_time,
+        that block has not been mined yet and the next block number is returned.
+        """
+        latest_number, latest_time = self._get_block('latest')
+
+        if latest_time < epoch_time:
+            return latest_number + 1
+
+        lower, upper = self._bracket(epoch_time)
+
+        if lower is not None and upper is not None and lower[0] >= upper[0]:
+            # Anchors contradict each other, only trust fetched timestamps
+            self.anchors = []
+            lower, upper = self._bracket(epoch_time)
+
+        if lower is None:
+            if self.block_timestamp(0) >= epoch_time:
+                return 0
+            lower = (0, self.timestamps[0])
+
+        bisect = False
+
+        while upper[0] - lower[0] > 1:
+            width = upper[0] - lower[0]
+
+            if bisect or upper[1] <= lower[1]:
+                block_number = lower[0] + width // 2
+            else:
+                block_number = lower[0] + int((epoch_time - lower[1]) * width / (upper[1] - lower[1]))
+
+            block_number = min(max(block_number, lower[0] + 1), upper[0] - 1)
+            block_time = self.block_timestamp(block_number)
+
+            if block_time >= epoch_time:
+                upper = (block_number, block_time)
+            else:
+                lower = (block_number, block_time)
+
+            # Bisect next if interpolation did not halve the range
+            bisect = not bisect and upper[0] - lower[0] > width // 2
+
+        return upper[0]
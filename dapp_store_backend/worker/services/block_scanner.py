@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics of all ethereum dapps from a single pass over the blocks of an interval.
+
+Blocks are fetched with their transactions in batched eth_getBlockByNumber calls, and the from
+and to addresses of every transaction are looked up in a hash index of the contract addresses of
+all dapps, feeding the reducers of the matched addresses. The number of calls depends on the
+number of blocks, not on the number of dapps, unlike fetching the transactions of every address
+from Etherscan.
+
+Blocks do not include receipts, so the status of transactions is unknown and failed
+transactions are counted like successful ones.
+"""
+from dapp_store_backend.worker.services.reducers import MetricsReducer
+
+
+class BlockScanError(Exception):
+    """
+    A block of the scanned range could not be fetched.
+    """
+
+
+def block_transaction(block, tx):
+    """
+    Convert a transaction of a full block into the Etherscan transaction format, without the
+    receipt fields.
+    """
+    return {'hash': tx.get('hash'),
+            'blockNumber': str(int(block.get('number'), 16)),
+            'transactionIndex': str(int(tx.get('transactionIndex'), 16)),
+            'timeStamp': str(int(block.get('timestamp'), 16)),
+            'from': tx.get('from'),
+            'to': tx.get('to'),
+            'value': str(int(tx.get('value'), 16)),
+            'gas': str(int(tx.get('gas'), 16)),
+            'gasPrice': str(int(tx.get('gasPrice'), 16))}
+
+
+class BlockScanner(object):
+    """
+    Reduces the transactions of blocks into metrics for every dapp, with the MetricsReducer of
+    each dapp indexed by its lowercase contract addresses. The transactions of a dapp are buffered
+    and reduced as one page per window of blocks.
+    """
+
+    def __init__(self, infura, dapps, window=500):
+        """
+        :param infura: Infura client
+        :param dapps: list of dicts with the id and address (list of contract addresses) of dapps
+        :param window: number of blocks fetched and held in memory at once
+        """
+        self.infura = infura
+        self.window = window
+        self.reducers = {}
+        self.index = {}
+        self.pending = {}
+        self.blocks = 0
+        self.transactions = 0
+
+        for dapp in dapps:
+            addresses = dapp.get('address') or []
+            if not addresses:
+                continue
+
+            reducer = self.reducers[dapp.get('id')] = MetricsReducer(addresses)
+            for address in reducer.addresses:
+                self.index.setdefault(address, []).append(reducer)
+
+    def update(self, block):
+        """
+        Buffer the transactions of a full block for the reducers of their addresses, see flush.
+        """
+        for tx in block.get('transactions') or []:
+            transaction = None
+
+            # Contract creations have no to address
+            for address in {tx.get('from'), tx.get('to')}:
+                for reducer in self.index.get(address, ()):
+                    transaction = transaction or block_transaction(block, tx)
+                    pending = self.pending.setdefault(id(reducer), (reducer, []))[1]
+
+                    # Transactions between two addresses of a dapp are counted once
+                    if not pending or pending[-1] is not transaction:
+                        pending.append(transaction)
+
+        self.blocks += 1
+        self.transactions += len(block.get('transactions') or [])
+        return self
+
+    def flush(self):
+        """
+        Reduce the buffered transactions.
+        """
+        for reducer, transactions in self.pending.values():
+            reducer.update(transactions)
+
+        self.pending = {}
+        return self
+
+    def scan(self, block_start, block_stop):
+        """
+        Feed the blocks between block_start and block_stop (inclusive), window blocks at a time.
+
+        :raises BlockScanError: if a block cannot be fetched, the metrics would be incomplete
+        """
+        for start in range(block_start, block_stop + 1, self.window):
+            numbers = list(range(start, min(start + self.window, block_stop + 1)))
+
+            for number, block in zip(numbers, self.infura.get_blocks_by_number(numbers, full=True)):
+                if block is None:
+                    raise BlockScanError('Block {} could not be fetched.'.format(number))
+
+                self.update(block)
+
+            self.flush()
+
+        print('Scanned {} transactions in {} blocks for {} addresses.'.format(
+            self.transactions, self.blocks, len(self.index)))
+        return self
+
+    def dapp_reducers(self):
+        """
+        :return: dict of dapp id to MetricsReducer
+        """
+        return self.flush().reducers
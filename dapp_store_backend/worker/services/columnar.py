@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar pages of ethereum transactions.
+
+A page of transactions in the Etherscan format (one dict of strings per transaction) is decoded
+once into numpy columns: addresses are interned into a table of unique addresses and replaced
+by int32 codes, uint256 amounts are split into 32-bit limbs, and receipt fields become boolean
+masks. Metric accumulators then reduce a page with vectorized operations, and the limb sums are
+joined back into exact Python integers.
+"""
+from itertools import chain
+
+import numpy as np
+
+LIMB_BITS = 32
+LIMBS = 256 // LIMB_BITS
+LIMB_MASK = (1 << LIMB_BITS) - 1
+
+# Number of transactions per page when an iterable of transactions is split into pages
+PAGE_SIZE = 10000
+
+
+def split_limbs(values):
+    """
+    Split non-negative integers of up to 256 bits into 32-bit limbs.
+
+    :return: uint32 array of shape (len(values), LIMBS), least significant limb first
+    """
+    limbs = np.zeros((len(values), LIMBS), dtype=np.uint32)
+
+    if not len(values):
+        return limbs
+
+    if max(values) <= np.iinfo(np.uint64).max:
+        array = np.array(values, dtype=np.uint64)
+        limbs[:, 0] = array & LIMB_MASK
+        limbs[:, 1] = array >> LIMB_BITS
+    else:
+        array = np.array(values, dtype=object)
+        for i in range(LIMBS):
+            limbs[:, i] = ((array >> (LIMB_BITS * i)) & LIMB_MASK).astype(np.uint64)
+
+    return limbs
+
+
+def join_limbs(sums):
+    """
+    Integer of limb sums, least significant first. Sums may exceed the limb size.
+    """
+    return sum(int(x) << (LIMB_BITS * i) for i, x in enumerate(sums))
+
+
+def limb_sum(limbs, mask):
+    """
+    Exact sum of the integers of the rows of limbs selected by mask. Limb sums fit in uint64 for
+    up to 2^32 rows.
+    """
+    return join_limbs(limbs[mask].sum(axis=0, dtype=np.uint64))
+
+
+def product_sum(factors, limbs, mask):
+    """
+    Exact sum of uint64 factors times the integers of limbs, over the rows selected by mask.
+    """
+    factors = factors[mask]
+
+    if len(factors) and factors.max() > LIMB_MASK:
+        # Products of limbs with factors of 32 bits fit in 64 bits
+        limbs = limbs[mask]
+        mask = np.ones(len(factors), dtype=bool)
+        return (product_sum(factors & np.uint64(LIMB_MASK), limbs, mask) +
+                (product_sum(factors >> np.uint64(LIMB_BITS), limbs, mask) << LIMB_BITS))
+
+    products = limbs[mask].astype(np.uint64) * factors[:, None]
+
+    # Products fit in 64 bits, their halves are summed separately so the sums do not overflow
+    low = (products & np.uint64(LIMB_MASK)).sum(axis=0, dtype=np.uint64)
+    high = (products >> np.uint64(LIMB_BITS)).sum(axis=0, dtype=np.uint64)
+
+    return join_limbs(low) + (join_limbs(high) << LIMB_BITS)
+
+
+class TransactionPage(object):
+    """
+    Columns of a page of transactions.
+
+    :ivar addresses: array of the unique addresses of the page, in the order they are first seen
+    :ivar from_codes, to_codes: int32 indexes in addresses of the from and to addresses
+    :ivar values: uint32 limbs of the values, see split_limbs
+    :ivar gas_used: uint64 gas used, 0 without receipt
+    :ivar gas_prices: uint32 limbs of the gas prices
+    :ivar timestamps: int64 timestamps, 0 if unknown
+    :ivar successful: mask of the transactions executed without error, see reducers.is_successful
+    :ivar has_receipt: mask of the transactions with a receipt status
+    :ivar has_gas: mask of the transactions with the gas used
+    """
+
+    def __init__(self, addresses, from_codes, to_codes, values, gas_used, gas_prices, timestamps, successful,
+                 has_receipt, has_gas):
+        self.addresses = addresses
+        self.from_codes = from_codes
+        self.to_codes = to_codes
+        self.values = values
+        self.gas_used = gas_used
+        self.gas_prices = gas_prices
+        self.timestamps = timestamps
+        self.successful = successful
+        self.has_receipt = has_receipt
+        self.has_gas = has_gas
+
+    def __len__(self):
+        return len(self.from_codes)
+
+    @classmethod
+    def from_transactions(cls, transactions, lowercase=True):
+        """
+        Decode transactions in the Etherscan format.
+
+        :param lowercase: normalize addresses to lowercase, ethereum addresses are not case sensitive
+        """
+        # Imported here, reducers use pages
+        from dapp_store_backend.worker.services.reducers import is_successful
+
+        transactions = list(transactions)
+        count = len(transactions)
+
+        # Codes in the order addresses are first seen, from addresses then to addresses
+        table = {}
+        codes = np.fromiter(chain((table.setdefault(tx.get('from') or '', len(table)) for tx in transactions),
+                                  (table.setdefault(tx.get('to') or '', len(table)) for tx in transactions)),
+                            dtype=np.int32, count=2 * count)
+        addresses = list(table)
+
+        if lowercase:
+            # Addresses differing only by case get the same code
+            table = {}
+            codes = np.array([table.setdefault(x.lower(), len(table)) for x in addresses], dtype=np.int32)[codes]
+            addresses = list(table)
+
+        gas_used = [tx.get('gasUsed') for tx in transactions]
+
+        return cls(addresses=np.array(addresses, dtype=str),
+                   from_codes=codes[:count],
+                   to_codes=codes[count:],
+                   values=split_limbs([int(tx.get('value') or 0) for tx in transactions]),
+                   gas_used=np.array([int(x) if x is not None else 0 for x in gas_used], dtype=np.uint64),
+                   gas_prices=split_limbs([int(tx.get('gasPrice') or 0) for tx in transactions]),
+                   timestamps=np.array([int(tx.get('timeStamp') or 0) for tx in transactions], dtype=np.int64),
+                   successful=np.fromiter((is_successful(tx) for tx in transactions), dtype=bool, count=count),
+                   has_receipt=np.fromiter(('txreceipt_status' in tx or 'isError' in tx for tx in transactions),
+                                           dtype=bool, count=count),
+                   has_gas=np.fromiter((x is not None for x in gas_used), dtype=bool, count=count))
+
+    def codes(self, addresses):
+        """
+        Mask of the codes of the page that are one of addresses.
+        """
+        return np.isin(self.addresses, list(addresses))
+
+    def rows(self, users, successful):
+        """
+        Generator of (transaction, user, successful) of the page, transactions in the Etherscan
+        format with the decoded fields, for accumulators without a vectorized update.
+        """
+        for i in range(len(self)):
+            tx = {'from': str(self.addresses[self.from_codes[i]]),
+                  'to': str(self.addresses[self.to_codes[i]]),
+                  'value': str(join_limbs(self.values[i])),
+                  'gasPrice': str(join_limbs(self.gas_prices[i]))}
+
+            if self.timestamps[i]:
+                tx['timeStamp'] = str(self.timestamps[i])
+            if self.has_gas[i]:
+                tx['gasUsed'] = str(self.gas_used[i])
+            if self.has_receipt[i]:
+                tx['isError'] = '0' if self.successful[i] else '1'
+
+            yield tx, str(self.addresses[users[i]]), bool(successful[i])
+
+
+def pages(transactions, size=PAGE_SIZE, lowercase=True):
+    """
+    Generator of TransactionPage of at most size transactions of an iterable of transactions.
+    Pages are yielded as they are, lists are split in pages of size.
+    """
+    if isinstance(transactions, TransactionPage):
+        yield transactions
+        return
+
+    page = []
+    for tx in transactions:
+        page.append(tx)
+
+        if len(page) == size:
+            yield TransactionPage.from_transactions(page, lowercase)
+            page = []
+
+    if page:
+        yield TransactionPage.from_transactions(page, lowercase)
@@ -1,11 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 from requests import session
 from requests.exceptions import ConnectionError
 from werkzeug.exceptions import BadRequest
 
-from .utilities import combine_dict_same_keys
 from dapp_store_backend.worker.services.base import BaseService
+from dapp_store_backend.worker.services.json_stream import JSONArrayStream
+from dapp_store_backend.worker.services.range_planner import MAX_RESULTS, block_number, remaining_ranges
 from dapp_store_backend.enums.status import HTTPCodes
 
+# Bytes read at once from a streamed response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Transactions passed at once to a reducer or inserted at once in the transaction store
+STREAM_BATCH_SIZE = 1000
+
+# Planned block ranges requested ahead of the response being read
+STREAM_PREFETCH = 3
+
+
+def batches(transactions, size=STREAM_BATCH_SIZE):
+    """
+    Generator of lists of at most size transactions of an iterable.
+    """
+    transactions = iter(transactions)
+
+    while True:
+        batch = list(islice(transactions, size))
+        if not batch:
+            return
+
+        yield batch
+
+
+def hold_last_block(transactions, block_range, max_results, pending):
+    """
+    Generator of the complete transactions of the response of a block range, sorted by block.
+    The transactions of the last block are held until a later block shows they are complete. If
+    the response is full, they are dropped and the ranges left to fetch are added to pending.
+
+    :param pending: ranges left to fetch, the next one in block order last
+    :raises RangeTooLargeError: if the response is full and only holds transactions of its first block
+    """
+    last = None
+    held = []
+    count = 0
+
+    for tx in transactions:
+        count += 1
+
+        if block_number(tx) != last:
+            for held_tx in held:
+                yield held_tx
+            last = block_number(tx)
+            held = []
+
+        held.append(tx)
+
+    if count < max_results:
+        for held_tx in held:
+            yield held_tx
+    else:
+        pending.extend(reversed(remaining_ranges(last, block_range[0], block_range[1], max_results)))
+
+
+def close_response(future):
+    """
+    Close the response of a prefetch that is not read.
+    """
+    if not future.cancelled() and not future.exception():
+        future.result().close()
+
 
 class EthercanJSON(object):
     get_balance_fields = {
@@ -28,16 +94,77 @@ class EthercanJSON(object):
     }
 
 
-class Etherscan(BaseService):
+class EtherscanAPI(object):
+    """
+    Urls and response parsing of the Etherscan API, shared by the sync and async clients.
+    """
 
     API_PREFIX = 'https://api.etherscan.io/api?'
 
-    def __init__(self, api_key):
+    def _balance_url(self, address):
+        return self.API_PREFIX + 'module=account&action=balance&address={address}&tag=latest&apikey={api_key}'.format(address=address,
+                                                                                                                        api_key=self.api_key)
+
+    def _latest_block_url(self):
+        return self.API_PREFIX + 'module=proxy&action=eth_blockNumber&apikey={api_key}'.format(api_key=self.api_key)
+
+    def _transactions_url(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        url = self.API_PREFIX + 'module=account&action=txlist&address={address}&startblock={block_start}&endblock={block_stop}&sort=asc&apikey={api_key}'.format(
+            address=address, block_start=block_start, block_stop=block_stop, api_key=self.api_key)
+
+        if paginate:
+            url += '&page={page}&offset={offset}'.format(
+                page=page, offset=offset)
+
+        return url
+
+    @staticmethod
+    def _parse_balance(response, INWEI=False):
+        # if response is valid
+        if int(response['status']) == 1:
+            wei_balance = float(response.get('result'))
+        else:
+            raise BadRequest("Problem with getting balance! {}: {}".format(response['message'], response['result']))
+
+        # return in WEI or ether
+        if not INWEI:
+            balance = wei_balance * 10.0e-18
+        else:
+            balance = wei_balance
+        return balance
+
+    @staticmethod
+    def _parse_latest_block(response):
+        return int(response['result'], 0)
+
+    @staticmethod
+    def _parse_transactions(response):
+        """
+        Transactions of a txlist response.
+
+        :raises BadRequest: if the response is an error, e.g. a query beyond the result window
+        """
+        result = response.get('result')
+
+        # Empty ranges are reported as errors with an empty result
+        if str(response.get('status')) != '1' and result != []:
+            raise BadRequest('Problem with getting transactions! {}: {}'.format(response.get('message'), result))
+
+        return result
+
+
+class Etherscan(EtherscanAPI, BaseService):
+
+    def __init__(self, api_key, rate_limiter=None):
         self.api_key = api_key
         self.session = session()
+        self.rate_limiter = rate_limiter
 
     def _get(self, url):
         # TODO: deal with "unknown exception" error
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
         try:
             response = self.session.get(url)
         except ConnectionError:
@@ -52,6 +179,21 @@ class Etherscan(BaseService):
         raise BadRequest(
             'Problem with connection, status code: {}'.format(response.status_code))
 
+    def _stream(self, url):
+        """
+        Response of url with its body not read yet, see JSONArrayStream.
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        response = self.session.get(url, stream=True)
+
+        if response.status_code != HTTPCodes.Success.value:
+            response.close()
+            raise BadRequest('Problem with connection, status code: {}'.format(response.status_code))
+
+        return response
+
     def get_balance(self, address, INWEI=False):
         """
         Function to get ether balance in WEI = 10^(-18) ether
@@ -59,23 +201,8 @@ class Etherscan(BaseService):
         :param address:
         :return: (float) of the balance of ether or wei
         """
-        url = self.API_PREFIX + 'module=account&action=balance&address={address}&tag=latest&apikey={api_key}'.format(address=address,
-                                                                                                                     api_key=self.api_key)
-
-        response = self._get(url)
-
-        # if response is valid
-        if int(response['status']) == 1:
-            wei_balance = float(response.get('result'))
-        else:
-            raise BadRequest("Problem with getting balance! {}: {}".format(response['message'], response['result']))
-
-        # return in WEI or ether
-        if not INWEI:
-            balance = wei_balance * 10.0e-18
-        else:
-            balance = wei_balance
-        return balance
+        response = self._get(self._balance_url(address))
+        return self._parse_balance(response, INWEI)
 
     def get_latest_block(self):
         """
@@ -83,48 +210,119 @@ class Etherscan(BaseService):
 
         :return:
         """
-        url = self.API_PREFIX + 'module=proxy&action=eth_blockNumber&apikey={api_key}'.format(api_key=self.api_key)
-        response = self._get(url)
+        response = self._get(self._latest_block_url())
+        return self._parse_latest_block(response)
 
-        # extract response
-        latest_block = int(response['result'], 0)
+    def get_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
 
-        return latest_block
+        return list(self.stream_transactions(address, block_start, block_stop,
+                                             paginate=paginate, page=page, offset=offset))
 
-    def get_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+    def stream_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        """
+        Generator of the transactions of a txlist query, decoded while the response is read.
 
-        url = self.API_PREFIX + 'module=account&action=txlist&address={address}&startblock={block_start}&endblock={block_stop}&sort=asc&apikey={api_key}'.format(
-            address=address, block_start=block_start, block_stop=block_stop, api_key=self.api_key)
+        :raises BadRequest: once the response is read, if it is an error
+        """
+        yield from self._read_transactions(self._open_transactions(address, block_start, block_stop,
+                                                                   paginate=paginate, page=page, offset=offset))
 
-        if paginate:
-            url += '&page={page}&offset={offset}'.format(
-                page=page, offset=offset)
+    def _open_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        """
+        Response of a txlist query with its body not read yet.
+        """
+        return self._stream(self._transactions_url(address, block_start, block_stop,
+                                                   paginate=paginate, page=page, offset=offset))
 
-        response = self._get(url)
-        return response.get('result')
+    def _read_transactions(self, response):
+        """
+        Generator of the transactions of a txlist response, decoded while it is read.
+        """
+        stream = JSONArrayStream(response.iter_content(STREAM_CHUNK_SIZE), 'result')
 
-    def process_transactions(self, func, address, block_start, block_stop, full=False):
+        try:
+            for tx in stream:
+                yield tx
+        except ValueError as e:
+            raise BadRequest('Problem with decoding transactions: {}'.format(e))
+        finally:
+            response.close()
+
+        self._parse_transactions(stream.fields)
 
-        page = 1
-        transactions = self.get_transactions(
-            address, block_start, block_stop, paginate=True, page=page, offset=10000)
+    def get_first_transaction(self, address):
+        """
+        Function to return the first transaction of an address, or None
 
-        results = func(transactions)
-        print('Processed {} transactions'.format(len(transactions)))
+        :param address:
+        :return:
+        """
+        transactions = self.get_transactions(address, 0, 99999999, paginate=True, page=1, offset=1)
+        return transactions[0] if transactions else None
+
+    def iter_transactions(self, address, block_start, block_stop, max_results=MAX_RESULTS, prefetch=STREAM_PREFETCH):
+        """
+        Generator of the transactions of an address between block_start and block_stop, in block
+        order, yielded while the responses are read.
+
+        Ranges with max_results transactions are split by range_planner.remaining_ranges. Only the
+        transactions of the last block of a response are held, until a later block shows they are
+        complete or the response is full and they are fetched again with the rest of the range.
+        Up to prefetch of the next planned ranges are requested in the background while a response
+        is read, their bodies are only read in turn.
+
+        :raises RangeTooLargeError: if a block has more than max_results transactions
+        """
+        executor = ThreadPoolExecutor(max_workers=max(prefetch, 1))
+        responses = {}
+
+        def request(x):
+            return self._open_transactions(address, x[0], x[1], paginate=True, page=1, offset=max_results)
+
+        # Ranges left to fetch, the next one in block order last
+        pending = [(block_start, block_stop)]
 
         try:
-            while len(transactions) == 10000:
+            while pending:
+                current = pending.pop()
+
+                for x in reversed(pending):
+                    if x not in responses and len(responses) < prefetch:
+                        responses[x] = executor.submit(request, x)
+
+                future = responses.pop(current, None)
+                response = future.result() if future else request(current)
+
+                for tx in hold_last_block(self._read_transactions(response), current, max_results, pending):
+                    yield tx
+        finally:
+            for future in responses.values():
+                future.cancel()
+                future.add_done_callback(close_response)
+            executor.shutdown(wait=False)
+
+    def get_transaction_batches(self, address, block_start, block_stop, max_results=MAX_RESULTS,
+                                batch_size=STREAM_BATCH_SIZE, prefetch=STREAM_PREFETCH):
+        """
+        Generator of the transactions of iter_transactions in lists of at most batch_size.
+        """
+        return batches(self.iter_transactions(address, block_start, block_stop, max_results, prefetch), batch_size)
 
-                page += 1
-                transactions = self.get_transactions(
-                    address, block_start, block_stop, paginate=True, page=page, offset=10000)
+    def process_transactions(self, reducer, address, block_start, block_stop, max_results=MAX_RESULTS):
+        """
+        Stream the transactions of an address into a reducer, STREAM_BATCH_SIZE transactions at a
+        time, so memory does not grow with the size of the responses.
+
+        :param reducer: TransactionReducer
+        :return: (dict) result of the reducer
+        :raises BadRequest, ConnectionError, RangeTooLargeError: if the transactions cannot all be downloaded
+        """
+        count = 0
 
-                results = combine_dict_same_keys(results, func(transactions))
+        for batch in self.get_transaction_batches(address, block_start, block_stop, max_results):
+            reducer.update(batch)
+            count += len(batch)
 
-                print('Processed {} transactions from page {}.'.format(
-                    len(transactions), page))
-        except Exception as e:  # TODO: specify exception
-            print('ERROR: {}'.format(e))
-            return {}
+        print('Processed {} transactions of {}.'.format(count, address))
 
-        return results
+        return reducer.result()
@@ -6,26 +6,103 @@ from dapp_store_backend.worker.services.base import BaseService
 from dapp_store_backend.enums.status import HTTPCodes
 
 
-class Infura(BaseService):
+class InfuraAPI(object):
+    """
+    Payloads and response parsing of the Infura JSON RPC API, shared by the sync and async clients.
+    """
+
+    def _init_url(self):
+        """
+        Initialize JSON RPC URL.
+        """
+        self.url = 'https://{network}.infura.io/{api_key}'.format(network=self.network.name,
+                                                                  api_key=self.api_key)
+
+    @staticmethod
+    def _block_number_payload():
+        return {'jsonrpc': '2.0',
+                'id': 1,
+                'method': 'eth_blockNumber'}
+
+    @staticmethod
+    def _parse_block_number(response):
+        try:
+            return int(response.get('result'), 16)
+        except ValueError:
+            raise ValueError('Could not convert {} to integer.'.format(
+                response.get('result')))
+
+    @staticmethod
+    def _block_by_number_payload(value, full=False):
+        if type(value) == int:
+            try:
+                value = hex(value)
+            except ValueError:
+                raise ValueError('Could not convert {} to hexadecimal.'.format(
+                    value))
+        elif value not in ['earliest', 'latest', 'pending']:
+            raise ValueError('{} not valid choice.'.format(value))
+
+        return {'jsonrpc': '2.0',
+                'method': 'eth_getBlockByNumber',
+                'params': [value, full]}
+
+    @staticmethod
+    def _batch(payloads, indexes):
+        """
+        Batch of the payloads at indexes, using the indexes as ids.
+        """
+        return [dict(payloads[x], jsonrpc='2.0', id=x) for x in indexes]
+
+    @staticmethod
+    def _match_batch(indexes, responses, results):
+        """
+        Store the results of a batch by id, as the node may answer a batch in any order.
+
+        :param responses: batch response, anything else than a list means the batch failed
+        :return: indexes of the failed calls (error response or missing from the batch response)
+        """
+        # A failed batch is answered with a single error object
+        if not isinstance(responses, list):
+            print('ERROR: batch of {} calls failed: {}'.format(len(indexes), responses))
+            responses = []
+
+        answered = {x.get('id'): x for x in responses if isinstance(x, dict)}
+        failed = []
+
+        for index in indexes:
+            response = answered.get(index)
+
+            if response is None or 'error' in response:
+                failed.append(index)
+            else:
+                results[index] = response.get('result')
+
+        return failed
+
+    def _retry_message(self, pending, attempt):
+        if attempt < self.max_retries:
+            print('Retrying {} failed calls (attempt {}).'.format(len(pending), attempt + 1))
+        else:
+            print('ERROR: {} calls failed after {} retries.'.format(len(pending), self.max_retries))
+
+
+class Infura(InfuraAPI, BaseService):
     """
     Wrapper class for Infura JSON RPC API.
     """
 
     def __init__(self, api_key,
-                 network=Network.mainnet):
+                 network=Network.mainnet, rate_limiter=None, batch_size=100, max_retries=2):
         self.api_key = api_key
         self.network = network
         self.session = session()
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+        self.max_retries = max_retries
 
         self._init_url()
 
-    def _init_url(self):
-        """
-        Initialize JSON RPC URL.
-        """
-        self.url = 'https://{network}.infura.io/{api_key}'.format(network=self.network.name,
-                                                                  api_key=self.api_key)
-
     def _get(self, url):
         pass
 
@@ -34,6 +111,9 @@ class Infura(BaseService):
         Post method.
         """
         # TODO: deal with "unknown exception" error
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
         try:
             response = self.session.post(self.url,
                                          json=payload)
@@ -45,6 +125,40 @@ class Infura(BaseService):
 
         return response.json()
 
+    def _post_batch(self, payloads):
+        """
+        Post JSON RPC payloads as batches of at most batch_size calls per request.
+
+        Responses are matched to payloads by id. Calls that fail (error response, missing from
+        the batch response, or failed request) are retried up to max_retries times in a new batch.
+
+        :param payloads: list of JSON RPC payloads, their ids are overwritten
+        :return: list of results in the order of payloads, None for calls that kept failing
+        """
+        results = [None] * len(payloads)
+        pending = list(range(len(payloads)))
+
+        for attempt in range(self.max_retries + 1):
+            failed = []
+
+            for i in range(0, len(pending), self.batch_size):
+                indexes = pending[i:i + self.batch_size]
+
+                try:
+                    responses = self._post(self._batch(payloads, indexes))
+                except (BadRequest, IOError, ValueError) as e:
+                    responses = str(e)
+
+                failed.extend(self._match_batch(indexes, responses, results))
+
+            if not failed:
+                break
+
+            pending = failed
+            self._retry_message(pending, attempt)
+
+        return results
+
     def get_block_number(self):
         """
         Returns the number of most recent block.
@@ -56,17 +170,9 @@ class Infura(BaseService):
             result: "0x5c174e"
         }
         """
-        payload = {'jsonrpc': '2.0',
-                   'id': 1,
-                   'method': 'eth_blockNumber'}
+        response = self._post(self._block_number_payload())
 
-        response = self._post(payload)
-
-        try:
-            return int(response.get('result'), 16)
-        except ValueError:
-            raise ValueError('Could not convert {} to integer.'.format(
-                response.get('result')))
+        return self._parse_block_number(response)
 
     def get_block_by_number(self, value):
         """
@@ -75,20 +181,21 @@ class Infura(BaseService):
         Params:
         value(int) : integer of a block number, or the string "earliest", "latest" or "pending"
         """
-        if type(value) == int:
-            try:
-                value = hex(value)
-            except ValueError:
-                raise ValueError('Could not convert {} to hexadecimal.'.format(
-                    value))
-        elif value not in ['earliest', 'latest', 'pending']:
-            raise ValueError('{} not valid choice.'.format(value))
-
-        payload = {'jsonrpc': '2.0',
-                   'method': 'eth_getBlockByNumber',
-                   'params': [value, False],
-                   'id': 1}
+        payload = self._block_by_number_payload(value)
+        payload['id'] = 1
 
         response = self._post(payload)
 
         return response.get('result')
+
+    def get_blocks_by_number(self, values, full=False):
+        """
+        Returns information about several blocks, batched in requests of batch_size blocks.
+
+        Params:
+        values(list) : block numbers, or the strings "earliest", "latest" or "pending"
+        full(bool) : return full transaction objects instead of transaction hashes
+
+        Returns a list of blocks in the order of values, None for blocks that could not be fetched.
+        """
+        return self._post_batch([self._block_by_number_payload(x, full) for x in values])
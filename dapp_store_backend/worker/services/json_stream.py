@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental decoding of JSON responses.
+
+The items of an array member of a JSON object, e.g. the result of an Etherscan txlist response,
+are decoded one at a time with json.JSONDecoder.raw_decode as the chunks of the body arrive. Only
+the chunk being decoded is held in memory, not the whole body and the decoded list.
+"""
+import codecs
+import json
+import re
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+# Yielded by JSONArrayStream.parse when the next chunk is needed
+NEED_DATA = object()
+
+
+class JSONArrayStream(object):
+    """
+    Iterator over the items of the array member key of a JSON object read from chunks.
+
+    The other members are decoded into fields, complete once the iteration is over. An array
+    member is set to an empty list in fields, its items have been yielded; a member that is not an
+    array, e.g. an error message, is decoded into fields and no item is yielded.
+
+    Chunks are read from chunks when iterating. Chunks read asynchronously are passed with feed
+    instead, whenever parse yields NEED_DATA:
+
+        stream = JSONArrayStream(None, 'result')
+        for item in stream.parse():
+            if item is NEED_DATA:
+                stream.feed(await response.content.read(size) or None)
+    """
+
+    def __init__(self, chunks, key):
+        """
+        :param chunks: iterable of bytes (UTF-8) or str, e.g. response.iter_content(), or None if fed
+        :param key: name of the streamed member
+        """
+        self.chunks = iter(chunks) if chunks is not None else None
+        self.key = key
+        self.fields = {}
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def feed(self, chunk):
+        """
+        Append the next chunk to the buffer, dropping the decoded text.
+
+        :param chunk: bytes (UTF-8) or str, None at the end of the body
+        """
+        if chunk is None:
+            self.eof = True
+            text = self.text_decoder.decode(b'', final=True)
+        else:
+            text = self.text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+        self.buffer = self.buffer[self.position:] + text
+        self.position = 0
+
+    def _peek(self):
+        """
+        Skip whitespace.
+
+        :return: next character, empty at the end of the body
+        """
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+
+            if self.position < len(self.buffer) or self.eof:
+                return self.buffer[self.position:self.position + 1]
+
+            yield NEED_DATA
+
+    def _expect(self, characters):
+        character = yield from self._peek()
+
+        if not character or character not in characters:
+            raise json.JSONDecodeError('Expecting one of {!r}'.format(characters), self.buffer, self.position)
+
+        self.position += 1
+        return character
+
+    def _value(self):
+        yield from self._peek()
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+
+                # A value ending the buffer may go on in the next chunk, e.g. a number
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+
+            yield NEED_DATA
+
+    def parse(self):
+        """
+        Generator of the items, and of NEED_DATA when the next chunk must be fed.
+
+        :raises json.JSONDecodeError: if the body is not a JSON object
+        """
+        yield from self._expect('{')
+        if (yield from self._peek()) == '}':
+            self.position += 1
+            return
+
+        while True:
+            key = yield from self._value()
+            yield from self._expect(':')
+
+            if key == self.key and (yield from self._peek()) == '[':
+                self.position += 1
+                self.fields[key] = []
+
+                if (yield from self._peek()) == ']':
+                    self.position += 1
+                else:
+                    while True:
+                        yield (yield from self._value())
+
+                        if (yield from self._expect(',]')) == ']':
+                            break
+            else:
+                self.fields[key] = yield from self._value()
+
+            if (yield from self._expect(',}')) == '}':
+                return
+
+    def __iter__(self):
+        """
+        :raises json.JSONDecodeError: if the body is not a JSON object
+        """
+        for item in self.parse():
+            if item is NEED_DATA:
+                self.feed(next(self.chunks, None))
+            else:
+                yield item
@@ -1,3 +1,7 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 from requests import session
 from requests.exceptions import ConnectionError, RequestException
 from werkzeug.exceptions import BadRequest
@@ -17,19 +21,49 @@ class NeoscanJSON(object):
         'page_number',
     }
 
-class Neoscan(BaseService):
+class NeoscanAPI(object):
     """
-    Wrapper for Neoscan API.
+    Urls of the Neoscan API, shared by the sync and async clients.
     """
 
-    API_PREFIX = 'https://api.neoscan.io/api?'
-    TEST_API_PREFIX = 'https://neoscan-testnet.io/api/test_net/v1/'
+    API_PREFIXES = {'main_net': 'https://api.neoscan.io/api/main_net/v1/',
+                    'test_net': 'https://neoscan-testnet.io/api/test_net/v1/'}
+
+    def _init_url(self, network):
+        """
+        Initialize the API prefix of a network, main_net or test_net.
+        """
+        if network not in self.API_PREFIXES:
+            raise ValueError('Unknown Neoscan network: {}.'.format(network))
+
+        self.API_PREFIX = self.API_PREFIXES[network]
+
+    def _balance_url(self, address):
+        return self.API_PREFIX + 'get_balance/{address}/'.format(
+            address=address)
+
+    def _transactions_url(self, address, page=1):
+        return self.API_PREFIX + 'get_address_abstracts/{address}/{page}'.format(
+            address=address, page=page)
+
+    def _height_url(self):
+        return self.API_PREFIX + 'get_height'
 
-    def __init__(self, api_key):
+    def _block_url(self, height):
+        return self.API_PREFIX + 'get_block/{height}'.format(height=height)
+
+
+class Neoscan(NeoscanAPI, BaseService):
+    """
+    Wrapper for Neoscan API.
+    """
+
+    def __init__(self, api_key, network='main_net', max_workers=4):
         self.api_key = api_key
         self.session = session()
+        self.max_workers = max_workers
 
-        self.API_PREFIX = self.TEST_API_PREFIX
+        self._init_url(network)
 
     def _get(self, url):
         # TODO: deal with "unknown exception" error
@@ -46,11 +80,7 @@ class Neoscan(BaseService):
             raise BadRequest("Problem with connection, status code: %s" % response.status_code)
 
     def get_balance(self, address):
-        # define url
-        url = self.API_PREFIX + 'get_balance/{address}/'.format(
-            address=address)
-
-        response = self._get(url)
+        response = self._get(self._balance_url(address))
         data = response.json()
 
         # extract data response - get balance, and address
@@ -62,33 +92,75 @@ class Neoscan(BaseService):
         # return if this was a success or not
         return balance
 
-    def get_transactions(self, address):
-        # always get first page
-        page = 1
-        # define url
-        url = self.API_PREFIX + 'get_address_abstracts/{address}/'.format(
-            address=address, page=page)
+    def get_transaction_pages(self, address):
+        """
+        Generator of the pages of address abstracts, newest first.
 
-        response = self._get(url)
-        data = response.json()
+        The first page gives the number of pages, the following pages are fetched concurrently,
+        max_workers pages ahead of the page being processed.
+        """
+        data = self.get_transaction_summary(address, 1).json()
+        yield data['entries']
 
-        # extract top level data
-        total_pages = data['total_pages']
-        total_entries = data['total_entries']
-        page_size = data['page_size']
-        page_number = data['page_number']
+        pages = iter(range(2, data['total_pages'] + 1))
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = deque(executor.submit(self.get_transaction_summary, address, x)
+                        for x in islice(pages, self.max_workers))
 
-        # extract transactions
-        transactions = []
-        # go through all pages of transactions
-        for i in range(total_pages):
-            url = self.API_PREFIX + 'get_address_abstracts/{address}/'.format(
-                address=address, page=i + 1)
-            response = self._get(url)
-            data = response.json()
-            transactions.extend(data['entries'])
+        try:
+            while futures:
+                response = futures.popleft().result()
+
+                page = next(pages, None)
+                if page:
+                    futures.append(executor.submit(self.get_transaction_summary, address, page))
 
-        return transactions
+                yield response.json()['entries']
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def get_transactions(self, address, block_start=None, block_stop=None):
+        """
+        Generator of the address abstracts of an address between block_start and block_stop
+        (inclusive), newest first. Pages older than block_start are not downloaded.
+        """
+        for entries in self.get_transaction_pages(address):
+            for entry in entries:
+                block_height = entry.get('block_height')
+
+                if block_stop is not None and block_height > block_stop:
+                    continue
+                if block_start is not None and block_height < block_start:
+                    return
+
+                yield entry
+
+    def get_height(self):
+        """
+        Number of blocks of the chain.
+        """
+        return self._get(self._height_url()).json().get('height')
+
+    def get_block_by_number(self, value):
+        """
+        Block info in the format of Infura.get_block_by_number (hex number and timestamp), so NEO
+        blocks can be resolved by BlockTimeResolver.
+
+        Params:
+        value(int) : integer of a block number, or the string "latest"
+        """
+        if value == 'latest':
+            value = self.get_height() - 1
+
+        try:
+            data = self._get(self._block_url(value)).json()
+        except BadRequest:
+            return None
+
+        return {'number': hex(data['index']),
+                'timestamp': hex(data['time'])}
 
     def get_all_nodes(self):
         """
@@ -108,8 +180,6 @@ class Neoscan(BaseService):
 
     def get_transaction_summary(self, address, page):
         """
-        /api/main_net/v1/get_address_abstracts/{address}/{page}
+        get_address_abstracts/{address}/{page}
         """
-        url = self.API_PREFIX + "/main_net/v1/get_address_abstracts/{0}/{1}".format(address, page)
-        response = self._get(url)
-        return response
+        return self._get(self._transactions_url(address, page))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Planning of Etherscan transaction requests within the result window.
+
+Etherscan returns at most MAX_RESULTS transactions per query (page x offset is capped), so the
+transactions of a busy address cannot be paged beyond the first MAX_RESULTS. Instead a block
+range is fetched with a single query, and when the response is full, its transactions before
+the last block are kept (they are complete since results are sorted by block) and the rest of
+the range is bisected into two sub-ranges fetched the same way, until every sub-range fits in
+one response. Sub-ranges are independent, so the clients request the next planned ones while the
+current response is read, and yield the transactions in block order.
+"""
+
+MAX_RESULTS = 10000
+
+
+class RangeTooLargeError(Exception):
+    """
+    A single block has more transactions of an address than fit in one response.
+    """
+
+
+def block_number(tx):
+    return int(tx.get('blockNumber'))
+
+
+def remaining_ranges(last, block_start, block_stop, max_results=MAX_RESULTS):
+    """
+    Sub-ranges left to fetch after a full response of block_start..block_stop ending in block last.
+
+    :return: list of (block_start, block_stop) in order
+    :raises RangeTooLargeError: if last is block_start, the response only holds its transactions
+    """
+    if last <= block_start:
+        raise RangeTooLargeError('More than {} transactions in block {}.'.format(max_results, block_start))
+
+    if last == block_stop:
+        return [(last, last)]
+
+    middle = (last + block_stop) // 2
+    return [(last, middle), (middle + 1, block_stop)]
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Token bucket rate limiter shared by every worker process using the same bucket store.
+"""
+import os
+import sqlite3
+from time import sleep, time
+
+
+class BucketStore(object):
+    """
+    Persists token buckets so that several processes draw from the same budget.
+    """
+
+    def take(self, name, rate, capacity, tokens, now):
+        """
+        Atomically refill bucket `name` up to `now` and take `tokens` from it.
+
+        :return: 0 if the tokens were taken, otherwise the seconds to wait before retrying.
+        """
+        raise NotImplementedError('Need to implement take for a bucket store.')
+
+
+def refill(stored_tokens, updated, rate, capacity, now):
+    """
+    Number of tokens in a bucket at `now`.
+    """
+    if stored_tokens is None:
+        return capacity
+
+    return min(capacity, stored_tokens + max(0.0, now - updated) * rate)
+
+
+def wait_time(available, tokens, rate):
+    """
+    Seconds until `tokens` are available.
+    """
+    return 0 if available >= tokens else (tokens - available) / rate
+
+
+class SQLiteBucketStore(BucketStore):
+    """
+    Bucket store in a local SQLite file. Shares the budget between processes on the same host,
+    and is the stand-in for the Postgres store in development and tests.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute('CREATE TABLE IF NOT EXISTS rate_limit_bucket '
+                           '(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+        return connection
+
+    def take(self, name, rate, capacity, tokens, now):
+        connection = self._connect()
+
+        try:
+            # Lock the database for writing so read-refill-write is atomic across processes
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute('SELECT tokens, updated FROM rate_limit_bucket WHERE name = ?',
+                                     (name,)).fetchone()
+
+            available = refill(row[0], row[1], rate, capacity, now) if row else capacity
+            wait = wait_time(available, tokens, rate)
+
+            if not wait:
+                available -= tokens
+
+            connection.execute('INSERT OR REPLACE INTO rate_limit_bucket (name, tokens, updated) VALUES (?, ?, ?)',
+                               (name, available, now))
+            connection.execute('COMMIT')
+            return wait
+        except Exception:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+
+class PostgresBucketStore(BucketStore):
+    """
+    Bucket store in the rate_limit_bucket table. Shares the budget between all hosts.
+    """
+
+    def __init__(self, database_uri):
+        self.database_uri = database_uri
+        self._engine = None
+        self._pid = None
+
+    @property
+    def engine(self):
+        # Engines must not be shared across forked worker processes
+        if self._engine is None or self._pid != os.getpid():
+            from sqlalchemy import create_engine
+            self._engine = create_engine(self.database_uri, pool_size=1)
+            self._pid = os.getpid()
+
+        return self._engine
+
+    def take(self, name, rate, capacity, tokens, now):
+        from sqlalchemy import text
+
+        with self.engine.begin() as connection:
+            connection.execute(text('INSERT INTO rate_limit_bucket (name, tokens, updated) '
+                                    'VALUES (:name, :tokens, :updated) ON CONFLICT (name) DO NOTHING'),
+                               name=name, tokens=capacity, updated=now)
+            row = connection.execute(text('SELECT tokens, updated FROM rate_limit_bucket '
+                                          'WHERE name = :name FOR UPDATE'), name=name).fetchone()
+
+            available = refill(row.tokens, row.updated, rate, capacity, now)
+            wait = wait_time(available, tokens, rate)
+
+            if not wait:
+                available -= tokens
+
+            connection.execute(text('UPDATE rate_limit_bucket SET tokens = :tokens, updated = :updated '
+                                    'WHERE name = :name'), name=name, tokens=available, updated=now)
+            return wait
+
+
+class RateLimiter(object):
+    """
+    Token bucket allowing `rate` calls per second on average and bursts of up to `capacity` calls.
+    """
+
+    def __init__(self, name, rate, store, capacity=None, clock=time):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.store = store
+        self.clock = clock
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens without blocking.
+
+        :return: 0 if acquired, otherwise the seconds to wait before retrying.
+        """
+        return self.store.take(self.name, self.rate, self.capacity, tokens, self.clock())
+
+    def acquire(self, tokens=1):
+        """
+        Block until tokens are taken.
+        """
+        wait = self.try_acquire(tokens)
+
+        while wait:
+            sleep(wait)
+            wait = self.try_acquire(tokens)
+
+
+def create_rate_limiter(name, rate, config):
+    """
+    Create a rate limiter using the bucket store selected by config.RATE_LIMIT_BACKEND.
+    """
+    if config.RATE_LIMIT_BACKEND == 'postgres':
+        store = PostgresBucketStore(
+            'postgresql://{user}:{password}@{host}:{port}/{db}'.format(
+                user=config.POSTGRES_USER, password=config.POSTGRES_PASSWORD, host=config.POSTGRES_HOST,
+                port=config.POSTGRES_PORT, db=config.POSTGRES_DB))
+    else:
+        store = SQLiteBucketStore(config.RATE_LIMIT_SQLITE_PATH)
+
+    return RateLimiter(name, rate, store)
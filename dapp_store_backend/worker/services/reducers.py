@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental reducers of blockchain transactions into metrics.
+
+A reducer is fed pages (any iterable) of transactions with update, can be merged with
+another reducer of the same type, and returns its metrics with result. Memory only grows with the
+reduced state, not with the number of transactions.
+
+The metrics of dapps are computed by MetricsReducer with every accumulator registered with
+metric: transactions are decoded once into columnar pages (see columnar.TransactionPage) reduced by
+all accumulators with numpy operations, and the result of each one is merged into the metrics
+stored in Metric.data. A new metric is a new accumulator class.
+"""
+from decimal import Decimal
+
+import numpy as np
+
+from dapp_store_backend.services.hyperloglog import HyperLogLog
+from dapp_store_backend.worker.constants import Metric
+from dapp_store_backend.worker.services.columnar import limb_sum, pages, product_sum
+
+NEO_ASSET = 'c56f33fc6ecfcd0c225c4ab356fee59390af8560be0e930faebe74a6daff7c9b'
+
+SECONDS_PER_HOUR = 3600
+
+# Metric accumulators by name, in registration order
+METRICS = {}
+
+
+def metric(cls):
+    """
+    Register a MetricAccumulator class under its name.
+    """
+    METRICS[cls.name] = cls
+    return cls
+
+
+def is_successful(tx):
+    """
+    Check the transaction was executed without error. Transactions without receipt fields, e.g.
+    read from blocks, are counted as successful.
+    """
+    return tx.get('txreceipt_status', '1') == '1' and tx.get('isError', '0') == '0'
+
+
+class TransactionReducer(object):
+
+    def update(self, transactions):
+        raise NotImplementedError('Need to implement update for a transaction reducer.')
+
+    def merge(self, other):
+        raise NotImplementedError('Need to implement merge for a transaction reducer.')
+
+    def result(self):
+        raise NotImplementedError('Need to implement result for a transaction reducer.')
+
+
+class MetricAccumulator(object):
+    """
+    Mergeable state of one metric: created empty (init), updated with each transaction, merged
+    with the accumulator of other transactions and finalized into metric values.
+    """
+    name = None
+
+    def __init__(self, reducer):
+        """
+        :param reducer: MetricsReducer the accumulator belongs to, e.g. for its addresses
+        """
+        self.reducer = reducer
+
+    def update(self, tx, user, successful):
+        """
+        :param tx: transaction in the Etherscan format
+        :param user: normalized address of the other side of the transaction
+        :param successful: the transaction was executed without error
+        """
+        raise NotImplementedError('Need to implement update for a metric accumulator.')
+
+    def update_page(self, page, users, successful):
+        """
+        Update with all the transactions of a page, by default with each transaction.
+
+        :param page: columnar.TransactionPage
+        :param users: codes of the users of the transactions in page.addresses
+        :param successful: mask of the transactions executed without error
+        """
+        for tx, user, tx_successful in page.rows(users, successful):
+            self.update(tx, user, tx_successful)
+
+    def merge(self, other):
+        raise NotImplementedError('Need to implement merge for a metric accumulator.')
+
+    def finalize(self):
+        """
+        :return: dict of metric name to JSON serializable value, empty if it cannot be computed
+        """
+        raise NotImplementedError('Need to implement finalize for a metric accumulator.')
+
+
+@metric
+class UsersMetric(MetricAccumulator):
+    """
+    Unique users of the successful transactions.
+    """
+    name = Metric.users.name
+
+    def __init__(self, reducer):
+        super(UsersMetric, self).__init__(reducer)
+        self.users = set()
+
+    def update(self, tx, user, successful):
+        if successful:
+            self.users.add(user)
+
+    def update_page(self, page, users, successful):
+        self.users.update(page.addresses[np.unique(users[successful])].tolist())
+
+    def merge(self, other):
+        self.users |= other.users
+
+    def finalize(self):
+        return {Metric.users.name: len(self.users)}
+
+
+@metric
+class VolumeMetric(MetricAccumulator):
+    """
+    Value of the successful transactions.
+    """
+    name = Metric.volume.name
+
+    def __init__(self, reducer):
+        super(VolumeMetric, self).__init__(reducer)
+        self.volume = 0
+
+    def update(self, tx, user, successful):
+        if successful:
+            self.volume += int(tx.get('value') or 0)
+
+    def update_page(self, page, users, successful):
+        self.volume += limb_sum(page.values, successful)
+
+    def merge(self, other):
+        self.volume += other.volume
+
+    def finalize(self):
+        return {Metric.volume.name: self.volume}
+
+
+@metric
+class TransactionsMetric(MetricAccumulator):
+    """
+    Number of successful transactions.
+    """
+    name = Metric.transactions.name
+
+    def __init__(self, reducer):
+        super(TransactionsMetric, self).__init__(reducer)
+        self.transactions = 0
+
+    def update(self, tx, user, successful):
+        if successful:
+            self.transactions += 1
+
+    def update_page(self, page, users, successful):
+        self.transactions += int(np.count_nonzero(successful))
+
+    def merge(self, other):
+        self.transactions += other.transactions
+
+    def finalize(self):
+        return {Metric.transactions.name: self.transactions}
+
+
+@metric
+class FailedMetric(MetricAccumulator):
+    """
+    Number and share of failed transactions, among the transactions with a receipt status.
+    """
+    name = Metric.failed_ratio.name
+
+    def __init__(self, reducer):
+        super(FailedMetric, self).__init__(reducer)
+        self.failed = 0
+        self.total = 0
+        self.unknown = 0
+
+    def update(self, tx, user, successful):
+        if 'txreceipt_status' in tx or 'isError' in tx:
+            self.total += 1
+            self.failed += not successful
+        else:
+            self.unknown += 1
+
+    def update_page(self, page, users, successful):
+        total = int(np.count_nonzero(page.has_receipt))
+        self.total += total
+        self.failed += total - int(np.count_nonzero(page.has_receipt & successful))
+        self.unknown += len(page) - total
+
+    def merge(self, other):
+        self.failed += other.failed
+        self.total += other.total
+        self.unknown += other.unknown
+
+    def finalize(self):
+        if self.unknown and not self.total:
+            return {}
+
+        return {Metric.failed_transactions.name: self.failed,
+                Metric.failed_ratio.name: self.failed / self.total if self.total else 0}
+
+
+@metric
+class GasMetric(MetricAccumulator):
+    """
+    Gas used and fees paid in wei by all transactions, failed ones included, among the
+    transactions with a receipt.
+    """
+    name = Metric.gas_used.name
+
+    def __init__(self, reducer):
+        super(GasMetric, self).__init__(reducer)
+        self.gas_used = 0
+        self.gas_fees = 0
+        self.total = 0
+
+    def update(self, tx, user, successful):
+        gas_used = tx.get('gasUsed')
+
+        if gas_used is not None:
+            self.gas_used += int(gas_used)
+            self.gas_fees += int(gas_used) * int(tx.get('gasPrice') or 0)
+            self.total += 1
+
+    def update_page(self, page, users, successful):
+        self.gas_used += int(page.gas_used[page.has_gas].sum(dtype=np.uint64))
+        self.gas_fees += product_sum(page.gas_used, page.gas_prices, page.has_gas)
+        self.total += int(np.count_nonzero(page.has_gas))
+
+    def merge(self, other):
+        self.gas_used += other.gas_used
+        self.gas_fees += other.gas_fees
+        self.total += other.total
+
+    def finalize(self):
+        if not self.total:
+            return {}
+
+        return {Metric.gas_used.name: self.gas_used,
+                Metric.gas_fees.name: self.gas_fees}
+
+
+@metric
+class HourlyMetric(MetricAccumulator):
+    """
+    Number of successful transactions per hour of the day (UTC).
+    """
+    name = Metric.hourly_transactions.name
+
+    def __init__(self, reducer):
+        super(HourlyMetric, self).__init__(reducer)
+        self.hours = [0] * 24
+
+    def update(self, tx, user, successful):
+        timestamp = tx.get('timeStamp')
+
+        if successful and timestamp:
+            self.hours[int(timestamp) // SECONDS_PER_HOUR % 24] += 1
+
+    def update_page(self, page, users, successful):
+        hours = np.bincount(page.timestamps[successful & (page.timestamps != 0)] // SECONDS_PER_HOUR % 24,
+                            minlength=24)
+        self.hours = [x + int(y) for x, y in zip(self.hours, hours)]
+
+    def merge(self, other):
+        self.hours = [x + y for x, y in zip(self.hours, other.hours)]
+
+    def finalize(self):
+        return {Metric.hourly_transactions.name: self.hours}
+
+
+class MetricsReducer(TransactionReducer):
+    """
+    Metrics of the transactions of the contract addresses of a dapp, computed in one pass by the
+    registered metric accumulators. Addresses are compared in lowercase.
+    """
+    lowercase = True
+
+    def __init__(self, addresses, names=None):
+        """
+        :param addresses: contract addresses of the dapp
+        :param names: metrics computed, all registered metrics by default
+        """
+        self.addresses = {self.normalize(x) for x in addresses}
+        self.names = list(names or METRICS)
+        self.accumulators = [METRICS[x](self) for x in self.names]
+
+    @classmethod
+    def normalize(cls, address):
+        return (address or '').lower() if cls.lowercase else address or ''
+
+    def update(self, transactions):
+        """
+        :param transactions: iterable of transactions in the Etherscan format, or a TransactionPage
+        """
+        for page in pages(transactions, lowercase=self.lowercase):
+            self.update_page(page)
+
+        return self
+
+    def update_page(self, page):
+        if not len(page):
+            return self
+
+        # The user of a transaction is its other side than the contract
+        contracts = page.codes(self.addresses)
+        users = np.where(contracts[page.from_codes], page.to_codes, page.from_codes)
+
+        for accumulator in self.accumulators:
+            accumulator.update_page(page, users, page.successful)
+
+        return self
+
+    def merge(self, other):
+        for accumulator, other_accumulator in zip(self.accumulators, other.accumulators):
+            accumulator.merge(other_accumulator)
+
+        return self
+
+    def sketch(self):
+        """
+        HyperLogLog sketch of the unique users, stored to merge unique users over windows.
+        """
+        users = next((x.users for x in self.accumulators if isinstance(x, UsersMetric)), ())
+        return HyperLogLog().update(users)
+
+    def result(self):
+        result = {}
+
+        for accumulator in self.accumulators:
+            result.update(accumulator.finalize())
+
+        return result
+
+
+class NeoMetricsReducer(MetricsReducer):
+    """
+    Metrics of the NEO contract addresses of a dapp from Neoscan address abstracts, with the NEO
+    amounts as volume. Abstracts only contain executed transactions. NEO addresses are case
+    sensitive and are not normalized.
+    """
+    lowercase = False
+
+    def update(self, entries):
+        return super(NeoMetricsReducer, self).update(
+            {'from': x.get('address_from'),
+             'to': x.get('address_to'),
+             'value': int(Decimal(x.get('amount'))) if x.get('asset') == NEO_ASSET else 0,
+             'timeStamp': x.get('time'),
+             'isError': '0'}
+            for x in entries)
+
+
+class VolumeTransactionsReducer(TransactionReducer):
+    """
+    In volume, out volume, and number of transactions between a user address and contract addresses.
+    Addresses are compared in lowercase.
+    """
+
+    def __init__(self, user_address, contract_addresses):
+        self.user_address = user_address.lower()
+        self.contract_addresses = {x.lower() for x in contract_addresses}
+        self.in_volume = 0
+        self.out_volume = 0
+        self.transactions = 0
+
+    def update(self, transactions):
+        for tx in transactions:
+
+            tx_from_address = (tx.get('from') or '').lower()
+            tx_to_address = (tx.get('to') or '').lower()
+
+            if tx_from_address == self.user_address and tx_to_address in self.contract_addresses:
+                self.out_volume += int(tx.get('value'))
+                self.transactions += 1
+            elif tx_from_address in self.contract_addresses and tx_to_address == self.user_address:
+                self.in_volume += int(tx.get('value'))
+                self.transactions += 1
+
+        return self
+
+    def merge(self, other):
+        self.in_volume += other.in_volume
+        self.out_volume += other.out_volume
+        self.transactions += other.transactions
+        return self
+
+    def result(self):
+        return {'in_volume': self.in_volume,
+                'out_volume': self.out_volume,
+                'transactions': self.transactions}
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of ethereum transactions per address.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import scoped_session
+
+from dapp_store_backend.models.address_sync import AddressSync
+from dapp_store_backend.models.transaction import Transaction
+from dapp_store_backend.worker.constants import Metric
+
+
+def transaction_to_row(address, tx):
+    """
+    Convert an Etherscan transaction into an eth_transaction row.
+    """
+    return {'address': address,
+            'hash': tx.get('hash'),
+            'block_number': int(tx.get('blockNumber')),
+            'transaction_index': int(tx.get('transactionIndex') or 0),
+            'timestamp': int(tx.get('timeStamp')),
+            'from_address': (tx.get('from') or '').lower(),
+            'to_address': (tx.get('to') or '').lower(),
+            'value': int(tx.get('value') or 0),
+            'gas_used': int(tx.get('gasUsed') or 0),
+            'gas_price': int(tx.get('gasPrice') or 0),
+            'receipt_status': tx.get('txreceipt_status') == '1',
+            'is_error': tx.get('isError') != '0'}
+
+
+def row_to_transaction(row):
+    """
+    Convert an eth_transaction row back into the Etherscan transaction format.
+    """
+    return {'hash': row.hash,
+            'blockNumber': str(row.block_number),
+            'transactionIndex': str(row.transaction_index),
+            'timeStamp': str(row.timestamp),
+            'from': row.from_address,
+            'to': row.to_address,
+            'value': str(int(row.value)),
+            'gasUsed': str(row.gas_used),
+            'gasPrice': str(int(row.gas_price)),
+            'txreceipt_status': '1' if row.receipt_status else '0',
+            'isError': '1' if row.is_error else '0'}
+
+
+class TransactionStore(object):
+    """
+    Caches the transactions of addresses in the eth_transaction table.
+
+    address_sync keeps the contiguous block range cached for every address, so syncing an address
+    only downloads the blocks outside of that range. The index of Etherscan lags the head of the
+    chain, so the range only extends to blocks confirmations behind the latest block, or to the
+    last block with transactions returned: later blocks are downloaded again by the next sync
+    instead of being marked as cached while still missing.
+    """
+
+    def __init__(self, etherscan, session, confirmations=0):
+        """
+        :param confirmations: blocks behind the latest block that Etherscan has indexed completely
+        """
+        self.etherscan = etherscan
+        self.session = session
+        self.confirmations = confirmations
+
+    def _create(self, address, block_start):
+        """
+        Create the sync state of an address if it does not exist yet.
+        """
+        if not self.session.query(AddressSync).filter_by(address=address).first():
+            try:
+                # Empty range just before block_start
+                self.session.add(AddressSync(address=address, block_start=block_start, block_stop=block_start - 1))
+                self.session.commit()
+            except IntegrityError:
+                self.session.rollback()
+
+    def _lock(self, addresses, block_start):
+        """
+        Get the sync states of addresses, locked until commit so concurrent syncs do not
+        download the same range. Rows are locked in address order to avoid deadlocks.
+
+        The lock is held while downloading: the transactions are inserted as they are downloaded,
+        in the database transaction extending the cached range, so a concurrent sync of the same
+        address waits for the range to be cached rather than inserting the same transactions.
+        Syncs of other addresses are not blocked.
+        """
+        for address in addresses:
+            self._create(address, block_start)
+
+        return (self.session.query(AddressSync).filter(AddressSync.address.in_(addresses))
+                .order_by(AddressSync.address).with_for_update().all())
+
+    @staticmethod
+    def _missing_ranges(address_sync, block_start, block_stop):
+        """
+        Block ranges (inclusive) between block_start and block_stop outside of the cached range.
+        """
+        ranges = []
+
+        if block_start < address_sync.block_start:
+            ranges.append((block_start, address_sync.block_start - 1))
+
+        if block_stop > address_sync.block_stop:
+            # Also fills the gap when the cached range ends before block_start
+            ranges.append((address_sync.block_stop + 1, block_stop))
+
+        return ranges
+
+    @staticmethod
+    def _extend(address_sync, block_start, block_stop, last_blocks, confirmed_block=None):
+        """
+        :param last_blocks: last block with transactions of each downloaded range, None if empty
+        :param confirmed_block: latest block indexed completely when the ranges were downloaded
+        """
+        address_sync.block_start = min(address_sync.block_start, block_start)
+        stops = [address_sync.block_stop] + [x for x in last_blocks if x is not None]
+
+        if confirmed_block is not None:
+            # Addresses without recent transactions are cached up to the confirmed blocks
+            stops.append(min(block_stop, confirmed_block))
+
+        address_sync.block_stop = max(stops)
+
+    def _insert(self, address, transactions, session=None):
+        if transactions:
+            (session or self.session).execute(Transaction.__table__.insert(),
+                                              [transaction_to_row(address, x) for x in transactions])
+
+        return len(transactions)
+
+    def _download(self, address, block_start, block_stop):
+        """
+        Insert the transactions of an address between block_start and block_stop in batches,
+        decoded while the responses are read, so memory does not grow with the responses.
+
+        :return: last block with transactions, None if there are none
+        """
+        count = 0
+        last_block = None
+
+        for transactions in self.etherscan.get_transaction_batches(address, block_start, block_stop):
+            count += self._insert(address, transactions)
+            last_block = int(transactions[-1].get('blockNumber'))
+
+        print('Cached {} transactions of {} for blocks {}-{}.'.format(count, address, block_start, block_stop))
+        return last_block
+
+    async def _download_async(self, etherscan, executor, session, address, block_start, block_stop):
+        """
+        Like _download with an AsyncEtherscan. Batches are inserted with session in executor so
+        the event loop keeps downloading while the database executes the inserts.
+        """
+        loop = asyncio.get_event_loop()
+        count = 0
+        last_block = None
+
+        async for transactions in etherscan.get_transaction_batches(address, block_start, block_stop):
+            count += await loop.run_in_executor(executor, self._insert, address, transactions, session)
+            last_block = int(transactions[-1].get('blockNumber'))
+
+        print('Cached {} transactions of {} for blocks {}-{}.'.format(count, address, block_start, block_stop))
+        return last_block
+
+    def sync(self, address, block_start, block_stop):
+        """
+        Make sure all transactions of an address between block_start and block_stop (inclusive)
+        are cached, downloading only the missing blocks.
+        """
+        address = address.lower()
+        address_sync, = self._lock([address], block_start)
+
+        try:
+            ranges = self._missing_ranges(address_sync, block_start, block_stop)
+            confirmed_block = self.etherscan.get_latest_block() - self.confirmations if ranges else None
+            last_blocks = [self._download(address, start, stop) for start, stop in ranges]
+
+            self._extend(address_sync, block_start, block_stop, last_blocks, confirmed_block)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    async def sync_many(self, etherscan, addresses, block_start, block_stop):
+        """
+        Like sync for several addresses, downloading the missing blocks of all addresses
+        concurrently with an AsyncEtherscan.
+
+        The inserts run one at a time on a single thread. They must use the session holding the
+        locks: a scoped session would give the thread its own session and database transaction.
+        """
+        addresses = sorted({x.lower() for x in addresses})
+        address_syncs = self._lock(addresses, block_start)
+        session = self.session() if isinstance(self.session, scoped_session) else self.session
+
+        try:
+            ranges = [(x, start, stop) for x in address_syncs
+                      for start, stop in self._missing_ranges(x, block_start, block_stop)]
+            confirmed_block = await etherscan.get_latest_block() - self.confirmations if ranges else None
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                last_blocks = await asyncio.gather(*[self._download_async(etherscan, executor, session,
+                                                                          x.address, start, stop)
+                                                     for x, start, stop in ranges])
+
+            for address_sync in address_syncs:
+                self._extend(address_sync, block_start, block_stop,
+                             [y for (x, _, _), y in zip(ranges, last_blocks) if x is address_sync], confirmed_block)
+
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def get_transactions(self, address, block_start, block_stop):
+        """
+        Generator of the cached transactions of an address between block_start and block_stop
+        (inclusive) in the Etherscan format, ordered like Etherscan. Rows are streamed from a
+        server side cursor in batches.
+        """
+        rows = (self.session.query(Transaction)
+                .filter(Transaction.address == address.lower(),
+                        Transaction.block_number >= block_start,
+                        Transaction.block_number <= block_stop)
+                .order_by(Transaction.block_number, Transaction.transaction_index)
+                .execution_options(stream_results=True)
+                .yield_per(10000))
+
+        for row in rows:
+            yield row_to_transaction(row)
+
+    def count_new_users(self, addresses, block_start, block_stop):
+        """
+        Count the users of the successful cached transactions of addresses between block_start and
+        block_stop (inclusive) never seen before block_start (new) and already seen (returning).
+        Users are normalized like MetricsReducer users and counted in the database.
+
+        Only counted if the whole history of all addresses is cached, like get_first_transaction,
+        otherwise users seen in the blocks before the cached range would be counted as new.
+
+        :return: dict of the new_users and returning_users metrics, or None
+        """
+        addresses = [x.lower() for x in addresses]
+        address_syncs = self.session.query(AddressSync).filter(AddressSync.address.in_(addresses)).all()
+
+        if len(address_syncs) < len(set(addresses)) or any(x.block_start > 0 for x in address_syncs):
+            return None
+
+        user = case([(Transaction.from_address.in_(addresses), Transaction.to_address)],
+                    else_=Transaction.from_address).label('user')
+        successful = [Transaction.address.in_(addresses), Transaction.receipt_status, ~Transaction.is_error]
+
+        users = (self.session.query(user)
+                 .filter(Transaction.block_number >= block_start, Transaction.block_number <= block_stop,
+                         *successful)
+                 .distinct().subquery())
+        known_users = (self.session.query(user)
+                       .filter(Transaction.block_number < block_start, *successful)
+                       .distinct().subquery())
+
+        total, returning = (self.session.query(func.count(users.c.user), func.count(known_users.c.user))
+                            .select_from(users)
+                            .outerjoin(known_users, known_users.c.user == users.c.user)
+                            .one())
+
+        return {Metric.new_users.name: total - returning,
+                Metric.returning_users.name: returning}
+
+    def get_first_transaction(self, address):
+        """
+        Get the first transaction of an address if its whole history is cached, otherwise None.
+        """
+        address = address.lower()
+        address_sync = self.session.query(AddressSync).filter_by(address=address).first()
+
+        if not address_sync or address_sync.block_start > 0:
+            return None
+
+        row = (self.session.query(Transaction).filter(Transaction.address == address)
+               .order_by(Transaction.block_number, Transaction.transaction_index).first())
+
+        return row_to_transaction(row) if row else None
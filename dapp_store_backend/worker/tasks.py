@@ -1,8 +1,7 @@
 import os
 from datetime import datetime, timedelta
-from time import sleep
 from decimal import Decimal
-from numpy import array, log, argsort
+from celery import chain, chord, group
 from celery.exceptions import SoftTimeLimitExceeded
 from sqlalchemy import desc
 from sqlalchemy.exc import IntegrityError
@@ -11,20 +10,31 @@ from sqlalchemy.orm import noload
 from web3 import Web3
 
 import dapp_store_backend.models as models
+from dapp_store_backend.caching import DAPPS, DAPP_OF_THE_DAY, REVIEW_OF_THE_DAY, invalidate, invalidate_dapp
 from dapp_store_backend.settings import DevConfig, ProdConfig
 from dapp_store_backend.enums.categories import DappCategory
-from dapp_store_backend.api.v1.public.dapp import ListDapps
 from dapp_store_backend.schemas.blockchain_schema import BlockchainSchema
 from dapp_store_backend.schemas.block_interval_schema import BlockIntervalSchema
 from dapp_store_backend.schemas.review_schema import ReviewSchema
 from dapp_store_backend.schemas.dapp_list_address_schema import DappListAddressSchema
+from dapp_store_backend.services import ranking
+from dapp_store_backend.services.activity import dapp_activity, update_dapp_activity
+from dapp_store_backend.services.listing import query_dapp_list, refresh_dapp_listing
+from dapp_store_backend.services.ratings import update_rating_aggregate, valid_rating
 from dapp_store_backend.app import celery
 from dapp_store_backend.extensions import db
+from dapp_store_backend.worker.services.async_services import AsyncEtherscan, run
+from dapp_store_backend.worker.services.block_resolver import BlockTimeResolver
+from dapp_store_backend.worker.services.block_scanner import BlockScanner
 from dapp_store_backend.worker.services.etherscan import Etherscan
 from dapp_store_backend.worker.services.infura import Infura
-from dapp_store_backend.worker.services.utilities import combine_dict_same_keys, extract_uvt_from_transactions, extract_vt_from_transactions, wrap_result
+from dapp_store_backend.worker.services.neoscan import Neoscan
+from dapp_store_backend.worker.services.rate_limiter import create_rate_limiter
+from dapp_store_backend.worker.services.transaction_store import TransactionStore
+from dapp_store_backend.worker.services.reducers import MetricsReducer, NeoMetricsReducer, VolumeTransactionsReducer
+from dapp_store_backend.worker.services.utilities import wrap_result
 from dapp_store_backend.utilities import round_down_datetime
-from .constants import Metric, Network
+from .constants import Network
 
 
 if os.environ.get("DAPP_STORE_BACKEND_ENV") == 'prod':
@@ -32,9 +42,19 @@ if os.environ.get("DAPP_STORE_BACKEND_ENV") == 'prod':
 else:
     config = DevConfig
 
-# Initialize 3rd-party API wrappers
-etherscan = Etherscan(config.ETHERSCAN_API_KEY)
-infura = Infura(config.INFURA_API_KEY, Network.mainnet)
+# Initialize 3rd-party API wrappers, rate limited across all worker processes
+etherscan = Etherscan(config.ETHERSCAN_API_KEY,
+                      rate_limiter=create_rate_limiter('etherscan', config.ETHERSCAN_RATE_LIMIT, config))
+infura = Infura(config.INFURA_API_KEY, Network.mainnet,
+                rate_limiter=create_rate_limiter('infura', config.INFURA_RATE_LIMIT, config),
+                batch_size=config.INFURA_BATCH_SIZE)
+neoscan = Neoscan(config.NEOSCAN_API_KEY, network=config.NEOSCAN_NETWORK,
+                  max_workers=config.NEOSCAN_CONCURRENCY)
+transaction_store = TransactionStore(etherscan, db.session, confirmations=config.ETHERSCAN_CONFIRMATIONS)
+
+# Clients resolving the blocks of times, by blockchain symbol
+BLOCK_CLIENTS = {'ETH': infura,
+                 'NEO': neoscan}
 
 
 @celery.on_after_finalize.connect
@@ -100,11 +120,12 @@ def get_contract_deployment_date(contracts):
         # go through each of the contracts
         for contract in contracts:
             try:
-                transactions = etherscan.get_transactions(contract, 0, 99999999)
+                # get the first transaction, from the transaction store if the whole history is cached
+                transaction = (transaction_store.get_first_transaction(contract) or
+                               etherscan.get_first_transaction(contract))
 
-                if transactions:
-                    # get the first transaction
-                    inception_date = int(transactions[0].get('timeStamp'))
+                if transaction:
+                    inception_date = int(transaction.get('timeStamp'))
 
                     if inception_date:
                         deployment_dates.append(inception_date)
@@ -153,11 +174,10 @@ def update_block_day():
         blockchain_id = blkchain.get('id')
         symbol = blkchain.get('symbol')
 
-        # TODO: remove once conditional implemented for every blockchain
         completed_block_interval = {}
 
-        if symbol == 'ETH':
-            block_start = get_start_block_eth(rounded_time).get('result')
+        if symbol in START_BLOCK_TASKS:
+            block_start = START_BLOCK_TASKS[symbol](rounded_time).get('result')
 
             current_block_interval_results = models.BlockInterval.query.options(noload('*'))\
                 .filter_by(blockchain_id=blockchain_id,
@@ -169,12 +189,15 @@ def update_block_day():
                            time_start=rounded_time - config.FETCHER_BLOCK_INTERVAL).first()
             last_block_interval = block_interval_schema.dump(last_block_interval_results).data
 
+            if not block_start:
+                # Skip this blockchain, the others are still updated
+                print('No start block found for {} at {}.'.format(symbol, rounded_time))
+                block_intervals[symbol] = completed_block_interval
+                continue
+
             if last_block_interval.get('time_stop') == rounded_time:
                 block_interval = models.BlockInterval.query.get(last_block_interval.get('id'))
 
-                if not block_interval or not block_start:
-                    return {}
-
                 if not block_interval.block_start:
                     block_interval.block_start = 0
 
@@ -198,10 +221,7 @@ def update_block_day():
 
                 except IntegrityError as e:
                     db.session().rollback()
-                    return {'Error': '({}, {}) already exists.'.format(blockchain_id, rounded_time)}
-
-        elif symbol == 'NEO':
-            completed_block_interval = {}
+                    print('Error: ({}, {}) already exists.'.format(blockchain_id, rounded_time))
 
         block_intervals[symbol] = completed_block_interval
 
@@ -209,132 +229,370 @@ def update_block_day():
     return block_intervals
 
 
-@celery.task(name='get_dapp_metrics')
-def get_dapp_metrics(block_interval_dict):
+@celery.task(name='backfill_dapp_metrics', soft_time_limit=600, time_limit=660)
+def backfill_dapp_metrics(symbol, time_start, time_stop):
+    """
+    Backfill block intervals and dapp metrics between time_start (inclusive) and time_stop (exclusive).
+
+    Up to config.BACKFILL_BATCH_SIZE missing or incomplete intervals are resolved and committed one at a
+    time, their metrics are fetched by get_dapp_metrics, and the task continues with the rest of the range.
+    Existing intervals and metrics are skipped, so an interrupted backfill resumes when run again.
+    """
+    if symbol not in BLOCK_CLIENTS:
+        return {'status': 'FAILED', 'message': 'Backfill not supported for {}.'.format(symbol)}
+
+    blockchain = models.Blockchain.query.filter_by(symbol=symbol).first()
+
+    if not blockchain:
+        return {'status': 'FAILED', 'message': 'Blockchain {} not found.'.format(symbol)}
+
+    interval = config.FETCHER_BLOCK_INTERVAL
+    time_start -= time_start % interval
+    time_stop = min(time_stop, int(datetime.utcnow().timestamp()))
+
+    block_intervals = {x.time_start: x for x in models.BlockInterval.query.options(noload('*'))
+                       .filter(models.BlockInterval.blockchain_id == blockchain.id,
+                               models.BlockInterval.time_start >= time_start,
+                               models.BlockInterval.time_start < time_stop).all()}
+
+    resolver = BlockTimeResolver(BLOCK_CLIENTS[symbol], anchors=get_block_interval_anchors(symbol, time_start) +
+                                 [(x.block_start, x.time_start) for x in block_intervals.values() if x.block_start])
+
+    block_interval_schema = BlockIntervalSchema()
+    start_blocks = {k: v.block_start for k, v in block_intervals.items() if v.block_start}
+    completed = []
+    error = None
+    t = time_start
+
+    # Only intervals that are over can be completed
+    while t + interval <= time_stop and len(completed) < config.BACKFILL_BATCH_SIZE:
+        block_interval = block_intervals.get(t)
+
+        if not block_interval or not block_interval.block_start or not block_interval.block_stop:
+            try:
+                # The stop block of an interval is the start block of the next one
+                for x in (t, t + interval):
+                    if x not in start_blocks:
+                        start_blocks[x] = resolver.resolve(x)
+            except ValueError as e:
+                # Resumed from t when the backfill is run again
+                error = 'Could not resolve the blocks of {} at {}: {}'.format(symbol, t, e)
+                break
+
+            block_start = start_blocks[t]
+            block_stop = start_blocks[t + interval]
+
+            if not block_interval:
+                block_interval = models.BlockInterval(blockchain_id=blockchain.id, time_start=t, time_stop=t + interval)
+                db.session.add(block_interval)
+
+            block_interval.block_start = block_start
+            block_interval.block_stop = block_stop
+
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Interval created concurrently by update_block_day
+                db.session().rollback()
+                block_interval = (models.BlockInterval.query.options(noload('*'))
+                                  .filter_by(blockchain_id=blockchain.id, time_start=t).first())
+
+                if not block_interval or not block_interval.block_start or not block_interval.block_stop:
+                    # Not completed yet by update_block_day
+                    print('Skipping incomplete block interval of {} at {}.'.format(symbol, t))
+                    t += interval
+                    continue
+
+        if block_interval.block_stop > block_interval.block_start:
+            completed.append({symbol: block_interval_schema.dump(block_interval).data})
+
+        t += interval
+
+    print('Backfilling {} block intervals for {} from {}.'.format(len(completed), symbol, time_start))
+
+    tasks = [get_dapp_metrics.si(x) | add_dapp_metrics.s() for x in completed]
+
+    if t + interval <= time_stop and not error:
+        tasks.append(backfill_dapp_metrics.si(symbol, t, time_stop))
+
+    if tasks:
+        chain(*tasks).delay()
+
+    if error:
+        print(error)
+        return {'status': 'FAILED', 'message': error, 'block_intervals': len(completed), 'next_time_start': t}
+
+    return {'status': 'SUCCESS', 'block_intervals': len(completed), 'next_time_start': t}
+
+
+@celery.task(name='get_dapp_metrics', bind=True)
+def get_dapp_metrics(self, block_interval_dict):
     """
     Get all dapp metrics for a specific block interval.
+
+    The dapps are fetched by one get_single_dapp_metrics subtask each, in waves of at most
+    config.METRICS_CONCURRENCY subtasks. Every wave but the last is stored by collect_dapp_metrics
+    as it completes, so only the metrics of one wave are passed between tasks; the result is the
+    add_dapp_metrics payload of the last wave.
     """
     dapp_results = {'metrics': []}
 
     if not any(block_interval_dict.get(x) for x in block_interval_dict):
         return dapp_results
 
-    # TODO: add check for existing dapp metrics and skip if exists
     dapp_list_address_schema = DappListAddressSchema(many=True)
     results = (models.Dapp.query.join(models.Blockchain).with_entities(models.Dapp.id, models.Blockchain.symbol,
                                                                        models.Dapp.address).all())
     dapps = dapp_list_address_schema.dump(results).data
 
-    for dapp in dapps:
+    # Skip dapps with existing metrics for the block interval
+    block_interval_ids = [x.get('id') for x in block_interval_dict.values() if x]
+    existing = set(db.session.query(models.Metric.dapp_id, models.Metric.block_interval_id)
+                   .filter(models.Metric.block_interval_id.in_(block_interval_ids)).all())
 
-        id = dapp.get('id')
-        symbol = dapp.get('symbol')
-        address = dapp.get('address')
+    # Skip dapps on blockchains without a completed block interval
+    dapps = [x for x in dapps if (block_interval_dict.get(x.get('symbol')) or {}).get('block_start') and
+             (block_interval_dict.get(x.get('symbol')) or {}).get('block_stop') and
+             (x.get('id'), block_interval_dict.get(x.get('symbol')).get('id')) not in existing]
 
-        block_interval = block_interval_dict.get(symbol)
-        block_start = block_interval.get('block_start')
-        block_stop = block_interval.get('block_stop')
-        block_interval_id = block_interval.get('id')
+    if config.METRICS_INGESTION_MODE == 'blocks':
+        # All ethereum dapps at once, the other blockchains per dapp
+        eth_dapps = [x for x in dapps if x.get('symbol') == 'ETH']
+        dapps = [x for x in dapps if x.get('symbol') != 'ETH']
 
-        if not block_start or not block_stop:
-            continue
+        if eth_dapps:
+            dapp_results['metrics'].extend(x for x in scan_dapp_metrics(eth_dapps, block_interval_dict.get('ETH'))
+                                           if x.get('metrics'))
 
-        results = {}
-        results['dapp_id'] = id
+    if not dapps:
+        return dapp_results
+
+    if dapp_results['metrics']:
+        # Metrics of the block scan are stored before fetching the other dapps
+        add_dapp_metrics(dapp_results)
+
+    concurrency = max(1, config.METRICS_CONCURRENCY)
+    waves = [dapps[i:i + concurrency] for i in range(0, len(dapps), concurrency)]
+
+    raise self.replace(dapp_metrics_wave(waves, block_interval_dict))
 
+
+def dapp_metrics_wave(waves, block_interval_dict):
+    """
+    Build the chord fetching the first wave of dapps. The chord body stores the results and
+    schedules the remaining waves.
+    """
+    header = group(get_single_dapp_metrics.s(dapp, block_interval_dict) for dapp in waves[0])
+    return chord(header, collect_dapp_metrics.s(waves[1:], block_interval_dict))
+
+
+@celery.task(name='get_single_dapp_metrics')
+def get_single_dapp_metrics(dapp, block_interval_dict):
+    """
+    Get metrics for a single dapp in a block interval.
+    Errors are caught so one failing dapp does not fail the whole chord.
+    """
+    id = dapp.get('id')
+    symbol = dapp.get('symbol')
+    address = dapp.get('address')
+
+    block_interval = block_interval_dict.get(symbol) or {}
+    block_start = block_interval.get('block_start')
+    block_stop = block_interval.get('block_stop')
+
+    results = {'dapp_id': id,
+               'block_interval_id': block_interval.get('id'),
+               'metrics': None,
+               'users_sketch': None}
+
+    try:
         if symbol == 'ETH':
-            results['metrics'] = get_users_volume_transactions(
-                address, block_start, block_stop - 1).get('result')
+            metrics = get_users_volume_transactions(address, block_start, block_stop - 1).get('result')
+            if metrics:
+                results['users_sketch'] = metrics.pop('users_sketch', None)
+                results['metrics'] = metrics
+        elif symbol == 'NEO':
+            metrics = get_neo_users_volume_transactions(address, block_start, block_stop - 1).get('result')
+            if metrics:
+                results['users_sketch'] = metrics.pop('users_sketch', None)
+                results['metrics'] = metrics
+    except Exception as e:
+        print('Error getting metrics for dapp {}: {}'.format(id, e))
 
-            results['block_interval_id'] = block_interval_id
+    return results
 
-        dapp_results['metrics'].append(results)
 
-        sleep(0.5)
+def scan_dapp_metrics(dapps, block_interval):
+    """
+    Get metrics for ethereum dapps in a block interval with one scan of its blocks.
+    Errors are caught like in get_single_dapp_metrics, the dapps are then left without metrics.
+
+    :return: list of results in the format of get_single_dapp_metrics
+    """
+    try:
+        scanner = BlockScanner(infura, dapps, window=config.BLOCK_SCAN_WINDOW).scan(
+            block_interval.get('block_start'), block_interval.get('block_stop') - 1)
+    except Exception as e:
+        print('Error scanning blocks for {} dapps: {}'.format(len(dapps), e))
+        return []
+
+    results = []
+    for dapp_id, reducer in scanner.dapp_reducers().items():
+        results.append({'dapp_id': dapp_id,
+                        'block_interval_id': block_interval.get('id'),
+                        'metrics': reducer.result(),
+                        'users_sketch': reducer.sketch().to_base64()})
+
+    return results
+
+
+@celery.task(name='collect_dapp_metrics', bind=True)
+def collect_dapp_metrics(self, wave_results, pending_waves, block_interval_dict):
+    """
+    Reduce a wave of get_single_dapp_metrics results into the add_dapp_metrics payload.
+    Dapps without metrics are dropped. If there is a next wave, the payload is stored and the
+    task continues with the next wave, otherwise it is returned to the add_dapp_metrics of the chain.
+    """
+    dapp_results = {'metrics': [x for x in wave_results if x and x.get('metrics')]}
+
+    if pending_waves:
+        add_dapp_metrics(dapp_results)
+        raise self.replace(dapp_metrics_wave(pending_waves, block_interval_dict))
 
     return dapp_results
 
 
-@celery.task(name='get_start_block_eth')
-def get_start_block_eth(epoch_time=None):
+def resolve_start_block(symbol, client, epoch_time=None):
     """
-    Get first ethereum block for a specific epoch time.
-    Epoch time must be within 300 seconds of latest block time.
+    Get first block of a blockchain for a specific epoch time.
+    Start blocks of existing block intervals are used as anchors for the search.
     """
     if not epoch_time:
         epoch_time = int(datetime.utcnow().timestamp())
 
     print('EPOCH TIME: {}'.format(epoch_time))
-    latest_block_info = infura.get_block_by_number('latest')
+    resolver = BlockTimeResolver(client, anchors=get_block_interval_anchors(symbol, epoch_time))
 
-    latest_block_time = int(latest_block_info.get('timestamp'), 16)
-    latest_block_number = int(latest_block_info.get('number'), 16)
+    try:
+        block_number = resolver.resolve(epoch_time)
+    except ValueError as e:
+        return {'state': 0,
+                'message': 'Error: Could not find starting block for {t} time: {e}'.format(t=epoch_time, e=e),
+                'result': None}
 
-    if abs(epoch_time - latest_block_time) > 300:
-        return {'state': 0, 'message': 'Error: Difference between target time and latest block time > 300s.', 'result': None}
+    print('Found starting block: {} after {} calls'.format(block_number, resolver.calls))
+    return wrap_result(block_number)
 
-    increment = 1 if (epoch_time > latest_block_time) else -1
-    i = 0
-    block_number = latest_block_number + increment
 
-    while i < 100:
-        print('Block number: {}'.format(block_number))
-        block_info = infura.get_block_by_number(block_number)
+@celery.task(name='get_start_block_eth')
+def get_start_block_eth(epoch_time=None):
+    """
+    Get first ethereum block for a specific epoch time.
+    """
+    return resolve_start_block('ETH', BLOCK_CLIENTS['ETH'], epoch_time)
+
+
+@celery.task(name='get_start_block_neo')
+def get_start_block_neo(epoch_time=None):
+    """
+    Get first NEO block for a specific epoch time.
+    """
+    return resolve_start_block('NEO', BLOCK_CLIENTS['NEO'], epoch_time)
+
 
-        if not block_info:
-            print('No block info found for block {}'.format(block_number))
-            sleep(10)
-            continue
+START_BLOCK_TASKS = {'ETH': get_start_block_eth,
+                     'NEO': get_start_block_neo}
 
-        block_time = int(block_info.get('timestamp'), 16)
 
-        if increment == 1 and block_time >= epoch_time:
-            print('Found starting block: {}'.format(block_number))
-            return wrap_result(block_number)
-        elif increment == -1 and block_time < epoch_time:
-            print('Found starting block: {}'.format(block_number + 1))
-            return wrap_result(block_number + 1)
+def get_block_interval_anchors(symbol, epoch_time):
+    """
+    Get (block_start, time_start) of the closest block intervals before and after epoch time.
+    """
+    block_intervals = (models.BlockInterval.query.options(noload('*'))
+                       .join(models.Blockchain)
+                       .filter(models.Blockchain.symbol == symbol, models.BlockInterval.block_start > 0))
 
-        block_number += increment
-        sleep(0.5)
+    before = (block_intervals.filter(models.BlockInterval.time_start <= epoch_time)
+              .order_by(models.BlockInterval.time_start.desc()).first())
+    after = (block_intervals.filter(models.BlockInterval.time_start >= epoch_time)
+             .order_by(models.BlockInterval.time_start.asc()).first())
 
-    return {'state': 0,
-            'message': 'Error: Could not find starting block for {t} time after {i} iterations'.format(t=epoch_time, i=i),
-            'result': None}
+    return [(x.block_start, x.time_start) for x in (before, after) if x]
 
 
 @celery.task(name='get_users_volume_transactions', retry_backoff=2, max_retries=5)
 def get_users_volume_transactions(contract_addresses, block_start, block_stop):
     """
-    Get the unique users, volume, and number of transactions for multiple
-    addresses (single dapp) between block_start and block_stop
+    Get the metrics of MetricsReducer (unique users, volume, number of transactions and the
+    other registered metrics) for multiple addresses (single dapp) between block_start and block_stop.
+    New and returning users are counted in the database if the whole history of the addresses is cached.
 
     Args:
         contract_addresses (list(str)): Target ethereum addresses
         block_start (int): Start block
         block_stop (int): End block
     """
-    result = {
-        Metric.users.name: [],
-        Metric.volume.name: 0,
-        Metric.transactions.name: 0
-    }
+    if not contract_addresses:
+        return wrap_result(None)
 
     try:
+        # Missing blocks of all addresses are downloaded concurrently
+        run(sync_addresses(contract_addresses, block_start, block_stop))
+
+        reducer = MetricsReducer(contract_addresses)
+
         for address in contract_addresses:
-            result = combine_dict_same_keys(result, etherscan.process_transactions(
-                lambda x: extract_uvt_from_transactions(x, address), address,
-                block_start, block_stop))
+            # Cached transactions are streamed, only the running metrics are kept in memory
+            reducer.update(transaction_store.get_transactions(address, block_start, block_stop))
 
-            sleep(0.5)
+        result = reducer.result()
+        result.update(transaction_store.count_new_users(contract_addresses, block_start, block_stop) or {})
+        result['users_sketch'] = reducer.sketch().to_base64()
+        return wrap_result(result)
+    except SoftTimeLimitExceeded:
+        print('Error: SoftTimeLimitExceeded.')
+        return wrap_result(None)
+
+
+@celery.task(name='get_neo_users_volume_transactions', retry_backoff=2, max_retries=5)
+def get_neo_users_volume_transactions(contract_addresses, block_start, block_stop):
+    """
+    Get the metrics of NeoMetricsReducer (unique users, NEO volume, number of transactions and
+    the other registered metrics) for multiple NEO addresses (single dapp) between block_start and block_stop
+
+    Args:
+        contract_addresses (list(str)): Target NEO addresses
+        block_start (int): Start block
+        block_stop (int): End block
+    """
+    if not contract_addresses:
+        return wrap_result(None)
+
+    try:
+        reducer = NeoMetricsReducer(contract_addresses)
+
+        for address in contract_addresses:
+            # Address abstracts are streamed newest first, down to block_start
+            reducer.update(neoscan.get_transactions(address, block_start, block_stop))
 
-        result[Metric.users.name] = len(set(result.get(Metric.users.name)))
+        result = reducer.result()
+        result['users_sketch'] = reducer.sketch().to_base64()
         return wrap_result(result)
     except SoftTimeLimitExceeded:
         print('Error: SoftTimeLimitExceeded.')
         return wrap_result(None)
 
 
+async def sync_addresses(addresses, block_start, block_stop):
+    """
+    Cache the transactions of addresses between block_start and block_stop with an async
+    Etherscan client sharing the rate limit of the sync client.
+    """
+    async with AsyncEtherscan(config.ETHERSCAN_API_KEY, rate_limiter=etherscan.rate_limiter,
+                              limit_per_host=config.ASYNC_LIMIT_PER_HOST, timeout=config.ASYNC_TIMEOUT) as client:
+        await transaction_store.sync_many(client, addresses, block_start, block_stop)
+
+
 @celery.task(name='get_eth_volume_and_transactions', retry_backoff=2, max_retries=5)
 def get_eth_volume_and_transactions(user_address, contract_addresses):
     """
@@ -343,12 +601,14 @@ def get_eth_volume_and_transactions(user_address, contract_addresses):
     """
     # TODO: consider creating table in DB to track tasks
     try:
-        result = etherscan.process_transactions(
-            lambda x: extract_vt_from_transactions(
-                x, user_address, contract_addresses),
-            user_address, 0, 99999999)
+        # Only the blocks since the last review of the user are downloaded, up to a confirmed block
+        block_stop = etherscan.get_latest_block() - config.ETHERSCAN_CONFIRMATIONS
+        transaction_store.sync(user_address, 0, block_stop)
 
-        return wrap_result(result)
+        reducer = VolumeTransactionsReducer(user_address, contract_addresses).update(
+            transaction_store.get_transactions(user_address, 0, block_stop))
+
+        return wrap_result(reducer.result())
     except SoftTimeLimitExceeded:
         print('Error: SoftTimeLimitExceeded.')
         return wrap_result(None)
@@ -360,8 +620,6 @@ def calculate_dapp_ranking():
     Calculate dapp ranking for all dapps
     :return:
     """
-    dapps = ListDapps.get_dapps(category=DappCategory.ALL.name)
-
     # Get block interval
     # TODO: get latest block interval for all blockchains
     time_start = (int(round_down_datetime(
@@ -371,59 +629,31 @@ def calculate_dapp_ranking():
     block_interval_first = (db.session.query(func.min(models.BlockInterval.id))
                             .filter(models.BlockInterval.time_start >= time_start).subquery())
 
-    metric_latest = (db.session.query(models.Metric.dapp_id,
-                                      func.max(models.Metric.block_interval_id).label('latest_block_interval'))
-                     .filter(models.Metric.block_interval_id >= block_interval_first)
-                     .group_by(models.Metric.dapp_id)
-                     .first())
+    latest_block_interval = (db.session.query(func.max(models.Metric.block_interval_id))
+                             .filter(models.Metric.block_interval_id >= block_interval_first)
+                             .scalar())
 
-    if metric_latest is None:
+    if latest_block_interval is None:
         print('Latest metrics does not exist.')
         return {'status': 'FAILURE'}
 
-    mat = array([[x.get('rating'), x.get('rating_count') if x.get('rating_count') <= config.MAX_REVIEW_COUNT else config.MAX_REVIEW_COUNT,
-                  log(x.get('metrics').get('users') + 1),
-                  float(Decimal(Web3.fromWei(x.get('metrics').get('volume'), 'ether') + 1).ln()),
-                  log(x.get('metrics').get('transactions') + 1)] for x in dapps])
-
-    max_users = max(mat[:, 2])
-    max_users = max_users if max_users > 0 else 1
-    max_volume = max(mat[:, 3])
-    max_volume = max_volume if max_volume > 0 else 1
-    max_transactions = max(mat[:, 4])
-    max_transactions = max_transactions if max_transactions > 0 else 1
-
-    weights = [((x[0] / 5) * (x[1] / config.MAX_REVIEW_COUNT) * config.RATING_WEIGHT) +
-               ((x[2] / max_users) * config.USER_WEIGHT +
-                (x[3] / max_volume) * config.VOLUME_WEIGHT +
-                (x[4] / max_transactions) * config.TRANSACTION_WEIGHT) for x in mat]
-
-    ranking_idx = list(reversed(argsort(weights)))
-    rankings = {x: [] for x in [c.name for c in DappCategory]}
-    ranking_count = {x: 1 for x in [c.name for c in DappCategory]}
-
-    for i, idx in enumerate(ranking_idx):
-        current_dapp = dapps[idx]
-        dapp_id = current_dapp.get('id')
-        category = current_dapp.get('category').replace(' ', '_').upper()
-
-        if i < config.MAX_RANKING:
-            all_ranking = models.Ranking(dapp_id=dapp_id, block_interval_id=metric_latest.latest_block_interval,
-                                         ranking_name_id=DappCategory.ALL.value,
-                                         rank=ranking_count[DappCategory.ALL.name])
-            db.session.add(all_ranking)
-            ranking_count[DappCategory.ALL.name] += 1
-
-        if len(rankings[category]) < config.MAX_RANKING:
-            # TODO: get ranking_name id from database instead of enum
-            category_ranking = models.Ranking(dapp_id=dapp_id, block_interval_id=metric_latest.latest_block_interval,
-                                              ranking_name_id=DappCategory[category].value,
-                                              rank=ranking_count[category])
-            db.session.add(category_ranking)
-            ranking_count[category] += 1
+    block_interval = models.BlockInterval.query.get(latest_block_interval)
+    activity = dapp_activity(block_interval.time_start, block_interval.time_stop - block_interval.time_start)
+
+    ids, categories, matrix = ranking.feature_matrix(query_dapp_list(DappCategory.ALL.name), activity)
 
+    scores = ranking.score(matrix, ranking.ranking_weights(config), config.RANKING_STRATEGY)
+    rankings = ranking.rank_dapps(ids, categories, scores, config.MAX_RANKING)
+
+    rows = ranking.ranking_rows(ids, rankings, latest_block_interval)
+    if rows:
+        db.session.execute(models.Ranking.__table__.insert(), rows)
     db.session.commit()
 
+    # Publish the new rankings and metrics to the dapp list
+    refresh_dapp_listing()
+    invalidate(DAPPS)
+
     return {'status': 'SUCCESS'}
 
 
@@ -431,19 +661,29 @@ def calculate_dapp_ranking():
 def add_dapp_metrics(dapp_metrics_dict):
     """
     Insert dapp metrics into db.
+    Metrics already stored for a (dapp, block interval) are skipped, so a batch can be re-run.
     """
     metrics = dapp_metrics_dict.get('metrics')
 
     if metrics:
-        for dapp_metrics in metrics:
-            metric = models.Metric(dapp_id=dapp_metrics.get('dapp_id'),
-                                   block_interval_id=dapp_metrics.get('block_interval_id'),
-                                   data=dapp_metrics.get('metrics'))
+        block_interval_ids = {x.get('block_interval_id') for x in metrics}
+        existing = set(db.session.query(models.Metric.dapp_id, models.Metric.block_interval_id)
+                       .filter(models.Metric.block_interval_id.in_(block_interval_ids)).all())
 
-            db.session.add(metric)
+        rows = [{'dapp_id': x.get('dapp_id'),
+                 'block_interval_id': x.get('block_interval_id'),
+                 'data': x.get('metrics'),
+                 'users_sketch': x.get('users_sketch')}
+                for x in metrics if (x.get('dapp_id'), x.get('block_interval_id')) not in existing]
+
+        if not rows:
+            return {'status': 'SUCCESS'}
 
         try:
+            db.session.execute(models.Metric.__table__.insert(), rows)
+            update_dapp_activity(rows)
             db.session.commit()
+            invalidate(DAPPS)
         except IntegrityError as e:
             db.session().rollback()
             print(
@@ -462,6 +702,9 @@ def add_review(metrics_result, user_id, request_json):
     :param request_json:
     :return:
     """
+    if not valid_rating(request_json.get('rating')):
+        return {'status': 'FAILED', 'message': 'Invalid rating.'}
+
     verified = False
     metrics = metrics_result.get('result')
 
@@ -485,7 +728,11 @@ def add_review(metrics_result, user_id, request_json):
                                     feature=request_json.get('feature'),
                                     data=metrics,
                                     verified=verified)
-    subitted_review.save()
+    subitted_review.save(commit=False)
+    update_rating_aggregate(subitted_review.dapp_id, added=[(subitted_review.rating, subitted_review.feature)])
+    db.session.commit()
+    refresh_dapp_listing([subitted_review.dapp_id])
+    invalidate_dapp(subitted_review.dapp_id)
 
     review_schema = ReviewSchema()
     serialized = review_schema.dump(subitted_review).data
@@ -515,6 +762,7 @@ def set_dapp_of_the_day():
         dapp_of_the_day = models.DailyItem.get_by_id(2)
         dapp_of_the_day.item_id = dapp.id
         db.session.commit()
+        invalidate(DAPP_OF_THE_DAY)
 
         return {'status': 'SUCCESS'}
 
@@ -536,16 +784,16 @@ def set_review_of_the_day():
         if not latest_time:
             return {'status': 'Could not set review of the day. Latest time is empty.'}
 
-        review = (db.session.query(models.Review.id, func.count(models.ReviewLike.id).label('total_likes'))
-                  .outerjoin(models.Review.helpful_votes)
+        review = (db.session.query(models.Review.id)
                   .filter((models.Review.uploaded_at <= latest_time.max_datetime) &
                           (models.Review.uploaded_at >= latest_time.max_datetime - timedelta(days=1)))
-                  .group_by(models.Review.id).order_by(desc('total_likes'))
+                  .order_by(models.Review.helpful_count.desc(), models.Review.id)
                   .first())
 
         review_of_the_day = models.DailyItem.get_by_id(1)
         review_of_the_day.item_id = review.id
         db.session.commit()
+        invalidate(REVIEW_OF_THE_DAY)
 
         return {'status': 'SUCCESS'}
 
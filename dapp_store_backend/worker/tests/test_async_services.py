@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Worker async service unit tests."""
+import asyncio
+import json
+import threading
+
+from dapp_store_backend.worker.services.async_services import AsyncEtherscan, AsyncInfura, run
+
+
+class FakeAsyncInfura(AsyncInfura):
+    """
+    AsyncInfura answering batches in reverse order, after a delay.
+    """
+
+    def __init__(self, **kwargs):
+        super(FakeAsyncInfura, self).__init__('', **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _post(self, payload):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        return [{'jsonrpc': '2.0', 'id': x['id'], 'result': {'number': x['params'][0]}}
+                for x in reversed(payload)]
+
+
+def test_get_blocks_by_number_concurrent_batches():
+    infura = FakeAsyncInfura(batch_size=10)
+    blocks = run(infura.get_blocks_by_number(list(range(50))))
+
+    assert [int(x['number'], 16) for x in blocks] == list(range(50))
+    assert infura.max_in_flight == 5
+
+
+class FakeRateLimiter(object):
+    """
+    Rate limiter asking to wait once, recording the threads taking tokens.
+    """
+
+    def __init__(self):
+        self.waits = [0.01]
+        self.threads = []
+
+    def try_acquire(self):
+        self.threads.append(threading.get_ident())
+        return self.waits.pop() if self.waits else 0
+
+
+def test_throttle_takes_tokens_off_the_event_loop():
+    rate_limiter = FakeRateLimiter()
+    run(FakeAsyncInfura(rate_limiter=rate_limiter)._throttle())
+
+    assert len(rate_limiter.threads) == 2
+    assert threading.get_ident() not in rate_limiter.threads
+
+
+class FakeContent(object):
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self, size):
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+class FakeResponse(object):
+    status = 200
+
+    def __init__(self, body):
+        self.content = FakeContent(json.dumps(body).encode('utf-8'))
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+
+    def __init__(self, body):
+        self.body = body
+
+    async def get(self, url):
+        return FakeResponse(self.body)
+
+
+def test_etherscan_stream_transactions():
+    transactions = [{'blockNumber': str(i), 'hash': '0x{:x}'.format(i)} for i in range(100)]
+    etherscan = AsyncEtherscan('')
+    etherscan.session = FakeSession({'status': '1', 'message': 'OK', 'result': transactions})
+
+    assert run(etherscan.get_transactions('0x0', 0, 1000)) == transactions
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Worker block time resolver unit tests."""
+import random
+from math import log2
+
+import pytest
+
+from dapp_store_backend.worker.services.block_resolver import BlockTimeResolver
+
+NUM_BLOCKS = 200000
+GENESIS_TIME = 1438269988
+
+
+class FakeChain(object):
+    """
+    Chain client with irregular block times, mimicking Infura.get_block_by_number.
+    """
+
+    def __init__(self, num_blocks):
+        rng = random.Random(1)
+        self.times = [GENESIS_TIME]
+        for _ in range(num_blocks - 1):
+            self.times.append(self.times[-1] + rng.choice([1, 5, 13, 14, 15, 30, 60]))
+
+    def get_block_by_number(self, value):
+        number = len(self.times) - 1 if value == 'latest' else value
+        if number >= len(self.times):
+            return None
+        return {'number': hex(number), 'timestamp': hex(self.times[number])}
+
+    def first_block_at_or_after(self, epoch_time):
+        return next(i for i, t in enumerate(self.times) if t >= epoch_time)
+
+
+@pytest.fixture(scope='module')
+def chain():
+    return FakeChain(NUM_BLOCKS)
+
+
+def test_resolve_historical_timestamps(chain):
+    rng = random.Random(2)
+
+    for _ in range(20):
+        epoch_time = rng.randint(chain.times[0] + 1, chain.times[-1])
+        resolver = BlockTimeResolver(chain)
+
+        assert resolver.resolve(epoch_time) == chain.first_block_at_or_after(epoch_time)
+        assert resolver.calls <= 2 * log2(NUM_BLOCKS) + 3
+
+
+def test_resolve_exact_block_time(chain):
+    resolver = BlockTimeResolver(chain)
+    assert resolver.resolve(chain.times[12345]) == 12345
+
+
+def test_resolve_with_anchors(chain):
+    epoch_time = chain.times[150000] - 7
+    expected = chain.first_block_at_or_after(epoch_time)
+
+    # block intervals starting shortly before and after the target
+    anchors = [(chain.first_block_at_or_after(t), t) for t in (chain.times[149900] - 3, chain.times[150100] + 2)]
+    resolver = BlockTimeResolver(chain, anchors=anchors)
+
+    assert resolver.resolve(epoch_time) == expected
+    # one call for the latest block, then a search within the anchors only
+    assert resolver.calls <= 2 * log2(anchors[1][0] - anchors[0][0]) + 2
+
+
+def test_resolve_future_and_genesis(chain):
+    resolver = BlockTimeResolver(chain)
+
+    assert resolver.resolve(chain.times[-1] + 60) == NUM_BLOCKS
+    assert resolver.resolve(chain.times[0]) == 0
+
+
+def test_missing_block_raises():
+    class EmptyChain(object):
+        def get_block_by_number(self, value):
+            return None
+
+    resolver = BlockTimeResolver(EmptyChain(), max_retries=1, retry_delay=0)
+
+    with pytest.raises(ValueError):
+        resolver.resolve(GENESIS_TIME)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Worker block scanner unit tests."""
+import pytest
+
+from dapp_store_backend.worker.services.block_scanner import BlockScanError, BlockScanner
+from dapp_store_backend.worker.services.infura import Infura
+
+CONTRACT = '0xb1690c08e213a35ed9bab7b318de14420fb57d8c'
+OTHER_CONTRACT = '0x06012c8cf97bead5deae237070f9587f8e7a266d'
+USER = '0xa7a7899d944fe658c4b0a1803bab2f490bd3849e'
+
+
+def make_transaction(from_address, to_address, value):
+    return {'hash': '0x0', 'transactionIndex': '0x0', 'from': from_address, 'to': to_address,
+            'value': hex(value), 'gas': '0x5208', 'gasPrice': '0x1'}
+
+
+class FakeInfura(Infura):
+    """
+    Infura returning full blocks of generated transactions, None for missing blocks.
+    """
+
+    def __init__(self, blocks):
+        super(FakeInfura, self).__init__('')
+        self.blocks = blocks
+        self.calls = []
+
+    def get_blocks_by_number(self, values, full=False):
+        self.calls.append(list(values))
+        return [{'number': hex(x), 'timestamp': hex(1000 + x), 'transactions': self.blocks[x]}
+                if x in self.blocks else None for x in values]
+
+
+def test_scan():
+    blocks = {10: [make_transaction(USER, CONTRACT, 5), make_transaction(USER, '0x0', 100)],
+              11: [make_transaction(CONTRACT, USER, 2), make_transaction(USER, OTHER_CONTRACT, 7)],
+              12: [make_transaction(CONTRACT, CONTRACT, 1), make_transaction(USER, None, 3)]}
+    infura = FakeInfura(blocks)
+
+    # Addresses are matched whatever their case
+    dapps = [{'id': 1, 'address': ['0xB1690C08E213a35Ed9bAb7B318DE14420FB57d8C']},
+             {'id': 2, 'address': [OTHER_CONTRACT, CONTRACT]},
+             {'id': 3, 'address': []}]
+
+    scanner = BlockScanner(infura, dapps, window=2).scan(10, 12)
+    results = {k: v.result() for k, v in scanner.dapp_reducers().items()}
+    counts = {k: {x: v[x] for x in ('users', 'volume', 'transactions')} for k, v in results.items()}
+
+    assert infura.calls == [[10, 11], [12]]
+    assert scanner.blocks == 3
+    assert scanner.transactions == 6
+    assert counts[1] == {'users': 2, 'volume': 8, 'transactions': 3}
+    assert counts[2] == {'users': 2, 'volume': 15, 'transactions': 4}
+    assert 3 not in results
+
+    # Blocks have timestamps but no receipts
+    assert sum(results[2]['hourly_transactions']) == 4
+    assert 'failed_ratio' not in results[2]
+    assert 'gas_used' not in results[2]
+
+
+def test_scan_missing_block():
+    infura = FakeInfura({10: []})
+
+    with pytest.raises(BlockScanError):
+        BlockScanner(infura, [{'id': 1, 'address': [CONTRACT]}]).scan(10, 11)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Worker columnar transaction page unit tests."""
+import numpy as np
+
+from dapp_store_backend.worker.services.columnar import (TransactionPage, limb_sum, pages, product_sum,
+                                                         split_limbs)
+from dapp_store_backend.worker.services.reducers import MetricsReducer, is_successful
+
+CONTRACT = '0xb1690c08e213a35ed9bab7b318de14420fb57d8c'
+
+
+def make_transactions(count):
+    return [{'from': '0x{:040X}'.format(i % 7), 'to': CONTRACT, 'value': str(i * 10 ** 18 + i),
+             'timeStamp': str(1530000000 + i * 1000), 'gasUsed': str(21000 + i), 'gasPrice': str(2 ** 33 + i),
+             'txreceipt_status': '1' if i % 5 else '0', 'isError': '0' if i % 5 else '1'}
+            for i in range(count)]
+
+
+def test_limbs():
+    values = [0, 1, 2 ** 64 - 1, 2 ** 255 + 3, 12345 * 10 ** 30]
+    limbs = split_limbs(values)
+    mask = np.array([True, True, True, False, True])
+
+    assert limbs.shape == (5, 8)
+    assert limb_sum(limbs, mask) == 1 + 2 ** 64 - 1 + 12345 * 10 ** 30
+    assert limb_sum(limbs, np.ones(5, dtype=bool)) == sum(values)
+
+    factors = np.array([3, 2 ** 40, 2 ** 64 - 1, 5, 7], dtype=np.uint64)
+    assert product_sum(factors, limbs, mask) == 2 ** 40 + (2 ** 64 - 1) ** 2 + 7 * 12345 * 10 ** 30
+
+
+def test_transaction_page():
+    transactions = [{'from': '0xAB', 'to': CONTRACT, 'value': '5', 'txreceipt_status': '0', 'isError': '1',
+                     'gasUsed': '10', 'gasPrice': '3', 'timeStamp': '7200'},
+                    {'from': '0xab', 'to': CONTRACT, 'value': '1'}]
+    page = TransactionPage.from_transactions(transactions)
+
+    # Addresses differing by case are interned once
+    assert page.addresses.tolist() == ['0xab', CONTRACT]
+    assert page.from_codes.tolist() == [0, 0]
+    assert page.successful.tolist() == [False, True]
+    assert page.has_receipt.tolist() == [True, False]
+    assert page.has_gas.tolist() == [True, False]
+
+    users = page.from_codes
+    rows = list(page.rows(users, page.successful))
+    assert [(x[0]['value'], x[1], x[2]) for x in rows] == [('5', '0xab', False), ('1', '0xab', True)]
+    assert [is_successful(x[0]) for x in rows] == [False, True]
+    assert 'gasUsed' not in rows[1][0]
+
+    assert len(TransactionPage.from_transactions([])) == 0
+    assert [len(x) for x in pages(make_transactions(25), size=10)] == [10, 10, 5]
+
+
+def test_page_metrics_match_rows():
+    transactions = make_transactions(1000)
+    reducer = MetricsReducer([CONTRACT])
+    for page in pages(transactions, size=300):
+        reducer.update(page)
+
+    # Each accumulator with its per transaction update
+    expected = MetricsReducer([CONTRACT])
+    for tx in transactions:
+        user = tx['from'].lower()
+        for accumulator in expected.accumulators:
+            accumulator.update(tx, user, is_successful(tx))
+
+    result = reducer.result()
+    assert result == expected.result()
+    assert result['users'] == 7
+    assert result['gas_fees'] == sum(int(x['gasUsed']) * int(x['gasPrice']) for x in transactions)
@@ -33,3 +33,51 @@ def test_get_block_by_number():
     with pytest.raises(ValueError) as excinfo:
         infura.get_block_by_number('failing_value')
 
+
+class FakeInfura(Infura):
+    """
+    Infura answering batches in reverse order and failing the calls in fail_once once.
+    """
+
+    def __init__(self, fail_once=(), **kwargs):
+        super(FakeInfura, self).__init__('', **kwargs)
+        self.fail_once = set(fail_once)
+        self.batches = []
+
+    def _post(self, payload):
+        self.batches.append(len(payload))
+        responses = []
+
+        for call in reversed(payload):
+            number = int(call['params'][0], 16)
+
+            if number in self.fail_once:
+                self.fail_once.discard(number)
+                responses.append({'jsonrpc': '2.0', 'id': call['id'], 'error': {'code': -32000}})
+            else:
+                responses.append({'jsonrpc': '2.0', 'id': call['id'],
+                                  'result': {'number': hex(number), 'transactions': []}})
+
+        return responses
+
+
+def test_get_blocks_by_number_batches():
+    infura = FakeInfura(batch_size=4)
+    blocks = infura.get_blocks_by_number(list(range(10)))
+
+    assert infura.batches == [4, 4, 2]
+    assert [int(x['number'], 16) for x in blocks] == list(range(10))
+
+
+def test_get_blocks_by_number_retries_failed_calls():
+    infura = FakeInfura(fail_once=[3, 7], batch_size=4)
+    blocks = infura.get_blocks_by_number(list(range(10)))
+
+    # only the failed calls are sent again
+    assert infura.batches == [4, 4, 2, 2]
+    assert [int(x['number'], 16) for x in blocks] == list(range(10))
+
+    # calls failing on every attempt are returned as None
+    infura = FakeInfura(fail_once=[5], batch_size=4, max_retries=0)
+    blocks = infura.get_blocks_by_number(list(range(10)))
+    assert blocks[5] is None
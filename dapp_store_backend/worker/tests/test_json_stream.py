@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Worker incremental JSON decoding unit tests."""
+import json
+
+import pytest
+
+from dapp_store_backend.worker.services.json_stream import NEED_DATA, JSONArrayStream
+
+
+def chunked(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_array_stream():
+    result = [{'blockNumber': str(i), 'value': str(10 ** 20 + i), 'input': '0xé中'} for i in range(50)]
+    text = json.dumps({'status': '1', 'message': 'OK', 'result': result, 'count': 12345}, indent=1)
+
+    # Chunks split values, numbers and multi-byte characters anywhere
+    for size in (1, 3, 7, 64, len(text) * 4):
+        stream = JSONArrayStream(chunked(text, size), 'result')
+        assert list(stream) == result
+        assert stream.fields == {'status': '1', 'message': 'OK', 'result': [], 'count': 12345}
+
+
+def test_array_stream_fed():
+    result = [{'blockNumber': str(i)} for i in range(10)]
+    chunks = chunked(json.dumps({'status': '1', 'result': result}), 5)
+    stream = JSONArrayStream(None, 'result')
+    items = []
+
+    for item in stream.parse():
+        if item is NEED_DATA:
+            stream.feed(chunks.pop(0) if chunks else None)
+        else:
+            items.append(item)
+
+    assert items == result
+    assert stream.fields == {'status': '1', 'result': []}
+
+
+def test_array_stream_not_array():
+    stream = JSONArrayStream(chunked('{"status":"0","message":"NOTOK","result":"Max rate limit reached"}', 5),
+                             'result')
+    assert list(stream) == []
+    assert stream.fields['result'] == 'Max rate limit reached'
+
+    stream = JSONArrayStream([b' { "result" : [ ] } '], 'result')
+    assert list(stream) == []
+    assert stream.fields == {'result': []}
+
+
+def test_array_stream_invalid():
+    with pytest.raises(ValueError):
+        list(JSONArrayStream([b''], 'result'))
+
+    with pytest.raises(ValueError):
+        list(JSONArrayStream(chunked('{"result": [{"a": 1}, {"a": ', 4), 'result'))
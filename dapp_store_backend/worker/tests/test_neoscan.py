@@ -26,7 +26,7 @@ def test_get_balance():
 
     :return:
     """
-    neoscanner = Neoscan(TEST_NEO_API_KEY)
+    neoscanner = Neoscan(TEST_NEO_API_KEY, network='test_net')
 
     # test a valid address
     balance = neoscanner.get_balance(TEST_NEO_ADDRESS)
@@ -55,7 +55,7 @@ def test_get_transactions():
 
     :return:
     """
-    neoscanner = Neoscan(TEST_NEO_API_KEY)
+    neoscanner = Neoscan(TEST_NEO_API_KEY, network='test_net')
 
     # test a valid address
     transactions = neoscanner.get_balance(TEST_NEO_ADDRESS)
@@ -90,7 +90,7 @@ def test_get_all_nodes():
     :return:
     """
     # TODO: place neoscan initialization in a pytest.fixture with session scope so you only have to instantiate once
-    neoscanner = Neoscan(TEST_NEO_API_KEY)
+    neoscanner = Neoscan(TEST_NEO_API_KEY, network='test_net')
 
     nodes = neoscanner.get_all_nodes()
 
@@ -105,3 +105,61 @@ def test_get_all_nodes():
     with pytest.raises(BadRequest) as excinfo:
         neoscanner.get_balance('failing_address')
     assert str(HTTPCodes.Bad_Request.value) in str(excinfo.value)
+
+
+class FakeResponse(object):
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeNeoscan(Neoscan):
+    """
+    Neoscan with pages of one abstract each, newest first.
+    """
+
+    def __init__(self, total_pages):
+        super(FakeNeoscan, self).__init__(TEST_NEO_API_KEY)
+        self.total_pages = total_pages
+        self.pages = []
+
+    def get_transaction_summary(self, address, page):
+        self.pages.append(page)
+        return FakeResponse({'total_pages': self.total_pages,
+                             'entries': [{'block_height': 1000 - page, 'address_to': address}]})
+
+
+def test_get_transaction_pages():
+    """
+    Test the first page is downloaded once and pages are returned in order.
+    """
+    neoscanner = FakeNeoscan(total_pages=10)
+    pages = list(neoscanner.get_transaction_pages(TEST_NEO_ADDRESS))
+
+    assert [x[0]['block_height'] for x in pages] == [1000 - x for x in range(1, 11)]
+    assert sorted(neoscanner.pages) == list(range(1, 11))
+
+
+def test_get_transactions_stops_at_block_start():
+    neoscanner = FakeNeoscan(total_pages=100)
+    transactions = list(neoscanner.get_transactions(TEST_NEO_ADDRESS, block_start=990, block_stop=995))
+
+    assert [x['block_height'] for x in transactions] == [995, 994, 993, 992, 991, 990]
+    # pages after the first older than block_start are at most max_workers pages ahead
+    assert len(neoscanner.pages) <= 11 + neoscanner.max_workers
+
+
+def test_network():
+    """
+    Test the mainnet API is used by default.
+    """
+    assert Neoscan(TEST_NEO_API_KEY)._balance_url(TEST_NEO_ADDRESS) == \
+        'https://api.neoscan.io/api/main_net/v1/get_balance/{}/'.format(TEST_NEO_ADDRESS)
+    assert Neoscan(TEST_NEO_API_KEY, network='test_net')._height_url() == \
+        'https://neoscan-testnet.io/api/test_net/v1/get_height'
+
+    with pytest.raises(ValueError):
+        Neoscan(TEST_NEO_API_KEY, network='mainnet')
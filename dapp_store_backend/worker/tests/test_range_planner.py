@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Worker range planner unit tests."""
+import asyncio
+
+import pytest
+
+from dapp_store_backend.worker.services.async_services import AsyncEtherscan, run
+from dapp_store_backend.worker.services.range_planner import RangeTooLargeError
+
+
+def make_transactions(blocks):
+    return [{'blockNumber': str(x), 'hash': '0x{:x}'.format(i)} for i, x in enumerate(blocks)]
+
+
+class FakeAsyncEtherscan(AsyncEtherscan):
+    """
+    AsyncEtherscan of an address with the transactions of blocks, returning at most offset
+    transactions per query after a delay.
+    """
+
+    def __init__(self, blocks):
+        super(FakeAsyncEtherscan, self).__init__('')
+        self.transactions = make_transactions(blocks)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _open_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        return [x for x in self.transactions if block_start <= int(x['blockNumber']) <= block_stop][:offset]
+
+    async def _read_transactions(self, response):
+        for tx in response:
+            yield tx
+
+
+def test_iter_transactions_block_order():
+    etherscan = FakeAsyncEtherscan([x // 3 for x in range(300)])
+
+    async def transactions(prefetch):
+        return [x async for x in etherscan.iter_transactions('0x0', 0, 1000, max_results=25, prefetch=prefetch)]
+
+    assert run(transactions(0)) == etherscan.transactions
+    assert etherscan.max_in_flight == 1
+
+    # The next planned ranges are requested while a response is read
+    assert run(transactions(3)) == etherscan.transactions
+    assert etherscan.max_in_flight > 1
+
+
+def test_iter_transactions_too_large():
+    etherscan = FakeAsyncEtherscan([7] * 30)
+
+    async def transactions():
+        return [x async for x in etherscan.iter_transactions('0x0', 0, 1000, max_results=25)]
+
+    with pytest.raises(RangeTooLargeError):
+        run(transactions())
+
+
+def test_get_transaction_batches_block_order():
+    etherscan = FakeAsyncEtherscan([x // 3 for x in range(300)])
+
+    async def batches():
+        return [x async for x in etherscan.get_transaction_batches('0x0', 0, 1000, max_results=25, batch_size=40)]
+
+    result = run(batches())
+
+    assert [x for batch in result for x in batch] == etherscan.transactions
+    assert [len(x) for x in result] == [40] * 7 + [20]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Worker rate limiter unit tests."""
+import pytest
+
+from dapp_store_backend.worker.services.rate_limiter import RateLimiter, SQLiteBucketStore
+
+
+class FakeClock(object):
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def store(tmpdir):
+    return SQLiteBucketStore(str(tmpdir.join('rate_limit.sqlite')))
+
+
+def test_burst_then_wait(store):
+    clock = FakeClock()
+    limiter = RateLimiter('etherscan', 5, store, clock=clock)
+
+    # full bucket allows a burst of `rate` calls
+    for _ in range(5):
+        assert limiter.try_acquire() == 0
+
+    assert limiter.try_acquire() == pytest.approx(0.2)
+
+    # tokens refill at `rate` per second
+    clock.now += 0.2
+    assert limiter.try_acquire() == 0
+
+
+def test_budget_shared_between_limiters(store):
+    """
+    Two limiters on the same store behave like two worker processes sharing one budget.
+    """
+    clock = FakeClock()
+    first = RateLimiter('etherscan', 2, store, clock=clock)
+    second = RateLimiter('etherscan', 2, store, clock=clock)
+    other = RateLimiter('infura', 2, store, clock=clock)
+
+    assert first.try_acquire() == 0
+    assert second.try_acquire() == 0
+    assert first.try_acquire() > 0
+    assert second.try_acquire() > 0
+
+    # buckets are separate per name
+    assert other.try_acquire() == 0
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Worker transaction reducer unit tests."""
+from dapp_store_backend.worker.services.etherscan import Etherscan
+from dapp_store_backend.worker.services.reducers import (METRICS, NEO_ASSET, MetricAccumulator, MetricsReducer,
+                                                         NeoMetricsReducer, VolumeTransactionsReducer, metric)
+
+TEST_CONTRACT_ADDRESS = '0xb1690c08e213a35ed9bab7b318de14420fb57d8c'
+TEST_USER_ADDRESS = '0xa7a7899d944fe658c4b0a1803bab2f490bd3849e'
+
+
+def make_transaction(from_address, to_address, value, status='1', block=0, timestamp=0, gas_used=0):
+    return {'from': from_address, 'to': to_address, 'value': str(value), 'blockNumber': str(block),
+            'timeStamp': str(timestamp), 'gasUsed': str(gas_used), 'gasPrice': '2',
+            'txreceipt_status': status, 'isError': '0' if status == '1' else '1'}
+
+
+class FakeEtherscan(Etherscan):
+    """
+    Etherscan returning generated transactions, 10 per block, at most offset per query like the
+    result window of Etherscan.
+    """
+
+    def __init__(self, num_transactions):
+        super(FakeEtherscan, self).__init__('')
+        self.num_transactions = num_transactions
+        self.ranges = []
+
+    def _open_transactions(self, address, block_start, block_stop, paginate=False, page=1, offset=10):
+        self.ranges.append((block_start, block_stop))
+        first = min(block_start * 10, self.num_transactions)
+        last = min((block_stop + 1) * 10, self.num_transactions, first + offset)
+        return (make_transaction('0x{:040x}'.format(i % 50), address, i, block=i // 10) for i in range(first, last))
+
+    def _read_transactions(self, response):
+        return response
+
+
+def test_metrics_reducer():
+    transactions = [make_transaction(TEST_USER_ADDRESS, TEST_CONTRACT_ADDRESS, 10, timestamp=3600, gas_used=5),
+                    make_transaction(TEST_CONTRACT_ADDRESS, TEST_USER_ADDRESS, 5, timestamp=7200),
+                    make_transaction(TEST_USER_ADDRESS, TEST_CONTRACT_ADDRESS, 7, status='0', gas_used=1)]
+
+    reducer = MetricsReducer([TEST_CONTRACT_ADDRESS]).update(transactions[:1])
+    reducer.update(transactions[1:])
+
+    result = reducer.result()
+    assert {k: result[k] for k in ('users', 'volume', 'transactions')} == {'users': 1, 'volume': 15, 'transactions': 2}
+    assert result['failed_transactions'] == 1
+    assert result['failed_ratio'] == 1 / 3
+    assert result['gas_used'] == 6
+    assert result['gas_fees'] == 12
+    assert result['hourly_transactions'][1:3] == [1, 1]
+    assert sum(result['hourly_transactions']) == 2
+    assert 'new_users' not in result
+
+    # users are unique across merged addresses
+    other = MetricsReducer([TEST_USER_ADDRESS]).update(transactions)
+    result = reducer.merge(other).result()
+    assert {k: result[k] for k in ('users', 'volume', 'transactions')} == {'users': 2, 'volume': 30,
+                                                                           'transactions': 4}
+    assert result['failed_ratio'] == 2 / 6
+    assert reducer.sketch().count() == 2
+
+
+def test_metrics_reducer_addresses_case():
+    # Checksummed dapp addresses match the lowercase addresses of transactions
+    reducer = MetricsReducer(['0xB1690C08E213a35Ed9bAb7B318DE14420FB57d8C'], names=['users'])
+    reducer.update([make_transaction(TEST_CONTRACT_ADDRESS, TEST_USER_ADDRESS.upper(), 1),
+                    make_transaction(TEST_USER_ADDRESS, TEST_CONTRACT_ADDRESS, 1)])
+
+    assert reducer.result() == {'users': 1}
+
+
+def test_register_metric():
+    @metric
+    class MaxValueMetric(MetricAccumulator):
+        name = 'max_value'
+
+        def __init__(self, reducer):
+            super(MaxValueMetric, self).__init__(reducer)
+            self.value = 0
+
+        def update(self, tx, user, successful):
+            self.value = max(self.value, int(tx.get('value')))
+
+        def merge(self, other):
+            self.value = max(self.value, other.value)
+
+        def finalize(self):
+            return {self.name: self.value}
+
+    try:
+        reducer = MetricsReducer([TEST_CONTRACT_ADDRESS])
+        reducer.update([make_transaction(TEST_USER_ADDRESS, TEST_CONTRACT_ADDRESS, 3)])
+        assert reducer.result()['max_value'] == 3
+        assert MetricsReducer([TEST_CONTRACT_ADDRESS], names=['volume']).result() == {'volume': 0}
+    finally:
+        del METRICS['max_value']
+
+
+def test_volume_transactions_reducer():
+    # Checksummed addresses match the lowercase addresses of cached transactions
+    reducer = VolumeTransactionsReducer('0xA7a7899d944fE658c4B0a1803BAB2F490bd3849e', [TEST_CONTRACT_ADDRESS.upper()])
+    reducer.update([make_transaction(TEST_USER_ADDRESS, TEST_CONTRACT_ADDRESS, 10),
+                    make_transaction(TEST_CONTRACT_ADDRESS, TEST_USER_ADDRESS, 3),
+                    make_transaction(TEST_USER_ADDRESS, '0x0', 100)])
+
+    assert reducer.result() == {'in_volume': 3, 'out_volume': 10, 'transactions': 2}
+
+
+def test_neo_metrics_reducer():
+    contract = 'AKDVzYGLczmykdtRaejgvWeZrvdkVEvQ1X'
+    entries = [{'address_from': 'AUser', 'address_to': contract, 'asset': NEO_ASSET, 'amount': '10'},
+               {'address_from': contract, 'address_to': 'AUser', 'asset': 'gas', 'amount': '0.5'},
+               {'address_from': 'AOther', 'address_to': contract, 'asset': NEO_ASSET, 'amount': '2'},
+               {'address_from': 'auser', 'address_to': contract, 'asset': NEO_ASSET, 'amount': '1'}]
+
+    result = NeoMetricsReducer([contract]).update(entries).result()
+
+    # NEO addresses are case sensitive
+    assert {k: result[k] for k in ('users', 'volume', 'transactions')} == {'users': 3, 'volume': 13,
+                                                                           'transactions': 4}
+    assert result['failed_transactions'] == 0
+
+
+def test_process_transactions_splits_ranges():
+    etherscan = FakeEtherscan(25000)
+    reducer = MetricsReducer([TEST_CONTRACT_ADDRESS], names=['users', 'volume', 'transactions'])
+    result = etherscan.process_transactions(reducer, TEST_CONTRACT_ADDRESS, 0, 99999999)
+
+    # The first queries return the 10000 transactions of blocks 0-999 and 999-1998
+    assert sorted(etherscan.ranges) == [(0, 99999999), (999, 50000499), (1998, 25001248), (25001249, 50000499),
+                                        (50000500, 99999999)]
+    assert result == {'users': 50, 'volume': sum(range(25000)), 'transactions': 25000}
+
+    # Without prefetching the same ranges are requested in block order
+    etherscan.ranges = []
+    batches = list(etherscan.get_transaction_batches(TEST_CONTRACT_ADDRESS, 0, 99999999, prefetch=0))
+    assert sum(len(x) for x in batches) == 25000
+    assert etherscan.ranges == [(0, 99999999), (999, 50000499), (1998, 25001248), (25001249, 50000499),
+                                (50000500, 99999999)]
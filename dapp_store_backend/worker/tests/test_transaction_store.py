@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Worker transaction store unit tests."""
+from collections import namedtuple
+
+from dapp_store_backend.worker.services.reducers import MetricsReducer
+from dapp_store_backend.worker.services.transaction_store import (TransactionStore, row_to_transaction,
+                                                                  transaction_to_row)
+
+TEST_CONTRACT_ADDRESS = '0xb1690c08e213a35ed9bab7b318de14420fb57d8c'
+TEST_TRANSACTION = {
+    'blockNumber': '6400000',
+    'timeStamp': '1537940000',
+    'hash': '0x8c1e0c3ee5bb2e1e2a3c3c41d5b6b1d2a1c5e8f2b6e3d4c5b6a7f8e9d0c1b2a3',
+    'transactionIndex': '12',
+    'from': '0xA7a7899d944fE658c4B0a1803BAB2F490bd3849e',
+    'to': TEST_CONTRACT_ADDRESS,
+    'value': '120000000000000000000000000',
+    'gasUsed': '21000',
+    'gasPrice': '4000000000',
+    'isError': '0',
+    'txreceipt_status': '1',
+}
+
+
+def test_transaction_row_roundtrip():
+    """
+    Cached transactions are returned in the Etherscan format used by the reducers.
+    """
+    row = transaction_to_row(TEST_CONTRACT_ADDRESS, TEST_TRANSACTION)
+    assert row['value'] == 120000000000000000000000000
+    assert row['from_address'] == TEST_TRANSACTION['from'].lower()
+
+    transaction = row_to_transaction(namedtuple('Row', row.keys())(**row))
+    assert transaction['value'] == TEST_TRANSACTION['value']
+    assert transaction['blockNumber'] == TEST_TRANSACTION['blockNumber']
+
+    metrics = MetricsReducer([TEST_CONTRACT_ADDRESS]).update([transaction]).result()
+    assert metrics['users'] == 1
+    assert metrics['volume'] == 120000000000000000000000000
+    assert metrics['transactions'] == 1
+    assert metrics['gas_fees'] == 21000 * 4000000000
+
+
+class FakeAddressSync(object):
+
+    def __init__(self, block_start, block_stop):
+        self.block_start = block_start
+        self.block_stop = block_stop
+
+
+def test_extend_to_last_block_returned():
+    """
+    The cached range ends at the last block with transactions, the blocks Etherscan may not have
+    indexed yet are downloaded again.
+    """
+    address_sync = FakeAddressSync(100, 99)
+    TransactionStore._extend(address_sync, 100, 200, [150])
+    assert (address_sync.block_start, address_sync.block_stop) == (100, 150)
+
+    TransactionStore._extend(address_sync, 50, 200, [None, None])
+    assert (address_sync.block_start, address_sync.block_stop) == (50, 150)
+
+
+def test_extend_to_confirmed_block():
+    """
+    Addresses without transactions in the downloaded range are cached up to the confirmed blocks.
+    """
+    address_sync = FakeAddressSync(100, 99)
+    TransactionStore._extend(address_sync, 100, 200, [None], confirmed_block=180)
+    assert (address_sync.block_start, address_sync.block_stop) == (100, 180)
+
+    TransactionStore._extend(address_sync, 100, 250, [190], confirmed_block=300)
+    assert (address_sync.block_start, address_sync.block_stop) == (100, 250)
+
+    # Ranges before the cached range do not move its end
+    TransactionStore._extend(address_sync, 0, 50, [40], confirmed_block=300)
+    assert (address_sync.block_start, address_sync.block_stop) == (0, 250)
+
+
+class FakeQuery(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession(object):
+
+    def __init__(self, address_syncs):
+        self.address_syncs = address_syncs
+
+    def query(self, *args):
+        return FakeQuery(self.address_syncs)
+
+
+def test_count_new_users_needs_whole_history():
+    """
+    New and returning users are not counted if blocks before the cached range may have users.
+    """
+    store = TransactionStore(None, FakeSession([FakeAddressSync(100, 200)]))
+    assert store.count_new_users([TEST_CONTRACT_ADDRESS], 150, 200) is None
+
+    store = TransactionStore(None, FakeSession([]))
+    assert store.count_new_users([TEST_CONTRACT_ADDRESS], 150, 200) is None
@@ -88,6 +88,65 @@ def init_data():
     conn.close()
 
 
+@manager.command
+def refresh_listing():
+    """Rebuild the dapp_listing snapshot read by the dapp list, e.g. after a deploy."""
+    from dapp_store_backend.caching import DAPPS, invalidate
+    from dapp_store_backend.services.listing import refresh_dapp_listing
+
+    count = refresh_dapp_listing()
+    invalidate(DAPPS)
+    print('Refreshed the listing of {} dapps.'.format(count))
+
+
+@manager.option('-b', '--blockchain', dest='symbol', default='ETH', help='Blockchain symbol.')
+@manager.option('-s', '--start', dest='start', required=True, help='Start date (inclusive), YYYY-MM-DD.')
+@manager.option('-e', '--end', dest='end', required=True, help='End date (exclusive), YYYY-MM-DD.')
+def backfill(symbol, start, end):
+    """Backfill block intervals and dapp metrics for a date range."""
+    from datetime import datetime, timezone
+    from dapp_store_backend.extensions import celery
+
+    time_start = int(datetime.strptime(start, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+    time_stop = int(datetime.strptime(end, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+
+    celery.send_task('backfill_dapp_metrics', (symbol, time_start, time_stop))
+    print('Backfill of {} from {} to {} submitted.'.format(symbol, start, end))
+
+
+@manager.option('-s', '--start', dest='start', required=True, help='Start date (inclusive), YYYY-MM-DD.')
+@manager.option('-e', '--end', dest='end', required=True, help='End date (exclusive), YYYY-MM-DD.')
+@manager.option('-r', '--strategies', dest='strategies', default=None,
+                help='Comma separated ranking strategies, all by default.')
+def evaluate_ranking(start, end, strategies):
+    """Replay stored metrics and compare the rank stability and compute time of ranking strategies."""
+    from datetime import datetime, timezone
+    from dapp_store_backend.services import ranking
+    from dapp_store_backend.services.ranking_replay import replay_snapshots
+    from dapp_store_backend.settings import Config
+
+    time_start = int(datetime.strptime(start, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+    time_stop = int(datetime.strptime(end, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+
+    names = strategies.split(',') if strategies else sorted(ranking.STRATEGIES)
+    unknown = [x for x in names if x not in ranking.STRATEGIES]
+    if unknown:
+        print('Unknown strategies: {}. Available: {}.'.format(', '.join(unknown),
+                                                             ', '.join(sorted(ranking.STRATEGIES))))
+        return
+
+    snapshots = ((ids, categories, matrix) for _, ids, categories, matrix in replay_snapshots(time_start, time_stop))
+    report = ranking.evaluate_strategies(snapshots, ranking.ranking_weights(Config), Config.MAX_RANKING, names)
+
+    print('{:<12} {:>9} {:>8} {:>12} {:>9} {:>10}'.format(
+        'strategy', 'snapshots', 'overlap', 'displacement', 'agreement', 'time (ms)'))
+    for name in names:
+        result = report[name]
+        print('{:<12} {:>9} {:>8.3f} {:>12.3f} {:>9.3f} {:>10.1f}'.format(
+            name, result['snapshots'], result['overlap'], result['displacement'], result['agreement'],
+            result['seconds'] * 1000))
+
+
 # link cli keywords to flask commands
 manager.add_command('server', Server())
 manager.add_command('shell', Shell(make_context=_make_context))
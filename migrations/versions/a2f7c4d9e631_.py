@@ -0,0 +1,31 @@
+"""empty message
+
+Revision ID: a2f7c4d9e631
+Revises: 5e8b0d4f2a61
+Create Date: 2026-10-19 10:14:37.603118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2f7c4d9e631'
+down_revision = '5e8b0d4f2a61'
+branch_labels = None
+depends_on = None
+
+SORT_COLUMNS = ['users', 'volume', 'transactions', 'rating', 'name', 'uploaded_at']
+
+
+def upgrade():
+    # Sort columns of the dapp list, of all dapps and within a category
+    for column in SORT_COLUMNS:
+        op.create_index(op.f('ix_dapp_listing_{}'.format(column)), 'dapp_listing', [column], unique=False)
+        op.create_index(op.f('ix_dapp_listing_category_{}'.format(column)), 'dapp_listing', ['category', column],
+                        unique=False)
+
+
+def downgrade():
+    for column in reversed(SORT_COLUMNS):
+        op.drop_index(op.f('ix_dapp_listing_category_{}'.format(column)), table_name='dapp_listing')
+        op.drop_index(op.f('ix_dapp_listing_{}'.format(column)), table_name='dapp_listing')
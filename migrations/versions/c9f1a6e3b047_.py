@@ -0,0 +1,28 @@
+"""empty message
+
+Revision ID: c9f1a6e3b047
+Revises: 4a7c3e91d258
+Create Date: 2026-10-18 19:11:05.214873
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9f1a6e3b047'
+down_revision = '4a7c3e91d258'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Search indexes of dapp_listing, see services.search
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX ix_dapp_listing_name_trgm ON dapp_listing USING gin (lower(name) gin_trgm_ops)')
+    op.execute("CREATE INDEX ix_dapp_listing_search ON dapp_listing USING gin "
+               "(to_tsvector('simple', name || ' ' || tagline || ' ' || description))")
+
+
+def downgrade():
+    op.execute('DROP INDEX ix_dapp_listing_search')
+    op.execute('DROP INDEX ix_dapp_listing_name_trgm')